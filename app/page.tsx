@@ -50,9 +50,10 @@ export default function Home() {
     const formData = new FormData();
     formData.append("file", files);
 
+    let progressInterval: ReturnType<typeof setInterval> | undefined;
     try {
       // Simulate progress for demo purposes
-      const progressInterval = setInterval(() => {
+      progressInterval = setInterval(() => {
         setUploadProgress((prev) => {
           if (prev >= 95) {
             clearInterval(progressInterval);
@@ -62,31 +63,63 @@ export default function Home() {
         });
       }, 300);
 
-      // Call the FastAPI backend endpoint
-      const response = await fetch("http://127.0.0.1:8000/api/v1/process", {
-        method: "POST",
-        body: formData,
-        headers: {
-          Accept: "application/json",
-        },
-      });
-
-      clearInterval(progressInterval);
-      setUploadProgress(100);
+      // Call the FastAPI backend streaming endpoint
+      const response = await fetch(
+        "http://127.0.0.1:8000/api/v1/process/stream",
+        {
+          method: "POST",
+          body: formData,
+          headers: {
+            Accept: "text/event-stream",
+          },
+        }
+      );
 
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         throw new Error(`Upload failed with status: ${response.status}`);
       }
 
-      // Get the processed report from the backend
-      const data = await response.json();
-      setReport(data);
-      console.log(data);
+      // Render the extracted information as it streams in
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let streamed = "";
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        const events = buffer.split("\n\n");
+        buffer = events.pop() ?? "";
+        for (const raw of events) {
+          const event = raw.match(/^event: (.*)$/m)?.[1];
+          const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] ?? "{}");
+
+          if (event === "token") {
+            clearInterval(progressInterval);
+            streamed += data.text;
+            setReport({ response: streamed });
+          } else if (event === "escalated") {
+            // A larger model is answering again; drop the partial answer
+            streamed = "";
+            setReport({ response: streamed });
+          } else if (event === "done") {
+            setReport(data);
+            console.log(data);
+          } else if (event === "error") {
+            throw new Error(data.detail);
+          }
+        }
+      }
+
+      setUploadProgress(100);
     } catch (err) {
       setError(
         err instanceof Error ? err.message : "An unknown error occurred"
       );
     } finally {
+      clearInterval(progressInterval);
       setUploading(false);
     }
   };
@@ -1,63 +1,279 @@
 """API routes."""
 
-from fastapi import APIRouter, File, UploadFile, HTTPException
+import json
+from typing import List
 
-from backend.utils import validate_pdf_file
-from backend.services import pdf_processor, llm_service, pdf_generator
+from fastapi import APIRouter, File, UploadFile, HTTPException, Response
+from fastapi.responses import FileResponse, StreamingResponse
+
+from backend.config import settings
+from backend.utils import spool_upload, run_blocking
+from backend.services import (
+    llm_service,
+    result_cache,
+    report_store,
+    singleflight,
+    job_queue,
+    QueueFullError,
+    OverloadedError,
+)
+from backend.services.pipeline import (
+    process_document,
+    process_batch,
+    stream_document,
+    render_report,
+)
+from backend.services.metrics import start_trace
 
 router = APIRouter()
 
 
 @router.post("/process")
-async def process_pdf(file: UploadFile = File(...)):
+async def process_pdf(
+    response: Response,
+    file: UploadFile = File(...),
+    render: bool = True,
+    timings: bool = False,
+):
     """
     Process a PDF file and extract applicant information.
 
+    CPU-bound stages run in the shared thread pool and LLM calls use the
+    async client, so the event loop stays free for other requests. Results
+    are cached by document content, so re-uploads skip the pipeline.
+
+    The time spent in each stage is returned in a Server-Timing header
+    and recorded in the Prometheus metrics at /metrics.
+
     Args:
+        response: Response whose headers carry the stage timings
         file: Uploaded PDF file
+        render: Render a PDF report; pass false for JSON only
+        timings: Also include the stage timings in the body
 
     Returns:
         dict: Processing results including tokens, mode, and extracted info
     """
+    trace = start_trace()
+    upload = None
     try:
-        # Read file content
-        pdf_bytes = await file.read()
-
-        # Validate file
-        validate_pdf_file(file, pdf_bytes)
-
-        # Extract text from PDF
-        text = pdf_processor.extract_text(pdf_bytes)
+        # Stream and validate the upload without buffering it whole
+        upload = await spool_upload(file)
 
-        # Count tokens
-        token_count = pdf_processor.count_tokens(text)
-
-        # Determine processing mode and extract information
-        if pdf_processor.should_use_rag(token_count):
-            # Use RAG for large documents
-            response = llm_service.extract_with_rag(text)
-            mode = "RAG"
-        else:
-            # Direct processing for small documents
-            response = llm_service.extract_direct(text)
-            mode = "direct"
+        # Extract text, count tokens and run the LLM
+        result = await process_document(upload)
 
         # Generate PDF report
-        output_path = pdf_generator.generate_report(response)
+        if render:
+            result.update(await render_report(result["response"]))
 
-        return {
-            "tokens": token_count,
-            "mode": mode,
-            "response": response,
-            "output_file": output_path,
-        }
+        trace.finish("cached" if result["cached"] else "ok")
+        response.headers["Server-Timing"] = trace.server_timing()
+        if timings:
+            result["timings"] = trace.breakdown()
+        return result
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except OverloadedError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        )
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
+    finally:
+        trace.finish("error")
+        if upload is not None:
+            upload.cleanup()
+
+
+@router.post("/process/stream")
+async def process_pdf_stream(
+    file: UploadFile = File(...), render: bool = True, timings: bool = False
+):
+    """
+    Process a PDF file, streaming progress as server-sent events.
+
+    Emits "extracted", "tokens" and "mode" events as each stage completes,
+    one "token" event per piece of LLM output as it arrives, and a final
+    "done" event with the same fields as POST /process. An "escalated"
+    event means the output so far is discarded and a larger model's
+    answer follows. Failures after the
+    stream has started are reported as an "error" event; when the server is
+    at capacity it carries a retry_after in seconds.
+
+    Args:
+        file: Uploaded PDF file
+        render: Render a PDF report; pass false for JSON only
+        timings: Include the stage timings in the "done" event
+
+    Returns:
+        StreamingResponse: text/event-stream of pipeline events
+    """
+    upload = await spool_upload(file)
+
+    async def stream():
+        trace = start_trace()
+        events = stream_document(upload)
+        try:
+            async for event, data in events:
+                if event == "result":
+                    if render:
+                        data.update(await render_report(data["response"]))
+                    trace.finish("cached" if data["cached"] else "ok")
+                    if timings:
+                        data["timings"] = trace.breakdown()
+                    event = "done"
+                yield _sse(event, data)
+        except OverloadedError as e:
+            yield _sse("error", {"detail": str(e), "retry_after": e.retry_after})
+        except Exception as e:
+            yield _sse("error", {"detail": f"Error processing PDF: {str(e)}"})
+        finally:
+            # Release a run this request leads before its upload goes away
+            await events.aclose()
+            trace.finish("error")
+            upload.cleanup()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/process/batch")
+async def process_pdf_batch(
+    files: List[UploadFile] = File(...), render: bool = True, summary: bool = False
+):
+    """
+    Process many PDF files in one request.
+
+    Results are streamed back as newline-delimited JSON, one object per file
+    in completion order. Each object carries the file's index and filename,
+    and a status of "ok" or "error". With summary=true a final object with
+    status "summary" links one report covering every successful file.
+
+    Args:
+        files: Uploaded PDF files
+        render: Render a PDF report per file; pass false for JSON only
+        summary: Also render a combined summary report
+
+    Returns:
+        StreamingResponse: NDJSON stream of per-file results
+    """
+    if len(files) > settings.BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files. Maximum per batch is {settings.BATCH_MAX_FILES}",
+        )
+
+    # Spool and validate everything up front; uploads are closed once the
+    # streaming response starts.
+    documents = []
+    try:
+        for file in files:
+            documents.append(await spool_upload(file))
+    except BaseException:
+        for upload in documents:
+            upload.cleanup()
+        raise
+
+    async def stream():
+        items = process_batch(documents, render, summary)
+        try:
+            async for item in items:
+                yield json.dumps(item) + "\n"
+        finally:
+            # Release the runs the batch leads before its uploads go away
+            await items.aclose()
+            for upload in documents:
+                upload.cleanup()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.post("/jobs", status_code=202)
+async def create_job(file: UploadFile = File(...), render: bool = True):
+    """
+    Queue a PDF file for background processing.
+
+    Returns immediately with a job id; poll GET /jobs/{job_id} for the
+    result. Responds 429 when the queue is full.
+
+    Args:
+        file: Uploaded PDF file
+        render: Render a PDF report; pass false for JSON only
+
+    Returns:
+        dict: Job id and initial status
+    """
+    upload = await spool_upload(file)
+    try:
+        job_id = await job_queue.submit(upload, render)
+    except QueueFullError as e:
+        upload.cleanup()
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.get("/jobs/metrics")
+async def job_metrics():
+    """Job queue depth, wait-time and outcome metrics."""
+    return job_queue.metrics()
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Get the status of a queued job.
+
+    Args:
+        job_id: Job id returned by POST /jobs
+
+    Returns:
+        dict: Job status, timestamps, and the result or error once finished
+    """
+    job = await run_blocking(job_queue.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/reports/{report_id}")
+async def download_report(report_id: str):
+    """
+    Download a generated PDF report.
+
+    Args:
+        report_id: Report id from a processing result
+
+    Returns:
+        FileResponse: The PDF report
+    """
+    path = report_store.path_for(report_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return FileResponse(
+        path, media_type="application/pdf", filename=f"report_{report_id}.pdf"
+    )
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """Result and embedding cache hit/miss counters, and coalesced runs."""
+    stats = {"results": result_cache.stats(), "coalesced": singleflight.stats()}
+    embedding_stats = llm_service.embedding_stats()
+    if embedding_stats is not None:
+        stats["embeddings"] = embedding_stats
+    return stats
 
 
 @router.get("/health")
@@ -0,0 +1,323 @@
+"""
+Offline bulk processing of a directory of PDFs.
+
+Walks a directory and runs every PDF through the same pipeline as the API
+(text extraction, normalization, token counting, rules, packing or RAG,
+LLM extraction, report rendering) without going through HTTP. The CPU
+stages run across a process pool, one document per worker; LLM calls run
+concurrently in this process, up to --llm-concurrency at a time. Each
+result is appended to a JSONL file as soon as it is ready, so an
+interrupted run resumes where it stopped: files that already have a
+successful record are skipped, and failed ones are retried.
+
+Usage:
+    python -m backend.bulk INPUT_DIR [--output results.jsonl]
+                           [--reports-dir outputs/bulk] [--no-render]
+                           [--workers 8] [--llm-concurrency 8]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+
+from backend.config import settings
+from backend.services import llm_service, pdf_generator, pdf_processor, result_cache
+from backend.services.pdf_processor import extract_pages
+from backend.services.pipeline import prepare_pages
+from backend.services.token_chunker import token_chunker
+
+
+def find_pdfs(root: str) -> List[str]:
+    """
+    List the PDFs under a directory.
+
+    Args:
+        root: Directory to walk
+
+    Returns:
+        Paths relative to root, sorted so runs are repeatable
+    """
+    found = []
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in settings.ALLOWED_EXTENSIONS:
+                found.append(os.path.relpath(os.path.join(directory, name), root))
+    return found
+
+
+def load_done(output_path: str) -> Set[str]:
+    """
+    Find the files that already have a successful record.
+
+    Lines that are not valid JSON, such as one cut short when a previous
+    run was killed, and records without a "file" are ignored.
+
+    Args:
+        output_path: JSONL results file; may not exist yet
+
+    Returns:
+        Relative paths of files to skip
+    """
+    done: Set[str] = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(record, dict) or "error" in record:
+                continue
+            path = record.get("file")
+            if path:
+                done.add(path)
+    return done
+
+
+def file_digest(path: str) -> str:
+    """Hex SHA-256 of a file, for the result cache key."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def prepare_document(path: str) -> Dict[str, Any]:
+    """
+    Extract one document and run the pipeline's CPU stages, in a worker process.
+
+    Args:
+        path: PDF file path
+
+    Returns:
+        dict: As returned by pipeline.prepare_pages
+    """
+    return prepare_pages(extract_pages(path, False))
+
+
+def write_report(response: str, path: str) -> str:
+    """
+    Render a report and write it, in a worker process.
+
+    Args:
+        response: Extracted information to render
+        path: Report file path; parent directories are created
+
+    Returns:
+        The report path
+    """
+    pdf_bytes = pdf_generator.render(response)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(pdf_bytes)
+    os.replace(tmp_path, path)
+    return path
+
+
+class Progress:
+    """Counts finished documents and prints throughput at intervals."""
+
+    def __init__(self, total: int, skipped: int, interval: float):
+        """
+        Initialize progress.
+
+        Args:
+            total: Documents to process in this run
+            skipped: Documents skipped as already done
+            interval: Seconds between progress lines
+        """
+        self.total = total
+        self.skipped = skipped
+        self.interval = interval
+        self.done = 0
+        self.errors = 0
+        self.cached = 0
+        self.tokens = 0
+        self.start = time.perf_counter()
+        self._last = self.start
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """Count a written record and print progress if an interval has passed."""
+        self.done += 1
+        if "error" in record:
+            self.errors += 1
+        else:
+            self.tokens += record["tokens"]
+            self.cached += record["cached"]
+        now = time.perf_counter()
+        if now - self._last >= self.interval:
+            self._last = now
+            self.report()
+
+    def report(self) -> None:
+        """Print counts, documents per second and tokens per second."""
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        print(
+            f"{self.done}/{self.total} done ({self.errors} errors, {self.cached} cached, "
+            f"{self.skipped} skipped) in {elapsed:.0f}s: {self.done / elapsed:.2f} docs/s, "
+            f"{self.tokens / elapsed:.0f} tokens/s",
+            flush=True,
+        )
+
+
+async def process_directory(
+    root: str,
+    files: List[str],
+    output,
+    progress: Progress,
+    pool: ProcessPoolExecutor,
+    workers: int,
+    llm_concurrency: int,
+    reports_dir: Optional[str],
+) -> None:
+    """
+    Process files and append one JSONL record per file to output.
+
+    Args:
+        root: Input directory
+        files: Paths relative to root
+        output: Text file opened for appending
+        progress: Progress to update as records are written
+        pool: Process pool for the CPU stages
+        workers: Number of processes in the pool
+        llm_concurrency: LLM calls in flight at once
+        reports_dir: Directory for reports, mirroring the input tree; None
+            skips rendering
+    """
+    loop = asyncio.get_running_loop()
+    llm_slots = asyncio.Semaphore(llm_concurrency)
+    # Bound the documents held in memory between stages
+    in_flight = asyncio.Semaphore(workers * 2 + llm_concurrency)
+
+    async def run(relative_path: str) -> Dict[str, Any]:
+        path = os.path.join(root, relative_path)
+        cache_key = result_cache.make_key_from_digest(
+            await loop.run_in_executor(None, file_digest, path)
+        )
+        cached = await result_cache.aget(cache_key) if settings.RESULT_CACHE_ENABLED else None
+        if cached is not None:
+            result = {**cached, "cached": True}
+        else:
+            prepared = await loop.run_in_executor(pool, prepare_document, path)
+            result = prepared["result"]
+            if result["mode"] != "rules":
+                async with llm_slots:
+                    if result["mode"] == "RAG":
+                        result["response"] = await llm_service.aextract_with_rag(
+                            prepared["chunks"], tokens=result["tokens"]
+                        )
+                    else:
+                        result["response"] = await llm_service.aextract_direct(
+                            prepared["text"], result["tokens"]
+                        )
+            if settings.RESULT_CACHE_ENABLED:
+                await result_cache.aput(cache_key, result)
+            result["cached"] = False
+        if reports_dir is not None:
+            report_path = os.path.join(
+                reports_dir, os.path.splitext(relative_path)[0] + ".report.pdf"
+            )
+            result["report"] = await loop.run_in_executor(
+                pool, write_report, result["response"], report_path
+            )
+        return result
+
+    async def handle(relative_path: str) -> None:
+        async with in_flight:
+            start = time.perf_counter()
+            try:
+                record = {"file": relative_path, **await run(relative_path)}
+            except Exception as e:
+                record = {"file": relative_path, "error": str(e)}
+            record["seconds"] = round(time.perf_counter() - start, 3)
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+        progress.add(record)
+
+    await asyncio.gather(*(handle(relative_path) for relative_path in files))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Parse arguments and process the directory, resuming a previous run."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("input_dir", help="Directory to search for PDFs, recursively")
+    parser.add_argument("--output", default="results.jsonl", help="JSONL file to append to")
+    parser.add_argument(
+        "--reports-dir",
+        default=os.path.join(settings.OUTPUT_DIR, "bulk"),
+        help="Directory for the rendered reports, mirroring the input tree",
+    )
+    parser.add_argument("--no-render", action="store_true", help="Skip the PDF reports")
+    parser.add_argument("--workers", type=int, default=settings.PROCESS_WORKERS)
+    parser.add_argument("--llm-concurrency", type=int, default=settings.BATCH_LLM_CONCURRENCY)
+    parser.add_argument(
+        "--progress-interval", type=float, default=5.0, help="Seconds between progress lines"
+    )
+    args = parser.parse_args(argv)
+
+    settings.validate()
+    if args.workers <= 0 or args.llm_concurrency <= 0:
+        parser.error("--workers and --llm-concurrency must be positive")
+    if not os.path.isdir(args.input_dir):
+        parser.error(f"{args.input_dir} is not a directory")
+
+    files = find_pdfs(args.input_dir)
+    done = load_done(args.output)
+    todo = [path for path in files if path not in done]
+    progress = Progress(len(todo), len(files) - len(todo), args.progress_interval)
+    print(
+        f"{len(files)} PDFs found, {len(files) - len(todo)} already done, "
+        f"{len(todo)} to process with {args.workers} workers and "
+        f"{args.llm_concurrency} concurrent LLM calls",
+        flush=True,
+    )
+    if not todo:
+        return
+
+    # Load tiktoken, the chunker's boundary tokens and the report fonts
+    # once, before the workers fork, so they start warm
+    pdf_processor.warmup()
+    token_chunker.warmup()
+    pdf_generator.warmup()
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "a+", encoding="utf-8") as output:
+        # Finish a line cut short by an interrupted run
+        if output.tell() > 0:
+            output.seek(output.tell() - 1)
+            if output.read(1) != "\n":
+                output.write("\n")
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            try:
+                asyncio.run(
+                    process_directory(
+                        args.input_dir,
+                        todo,
+                        output,
+                        progress,
+                        pool,
+                        args.workers,
+                        args.llm_concurrency,
+                        None if args.no_render else args.reports_dir,
+                    )
+                )
+            finally:
+                progress.report()
+    if progress.errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
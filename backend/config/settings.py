@@ -26,24 +26,155 @@ class Settings:
     )  # 10MB default
     ALLOWED_MIME_TYPES: List[str] = ["application/pdf"]
     ALLOWED_EXTENSIONS: List[str] = [".pdf"]
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", 64 * 1024))
+    UPLOAD_SNIFF_BYTES: int = int(os.getenv("UPLOAD_SNIFF_BYTES", 4096))
+    UPLOAD_SPOOL_MAX_MEMORY: int = int(
+        os.getenv("UPLOAD_SPOOL_MAX_MEMORY", 1024 * 1024)
+    )  # per-upload memory ceiling before spooling to disk
+    UPLOAD_TMP_DIR: str = os.getenv("UPLOAD_TMP_DIR", "")  # empty uses system temp
+    UPLOAD_FORM_OVERHEAD: int = 64 * 1024  # multipart framing allowance per file
 
     # LLM Configuration
     MODEL_NAME: str = os.getenv("MODEL_NAME", "gpt-4")
     MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", 4000))
     TEMPERATURE: float = float(os.getenv("TEMPERATURE", 0))
+    # Ordered model tiers, cheapest first, as "model[:max_tokens],...". A
+    # document starts at the first tier whose max_tokens covers it and moves
+    # to the next when the answer lacks GPA, major or test scores; the last
+    # tier takes any size. Empty uses MODEL_NAME alone
+    MODEL_TIERS: List[str] = [
+        tier.strip() for tier in os.getenv("MODEL_TIERS", "").split(",") if tier.strip()
+    ]
+
+    # OpenAI Client Configuration
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")  # empty uses the OpenAI API
+    # Seconds a call may take in total, retries included
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", 60))
+    LLM_CONNECT_TIMEOUT: float = float(os.getenv("LLM_CONNECT_TIMEOUT", 5))
+    # Retries on 429/5xx and connection errors, with full-jitter backoff
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", 3))
+    LLM_BACKOFF_BASE: float = float(os.getenv("LLM_BACKOFF_BASE", 0.5))
+    LLM_BACKOFF_MAX: float = float(os.getenv("LLM_BACKOFF_MAX", 8))
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", 100))
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", 20))
+    LLM_KEEPALIVE_EXPIRY: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY", 30))
+    # Send a duplicate request when a call is slower than the recent p95
+    # (and at least LLM_HEDGE_MIN_DELAY seconds); the first answer wins
+    LLM_HEDGE: bool = os.getenv("LLM_HEDGE", "false").lower() == "true"
+    LLM_HEDGE_MIN_DELAY: float = float(os.getenv("LLM_HEDGE_MIN_DELAY", 1))
 
     # RAG Configuration
+    # "tokens" cuts CHUNK_TOKENS-token windows from the encoded document;
+    # "characters" splits text into CHUNK_SIZE-character chunks
+    CHUNKER: str = os.getenv("CHUNKER", "tokens").lower()
+    CHUNK_TOKENS: int = int(os.getenv("CHUNK_TOKENS", 256))
+    CHUNK_OVERLAP_TOKENS: int = int(os.getenv("CHUNK_OVERLAP_TOKENS", 48))
     CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", 1000))
     CHUNK_OVERLAP: int = int(os.getenv("CHUNK_OVERLAP", 200))
+    # "faiss" embeds chunks for vector search; "bm25" ranks them by keyword locally
+    RETRIEVAL_BACKEND: str = os.getenv("RETRIEVAL_BACKEND", "faiss").lower()
+    RETRIEVAL_TOP_K: int = int(os.getenv("RETRIEVAL_TOP_K", 4))
+
+    # Text Normalization Configuration
+    # Strip repeated headers/footers, page numbers, watermarks and layout
+    # whitespace before counting tokens
+    NORMALIZE_TEXT: bool = os.getenv("NORMALIZE_TEXT", "true").lower() == "true"
+    NORMALIZE_REPEAT_RATIO: float = float(os.getenv("NORMALIZE_REPEAT_RATIO", 0.5))
+
+    # Rule-based Extraction Configuration
+    # Answer from labelled fields (GPA, major, SAT/ACT) without the LLM when
+    # pattern matching is at least this confident
+    RULES_ENABLED: bool = os.getenv("RULES_ENABLED", "true").lower() == "true"
+    RULES_MIN_CONFIDENCE: float = float(os.getenv("RULES_MIN_CONFIDENCE", 0.9))
+
+    # Page Packing Configuration
+    # Documents over MAX_TOKENS but within PACK_MAX_TOKENS send their most
+    # relevant pages, up to MAX_TOKENS, to direct mode instead of using RAG
+    PACK_PAGES: bool = os.getenv("PACK_PAGES", "true").lower() == "true"
+    PACK_MAX_TOKENS: int = int(os.getenv("PACK_MAX_TOKENS", 4 * MAX_TOKENS))
+
+    # Embedding Configuration
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
+    EMBEDDING_CACHE_PATH: str = os.getenv(
+        "EMBEDDING_CACHE_PATH", "cache/embeddings.sqlite3"
+    )  # empty disables the cache
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", 256))
+
+    # Job Queue Configuration
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", 4))
+    JOB_QUEUE_SIZE: int = int(os.getenv("JOB_QUEUE_SIZE", 100))
+    JOB_DB_PATH: str = os.getenv("JOB_DB_PATH", "cache/jobs.sqlite3")
+
+    # Result Cache Configuration
+    RESULT_CACHE_ENABLED: bool = (
+        os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+    )
+    RESULT_CACHE_MAX_ENTRIES: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 256))
+    RESULT_CACHE_DIR: str = os.getenv("RESULT_CACHE_DIR", "")  # empty disables disk tier
+    RESULT_CACHE_MAX_BYTES: int = int(
+        os.getenv("RESULT_CACHE_MAX_BYTES", 100 * 1024 * 1024)
+    )  # 100MB default
+    RESULT_CACHE_TTL: int = int(os.getenv("RESULT_CACHE_TTL", 7 * 24 * 3600))
+
+    # Concurrency Configuration
+    CPU_WORKERS: int = int(os.getenv("CPU_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+    PROCESS_WORKERS: int = int(os.getenv("PROCESS_WORKERS", os.cpu_count() or 1))
+    PARALLEL_EXTRACT_MIN_PAGES: int = int(os.getenv("PARALLEL_EXTRACT_MIN_PAGES", 40))
+
+    # Batch Processing Configuration
+    BATCH_MAX_FILES: int = int(os.getenv("BATCH_MAX_FILES", 200))
+    BATCH_LLM_CONCURRENCY: int = int(os.getenv("BATCH_LLM_CONCURRENCY", 8))
+
+    # Startup Configuration
+    # Preload PyMuPDF, tiktoken, langchain and fpdf in the background after startup
+    WARMUP_ON_STARTUP: bool = (
+        os.getenv("WARMUP_ON_STARTUP", "false").lower() == "true"
+    )
+
+    # Server Configuration (python -m backend.server)
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", 8000))
+    SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", os.cpu_count() or 1))
+    # Import the app and load tiktoken, PyMuPDF and fpdf once in the master,
+    # so workers share them copy-on-write
+    SERVER_PRELOAD: bool = os.getenv("SERVER_PRELOAD", "true").lower() == "true"
+    # Recycle a worker after this many requests (0 never) or once its RSS
+    # has grown by this many MB since it started (0 never)
+    SERVER_MAX_REQUESTS: int = int(os.getenv("SERVER_MAX_REQUESTS", 1000))
+    SERVER_MAX_REQUESTS_JITTER: int = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", 100))
+    SERVER_MAX_RSS_GROWTH_MB: int = int(os.getenv("SERVER_MAX_RSS_GROWTH_MB", 512))
+    SERVER_RSS_CHECK_INTERVAL: float = float(os.getenv("SERVER_RSS_CHECK_INTERVAL", 10))
+    # Seconds a silent worker may run before it is killed and replaced
+    SERVER_TIMEOUT: int = int(os.getenv("SERVER_TIMEOUT", 120))
+    # Seconds a stopping worker gets to finish requests and drain jobs
+    SERVER_GRACEFUL_TIMEOUT: int = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", 30))
+    JOB_DRAIN_TIMEOUT: float = float(os.getenv("JOB_DRAIN_TIMEOUT", 20))
+    # Directory for Prometheus metrics shared by workers; empty uses a temp dir
+    METRICS_MULTIPROC_DIR: str = os.getenv("METRICS_MULTIPROC_DIR", "")
 
     # Output Configuration
     OUTPUT_DIR: str = os.getenv("OUTPUT_DIR", "outputs")
+    REPORT_STORE_DIR: str = os.getenv("REPORT_STORE_DIR", "")  # empty uses OUTPUT_DIR/reports
+    REPORT_STORE_MAX_BYTES: int = int(
+        os.getenv("REPORT_STORE_MAX_BYTES", 500 * 1024 * 1024)
+    )  # 500MB default
+    REPORT_TTL: int = int(os.getenv("REPORT_TTL", 7 * 24 * 3600))
 
     # Rate Limiting (optional)
     RATE_LIMIT_ENABLED: bool = (
         os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
     )
     RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", 10))
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", 5))
+    # Document tokens allowed in LLM processing at once on the host
+    RATE_LIMIT_MAX_INFLIGHT_TOKENS: int = int(
+        os.getenv("RATE_LIMIT_MAX_INFLIGHT_TOKENS", 500_000)
+    )
+    RATE_LIMIT_RETRY_AFTER: int = int(os.getenv("RATE_LIMIT_RETRY_AFTER", 5))
+    # Identify clients by X-Forwarded-For; enable only behind a trusted proxy
+    RATE_LIMIT_TRUST_FORWARDED: bool = (
+        os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+    )
 
     def validate(self) -> None:
         """Validate required settings."""
@@ -53,8 +184,98 @@ class Settings:
         if self.MAX_FILE_SIZE <= 0:
             raise ValueError("MAX_FILE_SIZE must be positive")
 
+        if self.UPLOAD_CHUNK_SIZE <= 0 or self.UPLOAD_SNIFF_BYTES <= 0:
+            raise ValueError("UPLOAD_CHUNK_SIZE and UPLOAD_SNIFF_BYTES must be positive")
+
         if self.MAX_TOKENS <= 0:
             raise ValueError("MAX_TOKENS must be positive")
 
+        if self.MODEL_TIERS:
+            model, sep, limit = self.MODEL_TIERS[-1].rpartition(":")
+            if sep and limit.isdigit():
+                raise ValueError("The last of MODEL_TIERS must not have a token limit")
+
+        if self.LLM_TIMEOUT <= 0 or self.LLM_CONNECT_TIMEOUT <= 0:
+            raise ValueError("LLM_TIMEOUT and LLM_CONNECT_TIMEOUT must be positive")
+
+        if self.LLM_MAX_RETRIES < 0 or self.LLM_BACKOFF_BASE < 0 or self.LLM_BACKOFF_MAX < 0:
+            raise ValueError("LLM_MAX_RETRIES and LLM_BACKOFF_* must not be negative")
+
+        if self.LLM_MAX_CONNECTIONS <= 0 or self.LLM_MAX_KEEPALIVE_CONNECTIONS < 0:
+            raise ValueError(
+                "LLM_MAX_CONNECTIONS must be positive and "
+                "LLM_MAX_KEEPALIVE_CONNECTIONS not negative"
+            )
+
+        if self.CHUNKER not in ("tokens", "characters"):
+            raise ValueError("CHUNKER must be 'tokens' or 'characters'")
+
+        if not 0 <= self.CHUNK_OVERLAP_TOKENS < self.CHUNK_TOKENS:
+            raise ValueError("CHUNK_OVERLAP_TOKENS must be at least 0 and below CHUNK_TOKENS")
+
+        if self.RETRIEVAL_BACKEND not in ("faiss", "bm25"):
+            raise ValueError("RETRIEVAL_BACKEND must be 'faiss' or 'bm25'")
+
+        if self.RETRIEVAL_TOP_K <= 0:
+            raise ValueError("RETRIEVAL_TOP_K must be positive")
+
+        if not 0 < self.NORMALIZE_REPEAT_RATIO <= 1:
+            raise ValueError("NORMALIZE_REPEAT_RATIO must be between 0 and 1")
+
+        if not 0 <= self.RULES_MIN_CONFIDENCE <= 1:
+            raise ValueError("RULES_MIN_CONFIDENCE must be between 0 and 1")
+
+        if self.PACK_PAGES and self.PACK_MAX_TOKENS <= 0:
+            raise ValueError("PACK_MAX_TOKENS must be positive")
+
+        if self.EMBEDDING_BATCH_SIZE <= 0:
+            raise ValueError("EMBEDDING_BATCH_SIZE must be positive")
+
+        if self.JOB_WORKERS <= 0 or self.JOB_QUEUE_SIZE <= 0:
+            raise ValueError("JOB_WORKERS and JOB_QUEUE_SIZE must be positive")
+
+        if self.RESULT_CACHE_MAX_ENTRIES <= 0:
+            raise ValueError("RESULT_CACHE_MAX_ENTRIES must be positive")
+
+        if self.CPU_WORKERS <= 0:
+            raise ValueError("CPU_WORKERS must be positive")
+
+        if self.PROCESS_WORKERS <= 0:
+            raise ValueError("PROCESS_WORKERS must be positive")
+
+        if self.BATCH_LLM_CONCURRENCY <= 0:
+            raise ValueError("BATCH_LLM_CONCURRENCY must be positive")
+
+        if self.SERVER_WORKERS <= 0:
+            raise ValueError("SERVER_WORKERS must be positive")
+
+        if (
+            self.SERVER_MAX_REQUESTS < 0
+            or self.SERVER_MAX_REQUESTS_JITTER < 0
+            or self.SERVER_MAX_RSS_GROWTH_MB < 0
+        ):
+            raise ValueError(
+                "SERVER_MAX_REQUESTS, SERVER_MAX_REQUESTS_JITTER and "
+                "SERVER_MAX_RSS_GROWTH_MB must not be negative"
+            )
+
+        if self.SERVER_RSS_CHECK_INTERVAL <= 0:
+            raise ValueError("SERVER_RSS_CHECK_INTERVAL must be positive")
+
+        if not 0 <= self.JOB_DRAIN_TIMEOUT < self.SERVER_GRACEFUL_TIMEOUT:
+            raise ValueError(
+                "JOB_DRAIN_TIMEOUT must be at least 0 and below SERVER_GRACEFUL_TIMEOUT"
+            )
+
+        if self.RATE_LIMIT_ENABLED and (
+            self.RATE_LIMIT_PER_MINUTE <= 0
+            or self.RATE_LIMIT_BURST <= 0
+            or self.RATE_LIMIT_MAX_INFLIGHT_TOKENS <= 0
+        ):
+            raise ValueError(
+                "RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST and "
+                "RATE_LIMIT_MAX_INFLIGHT_TOKENS must be positive"
+            )
+
 
 settings = Settings()
@@ -3,11 +3,27 @@ Main FastAPI application.
 Production-ready PDF applicant information extractor.
 """
 
-from fastapi import FastAPI
+import os
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    generate_latest,
+    multiprocess,
+)
 
 from backend.config import settings
 from backend.api import router
+from backend.services import (
+    job_queue,
+    start_background_warmup,
+    admission,
+    rate_limiter,
+    AdmissionMiddleware,
+)
+from backend.utils import shutdown_pools, RequestSizeLimitMiddleware
 
 # Validate settings on startup
 settings.validate()
@@ -21,7 +37,31 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
-# Configure CORS
+# Reject oversized uploads before their bodies are read
+_upload_limit = settings.MAX_FILE_SIZE + settings.UPLOAD_FORM_OVERHEAD
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    default_limit=_upload_limit,
+    limits={"/api/v1/process/batch": _upload_limit * settings.BATCH_MAX_FILES},
+)
+
+# Shed processing requests over the rate or in-flight limits, before
+# their uploads are read
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware,
+        limiter=rate_limiter,
+        controller=admission,
+        paths=[
+            "/api/v1/process",
+            "/api/v1/process/stream",
+            "/api/v1/process/batch",
+            "/api/v1/jobs",
+        ],
+        trust_forwarded=settings.RATE_LIMIT_TRUST_FORWARDED,
+    )
+
+# Configure CORS (added last so it also wraps early rejections)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
@@ -34,6 +74,21 @@ app.add_middleware(
 app.include_router(router, prefix="/api/v1", tags=["PDF Processing"])
 
 
+@app.on_event("startup")
+async def startup():
+    """Start the background job workers and, if enabled, warmup."""
+    await job_queue.start()
+    if settings.WARMUP_ON_STARTUP:
+        start_background_warmup()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Drain and stop job workers and release shared executors on shutdown."""
+    await job_queue.stop(drain_timeout=settings.JOB_DRAIN_TIMEOUT)
+    shutdown_pools()
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -44,10 +99,22 @@ async def root():
         "status": "running",
         "docs": "/docs",
         "health": "/api/v1/health",
+        "metrics": "/metrics",
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics: per-stage and per-mode latency histograms."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Under backend.server, aggregate the metrics of every worker
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host=settings.SERVER_HOST, port=settings.SERVER_PORT)
@@ -0,0 +1,229 @@
+"""
+Multi-process production server.
+
+Runs the app under gunicorn with SERVER_WORKERS uvicorn worker processes,
+so PDF parsing, token counting and report rendering use several cores.
+The master imports the app and loads the tiktoken encoding, PyMuPDF and
+the report fonts before forking, so workers share them copy-on-write and
+serve their first request warm. Workers are recycled after
+SERVER_MAX_REQUESTS requests or once their memory has grown by
+SERVER_MAX_RSS_GROWTH_MB, and get SERVER_GRACEFUL_TIMEOUT seconds to
+finish requests and drain their job queue when stopped. PROCESS_WORKERS
+is split between the workers, as each one runs its own process pool.
+
+Usage:
+    python -m backend.server
+"""
+
+import gc
+import glob
+import logging
+import os
+import resource
+import signal
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict
+
+from gunicorn.app.base import BaseApplication
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _rss_bytes() -> int:
+    """Resident set size of the current process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        # Not Linux: fall back to the peak, in KB (bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _watch_memory(limit: int, interval: float) -> None:
+    """
+    Stop the worker gracefully once its RSS grows by more than limit bytes.
+
+    Sends SIGTERM to the current process, which uvicorn handles by
+    finishing open requests and running shutdown; the master then starts
+    a replacement.
+    """
+    baseline = _rss_bytes()
+    while True:
+        time.sleep(interval)
+        growth = _rss_bytes() - baseline
+        if growth > limit:
+            logger.warning(
+                "Worker %d grew by %d MB since start, recycling",
+                os.getpid(),
+                growth // (1024 * 1024),
+            )
+            os.kill(os.getpid(), signal.SIGTERM)
+            return
+
+
+def load_app() -> Any:
+    """
+    Import the app and load shared state.
+
+    With SERVER_PRELOAD this runs once in the master, before fork. The
+    OpenAI clients and embedding cache are left for each worker to create,
+    as sockets and SQLite connections must not be shared across fork.
+    """
+    from backend.main import app
+    from backend.services import warmup
+
+    warmup(clients=False)
+    if settings.SERVER_PRELOAD:
+        # Keep the collector from touching preloaded objects in workers,
+        # which would copy their pages
+        gc.freeze()
+    return app
+
+
+def on_starting(server: Any) -> None:
+    """Fail jobs left unfinished by a previous server, once, in the master."""
+    from backend.services import job_queue
+
+    job_queue.store.fail_unfinished("Interrupted by server restart")
+    job_queue.store.close()
+    job_queue.recover_on_start = False
+
+
+def post_worker_init(worker: Any) -> None:
+    """Start the memory watchdog in a newly forked worker."""
+    if settings.SERVER_MAX_RSS_GROWTH_MB:
+        limit = settings.SERVER_MAX_RSS_GROWTH_MB * 1024 * 1024
+        threading.Thread(
+            target=_watch_memory,
+            args=(limit, settings.SERVER_RSS_CHECK_INTERVAL),
+            name="memory-watchdog",
+            daemon=True,
+        ).start()
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    """Clean up after a worker that exited, whether recycled or crashed."""
+    from prometheus_client import multiprocess
+    from backend.services import job_queue
+
+    multiprocess.mark_process_dead(worker.pid)
+    # A graceful stop has already failed what it could not drain; this
+    # catches workers that were killed
+    job_queue.store.fail_unfinished(
+        "Worker exited before the job finished", owner=worker.pid
+    )
+    job_queue.store.close()
+
+
+def gunicorn_options() -> Dict[str, Any]:
+    """
+    Build the gunicorn configuration from settings.
+
+    Returns:
+        dict: gunicorn setting names and values
+    """
+    return {
+        "bind": f"{settings.SERVER_HOST}:{settings.SERVER_PORT}",
+        "workers": settings.SERVER_WORKERS,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": settings.SERVER_PRELOAD,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+        "timeout": settings.SERVER_TIMEOUT,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT,
+        "on_starting": on_starting,
+        "post_worker_init": post_worker_init,
+        "child_exit": child_exit,
+    }
+
+
+class Server(BaseApplication):
+    """gunicorn application configured from settings instead of the CLI."""
+
+    def __init__(self, options: Dict[str, Any]):
+        """
+        Initialize server.
+
+        Args:
+            options: gunicorn setting names and values
+        """
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self) -> Any:
+        return load_app()
+
+
+def share_process_workers() -> int:
+    """
+    Split PROCESS_WORKERS between the server workers.
+
+    Every worker creates its own extraction process pool, so without this
+    a host would run SERVER_WORKERS x PROCESS_WORKERS processes. Must run
+    in the master before the workers fork.
+
+    Returns:
+        Process pool size of each worker
+    """
+    settings.PROCESS_WORKERS = max(1, settings.PROCESS_WORKERS // settings.SERVER_WORKERS)
+    return settings.PROCESS_WORKERS
+
+
+def share_inflight_tokens() -> int:
+    """
+    Split RATE_LIMIT_MAX_INFLIGHT_TOKENS between the server workers.
+
+    Every worker admits LLM work against its own in-flight count, so
+    without this a host would run SERVER_WORKERS times the limit. Must run
+    in the master before the app is imported.
+
+    Returns:
+        In-flight token limit of each worker
+    """
+    settings.RATE_LIMIT_MAX_INFLIGHT_TOKENS = max(
+        1, settings.RATE_LIMIT_MAX_INFLIGHT_TOKENS // settings.SERVER_WORKERS
+    )
+    return settings.RATE_LIMIT_MAX_INFLIGHT_TOKENS
+
+
+def prepare_metrics_dir() -> str:
+    """
+    Point prometheus_client at a directory shared by all workers.
+
+    Must run before prometheus_client is imported. Files left by a
+    previous server are removed so counters start from zero.
+
+    Returns:
+        The metrics directory
+    """
+    directory = settings.METRICS_MULTIPROC_DIR or tempfile.mkdtemp(
+        prefix="pdf-extractor-metrics-"
+    )
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        os.remove(path)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+    return directory
+
+
+def main() -> None:
+    """Validate settings and run the server until it is stopped."""
+    settings.validate()
+    share_process_workers()
+    share_inflight_tokens()
+    prepare_metrics_dir()
+    Server(gunicorn_options()).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,5 +3,26 @@
 from .pdf_processor import pdf_processor
 from .llm_service import llm_service
 from .pdf_generator import pdf_generator
+from .result_cache import result_cache
+from .report_store import report_store
+from .singleflight import singleflight
+from .job_queue import job_queue, QueueFullError
+from .admission import admission, rate_limiter, AdmissionMiddleware, OverloadedError
+from .warmup import warmup, start_background_warmup
 
-__all__ = ["pdf_processor", "llm_service", "pdf_generator"]
+__all__ = [
+    "pdf_processor",
+    "llm_service",
+    "pdf_generator",
+    "result_cache",
+    "report_store",
+    "singleflight",
+    "job_queue",
+    "QueueFullError",
+    "admission",
+    "rate_limiter",
+    "AdmissionMiddleware",
+    "OverloadedError",
+    "warmup",
+    "start_background_warmup",
+]
@@ -0,0 +1,271 @@
+"""
+Admission control: per-client rate limiting and load shedding.
+
+Two limits protect the OpenAI quota and the host:
+
+- A token bucket per client caps how often each client may start work.
+- An in-flight limit weighted by document token count caps how much LLM
+  work runs at once, so one 100k-token RAG job counts for as much as many
+  one-page transcripts. Background work waiting for capacity is admitted
+  in arrival order, so a large document is not starved by small ones.
+
+Interactive requests over either limit, or arriving while background work
+is queued, are shed immediately with Retry-After instead of waiting.
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Iterable, Tuple
+
+from backend.config import settings
+from .metrics import INFLIGHT_TOKENS, SHED_TOTAL
+
+
+class OverloadedError(Exception):
+    """Raised when a document does not fit in the in-flight limit."""
+
+    def __init__(self, message: str, retry_after: int):
+        """
+        Initialize error.
+
+        Args:
+            message: Error message
+            retry_after: Seconds the client should wait before retrying
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ClientRateLimiter:
+    """Token bucket per client key, refilled continuously."""
+
+    def __init__(self, per_minute: int, burst: int, max_clients: int = 10_000):
+        """
+        Initialize rate limiter.
+
+        Args:
+            per_minute: Sustained requests per minute per client
+            burst: Requests a client may make at once after being idle
+            max_clients: Buckets kept before the least recently seen are
+                dropped (a dropped client starts again with a full bucket)
+        """
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def acquire(self, key: str) -> float:
+        """
+        Take one token from a client's bucket.
+
+        Args:
+            key: Client key, e.g. its IP address
+
+        Returns:
+            0 if the request may proceed, otherwise seconds until it may
+        """
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class AdmissionController:
+    """Limit on in-flight work, weighted by document token count."""
+
+    def __init__(self, capacity: int, retry_after: int):
+        """
+        Initialize admission controller.
+
+        Args:
+            capacity: Tokens of documents allowed in flight at once; 0
+                disables the limit
+            retry_after: Retry-After seconds sent with shed requests
+        """
+        self.capacity = capacity
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+
+    def saturated(self) -> bool:
+        """Whether no more work can be admitted right now."""
+        return self.capacity > 0 and self.in_flight >= self.capacity
+
+    def count_shed(self) -> None:
+        """Count a request shed because the limit was saturated."""
+        SHED_TOTAL.labels(reason="overloaded").inc()
+
+    @asynccontextmanager
+    async def admit(self, tokens: int, wait: bool = False) -> AsyncIterator[None]:
+        """
+        Hold capacity for a document while its LLM work runs.
+
+        A document larger than the whole capacity is admitted once nothing
+        else is in flight, so it can still run on its own. Waiters are
+        admitted first in, first out: nothing overtakes a queued document.
+
+        Args:
+            tokens: Token count of the document
+            wait: Wait for capacity instead of raising; for background work
+                (jobs, batches) that has no client waiting on a timeout
+
+        Raises:
+            OverloadedError: If the document does not fit and wait is false
+        """
+        if self.capacity <= 0:
+            yield
+            return
+
+        cost = max(1, min(tokens, self.capacity))
+        if self._waiters or not self._fits(cost):
+            if not wait:
+                self.count_shed()
+                raise OverloadedError(
+                    "Server is busy. Please retry later", self.retry_after
+                )
+            granted = asyncio.get_running_loop().create_future()
+            self._waiters.append((cost, granted))
+            try:
+                await granted
+            except asyncio.CancelledError:
+                if granted.done() and not granted.cancelled():
+                    # Capacity was handed over just as we were cancelled
+                    self._release(cost)
+                else:
+                    self._waiters.remove((cost, granted))
+                    self._wake()
+                raise
+        else:
+            self._take(cost)
+
+        try:
+            yield
+        finally:
+            self._release(cost)
+
+    def _fits(self, cost: int) -> bool:
+        return self.in_flight == 0 or self.in_flight + cost <= self.capacity
+
+    def _take(self, cost: int) -> None:
+        self.in_flight += cost
+        INFLIGHT_TOKENS.set(self.in_flight)
+
+    def _release(self, cost: int) -> None:
+        self.in_flight -= cost
+        INFLIGHT_TOKENS.set(self.in_flight)
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hand capacity to queued waiters in order while the first fits."""
+        while self._waiters:
+            cost, granted = self._waiters[0]
+            if granted.done():
+                self._waiters.popleft()
+                continue
+            if not self._fits(cost):
+                return
+            self._waiters.popleft()
+            self._take(cost)
+            granted.set_result(None)
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that sheds requests before their uploads are read.
+
+    Requests to the listed paths get a 429 when their client is over its
+    rate limit and a 503 while the in-flight limit is saturated, both with
+    a Retry-After header.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter: ClientRateLimiter,
+        controller: AdmissionController,
+        paths: Iterable[str],
+        trust_forwarded: bool = False,
+    ):
+        """
+        Initialize middleware.
+
+        Args:
+            app: ASGI application to wrap
+            limiter: Per-client rate limiter
+            controller: In-flight token limit
+            paths: Paths that start document processing
+            trust_forwarded: Identify clients by the first X-Forwarded-For
+                address; only safe behind a proxy that sets it
+        """
+        self.app = app
+        self.limiter = limiter
+        self.controller = controller
+        self.paths = frozenset(paths)
+        self.trust_forwarded = trust_forwarded
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        wait = self.limiter.acquire(self._client_key(scope))
+        if wait > 0:
+            SHED_TOTAL.labels(reason="rate_limited").inc()
+            await self._reject(
+                send, 429, "Too many requests. Please slow down", math.ceil(wait)
+            )
+            return
+
+        if self.controller.saturated():
+            self.controller.count_shed()
+            await self._reject(
+                send, 503, "Server is busy. Please retry later", self.controller.retry_after
+            )
+            return
+
+        await self.app(scope, receive, send)
+
+    def _client_key(self, scope) -> str:
+        """Identify the client of a request."""
+        if self.trust_forwarded:
+            for name, value in scope.get("headers", []):
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    async def _reject(send, status: int, detail: str, retry_after: int) -> None:
+        """Send a JSON error response with Retry-After."""
+        body = json.dumps({"detail": detail}).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                    (b"retry-after", str(retry_after).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+rate_limiter = ClientRateLimiter(settings.RATE_LIMIT_PER_MINUTE, settings.RATE_LIMIT_BURST)
+admission = AdmissionController(
+    settings.RATE_LIMIT_MAX_INFLIGHT_TOKENS if settings.RATE_LIMIT_ENABLED else 0,
+    settings.RATE_LIMIT_RETRY_AFTER,
+)
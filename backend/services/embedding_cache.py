@@ -0,0 +1,193 @@
+"""Persistent per-chunk embedding cache."""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from typing import Dict, List, Sequence
+
+from langchain_core.embeddings import Embeddings
+
+from backend.config import settings
+from backend.utils import run_blocking
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH = 500
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that stores chunk vectors in a local SQLite file.
+
+    Vectors are keyed by a hash of the embedding model name and the chunk
+    text, so boilerplate shared across documents (letterheads, grading
+    legends, footers) is embedded once. Only missing chunks are sent to the
+    underlying model, in batches.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        db_path: str,
+        batch_size: int = 256,
+    ):
+        """
+        Initialize embedding cache.
+
+        Args:
+            embeddings: Underlying embedding model
+            model_name: Embedding model name, part of every key
+            db_path: SQLite file path
+            batch_size: Maximum texts per call to the underlying model
+        """
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _key(self, text: str) -> str:
+        """Hash the model name and chunk text into a cache key."""
+        return hashlib.sha256(
+            f"{self.model_name}\0{text}".encode("utf-8")
+        ).hexdigest()
+
+    def _load(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Fetch stored vectors for the given keys."""
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for start in range(0, len(keys), _SQL_BATCH):
+                batch = keys[start : start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                )
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+        return found
+
+    def _store(self, items: Dict[str, List[float]]) -> None:
+        """Persist newly computed vectors."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, array("f", vector).tobytes()) for key, vector in items.items()],
+            )
+            self._conn.commit()
+
+    def _plan(self, texts: List[str]) -> tuple:
+        """
+        Split texts into cached vectors and unique texts still to embed.
+
+        Returns:
+            Tuple of (keys, cached vectors by key, missing texts by key)
+        """
+        keys = [self._key(text) for text in texts]
+        cached = self._load(list(dict.fromkeys(keys)))
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        return keys, cached, missing
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents, computing only chunks not already cached.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One vector per input text
+        """
+        keys, vectors, missing = self._plan(texts)
+        missing_keys = list(missing)
+        for start in range(0, len(missing_keys), self.batch_size):
+            batch_keys = missing_keys[start : start + self.batch_size]
+            computed = self.embeddings.embed_documents([missing[k] for k in batch_keys])
+            new = dict(zip(batch_keys, computed))
+            self._store(new)
+            vectors.update(new)
+        return [vectors[key] for key in keys]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Async variant of embed_documents.
+
+        Cache reads and writes run in the shared thread pool, so SQLite
+        does not block the event loop.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One vector per input text
+        """
+        keys, vectors, missing = await run_blocking(self._plan, texts)
+        missing_keys = list(missing)
+        for start in range(0, len(missing_keys), self.batch_size):
+            batch_keys = missing_keys[start : start + self.batch_size]
+            computed = await self.embeddings.aembed_documents(
+                [missing[k] for k in batch_keys]
+            )
+            new = dict(zip(batch_keys, computed))
+            await run_blocking(self._store, new)
+            vectors.update(new)
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query. Queries vary per call and are not cached."""
+        return self.embeddings.embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Async variant of embed_query."""
+        return await self.embeddings.aembed_query(text)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+
+        Returns:
+            dict: Chunk-level hit/miss counters
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def build_embeddings(embeddings: Embeddings) -> Embeddings:
+    """
+    Wrap an embedding model with the persistent cache when enabled.
+
+    Args:
+        embeddings: Underlying embedding model
+
+    Returns:
+        Cached embeddings, or the model unchanged if the cache is disabled
+    """
+    if not settings.EMBEDDING_CACHE_PATH:
+        return embeddings
+    return CachedEmbeddings(
+        embeddings,
+        model_name=settings.EMBEDDING_MODEL,
+        db_path=settings.EMBEDDING_CACHE_PATH,
+        batch_size=settings.EMBEDDING_BATCH_SIZE,
+    )
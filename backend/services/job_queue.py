@@ -0,0 +1,331 @@
+"""Asynchronous job queue for long-running document processing."""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from backend.config import settings
+from backend.utils import SpooledUpload, run_blocking
+from .metrics import start_trace
+from .pipeline import process_document, render_report
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no room for another job."""
+
+
+class JobStore:
+    """Durable job state in a local SQLite file."""
+
+    def __init__(self, db_path: str):
+        """
+        Initialize job store. The database is opened on first use.
+
+        Args:
+            db_path: SQLite file path
+        """
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database and create the schema; call with self._lock held."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    filename TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    result TEXT,
+                    error TEXT,
+                    owner INTEGER
+                )
+                """
+            )
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(jobs)")]
+            if "owner" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner INTEGER")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """
+        Close this process's connection; the next call reopens it.
+
+        SQLite connections must not cross fork(), so a server master that
+        touches the store closes it before starting workers.
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        """Run a write statement and commit."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute(sql, params)
+            conn.commit()
+
+    def create(self, job_id: str, filename: str) -> None:
+        """Record a newly queued job, owned by the current process."""
+        self._execute(
+            "INSERT INTO jobs (id, status, filename, created_at, owner) "
+            "VALUES (?, 'queued', ?, ?, ?)",
+            (job_id, filename, time.time(), os.getpid()),
+        )
+
+    def mark_running(self, job_id: str) -> None:
+        """Record that a worker picked up a job."""
+        self._execute(
+            "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+            (time.time(), job_id),
+        )
+
+    def mark_done(self, job_id: str, result: Dict[str, Any]) -> None:
+        """Record a job's result."""
+        self._execute(
+            "UPDATE jobs SET status = 'done', finished_at = ?, result = ? WHERE id = ?",
+            (time.time(), json.dumps(result), job_id),
+        )
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        """Record a job's failure."""
+        self._execute(
+            "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? WHERE id = ?",
+            (time.time(), error, job_id),
+        )
+
+    def fail_unfinished(self, error: str, owner: Optional[int] = None) -> None:
+        """
+        Fail jobs left queued or running by processes that are gone.
+
+        Args:
+            error: Error recorded on each job
+            owner: Only fail the jobs of this process id; None fails all
+        """
+        if owner is None:
+            self._execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? "
+                "WHERE status IN ('queued', 'running')",
+                (time.time(), error),
+            )
+        else:
+            self._execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? "
+                "WHERE status IN ('queued', 'running') AND owner = ?",
+                (time.time(), error, owner),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a job.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            dict: Job status and result, or None if unknown
+        """
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT id, status, filename, created_at, started_at, finished_at, result, error "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(
+            zip(
+                ["job_id", "status", "filename", "created_at", "started_at", "finished_at"],
+                row[:6],
+            )
+        )
+        if row[6] is not None:
+            job["result"] = json.loads(row[6])
+        if row[7] is not None:
+            job["error"] = row[7]
+        return job
+
+
+class JobQueue:
+    """
+    Bounded in-process job queue served by a pool of async workers.
+
+    Jobs run the same pipeline as POST /process. Submissions beyond
+    settings.JOB_QUEUE_SIZE waiting jobs are refused rather than queued.
+
+    Under backend.server each worker process runs its own queue over the
+    shared store; the server master fails the jobs of workers that exit,
+    so set recover_on_start to False there.
+    """
+
+    def __init__(self, store: JobStore, workers: int, max_queued: int):
+        """
+        Initialize job queue.
+
+        Args:
+            store: Durable job state
+            workers: Number of concurrent workers
+            max_queued: Maximum jobs waiting for a worker
+        """
+        self.store = store
+        self.workers = workers
+        self.max_queued = max_queued
+        self.recover_on_start = True
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.running = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def start(self) -> None:
+        """Start the worker pool."""
+        if self._tasks:
+            return
+        if self.recover_on_start:
+            await run_blocking(self.store.fail_unfinished, "Interrupted by server restart")
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+
+    async def stop(self, drain_timeout: float = 0) -> None:
+        """
+        Stop the workers and fail jobs that had not finished.
+
+        Args:
+            drain_timeout: Seconds to keep working through running and
+                queued jobs before cancelling them
+        """
+        deadline = time.monotonic() + drain_timeout
+        while (
+            self._queue is not None
+            and (self.running or not self._queue.empty())
+            and time.monotonic() < deadline
+        ):
+            await asyncio.sleep(0.1)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._queue is not None:
+            while not self._queue.empty():
+                job_id, upload, _, _ = self._queue.get_nowait()
+                upload.cleanup()
+                await run_blocking(
+                    self.store.mark_failed, job_id, "Server shut down before the job ran"
+                )
+
+    async def submit(self, upload: SpooledUpload, render: bool = True) -> str:
+        """
+        Queue a document for processing.
+
+        The queue takes ownership of the upload and cleans it up once the
+        job has run. The job is recorded in the store from the shared
+        thread pool, so the SQLite commit does not block the event loop.
+
+        Args:
+            upload: Validated, spooled PDF upload
+            render: Render and store a report for the result
+
+        Returns:
+            Job identifier
+
+        Raises:
+            QueueFullError: If the queue is full
+        """
+        if self._queue is None or self._queue.full():
+            self.rejected += 1
+            raise QueueFullError("Job queue is full")
+        job_id = uuid.uuid4().hex
+        await run_blocking(self.store.create, job_id, upload.filename)
+        try:
+            self._queue.put_nowait((job_id, upload, render, time.monotonic()))
+        except asyncio.QueueFull:
+            # Filled by other submissions while the job was being recorded
+            self.rejected += 1
+            await run_blocking(self.store.mark_failed, job_id, "Job queue is full")
+            raise QueueFullError("Job queue is full")
+        self.submitted += 1
+        return job_id
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Get queue metrics.
+
+        Returns:
+            dict: Queue depth, worker usage, counters and wait times
+        """
+        started = self.completed + self.failed + self.running
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_capacity": self.max_queued,
+            "workers": self.workers,
+            "running": self.running,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_seconds": self.total_wait / started if started else 0.0,
+            "max_wait_seconds": self.max_wait,
+        }
+
+    async def _worker(self) -> None:
+        """Process jobs until cancelled; store writes run in the thread pool."""
+        while True:
+            job_id, upload, render, enqueued_at = await self._queue.get()
+            wait = time.monotonic() - enqueued_at
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.running += 1
+            trace = start_trace()
+            try:
+                await run_blocking(self.store.mark_running, job_id)
+                result = await process_document(upload, wait_for_capacity=True)
+                if render:
+                    result.update(await render_report(result["response"]))
+                await run_blocking(self.store.mark_done, job_id, result)
+                trace.finish("cached" if result["cached"] else "ok")
+                self.completed += 1
+            except asyncio.CancelledError:
+                await run_blocking(
+                    self.store.mark_failed, job_id, "Server shut down while the job ran"
+                )
+                raise
+            except Exception as e:
+                await run_blocking(
+                    self.store.mark_failed, job_id, f"Error processing PDF: {str(e)}"
+                )
+                self.failed += 1
+            finally:
+                trace.finish("error")
+                self.running -= 1
+                upload.cleanup()
+                self._queue.task_done()
+
+
+job_queue = JobQueue(
+    JobStore(settings.JOB_DB_PATH),
+    workers=settings.JOB_WORKERS,
+    max_queued=settings.JOB_QUEUE_SIZE,
+)
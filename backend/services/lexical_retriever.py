@@ -0,0 +1,128 @@
+"""
+Local lexical retrieval over text chunks with Okapi BM25.
+
+Used in place of embeddings and FAISS when RETRIEVAL_BACKEND is "bm25":
+the extraction question is answered by chunks that share its keywords
+(GPA, major, test scores), so no embedding request is needed.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+# Okapi BM25 parameters
+K1 = 1.5
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase terms.
+
+    Decimal numbers such as GPAs are kept as one term.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        Terms in order
+    """
+    return _TOKEN.findall(text.lower())
+
+
+class BM25Index:
+    """Inverted index over a fixed set of chunks, scored with BM25."""
+
+    def __init__(self, chunks: Sequence[str]):
+        """
+        Build the index.
+
+        Args:
+            chunks: Text chunks to index
+        """
+        self.chunks = list(chunks)
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = []
+        for position, chunk in enumerate(self.chunks):
+            terms = tokenize(chunk)
+            lengths.append(len(terms))
+            for term, count in Counter(terms).items():
+                self._postings.setdefault(term, []).append((position, count))
+        average = sum(lengths) / len(lengths) if lengths else 0.0
+        # Per-chunk length normalization, precomputed once
+        self._norms = [
+            K1 * (1 - B + B * length / average) if average else K1 for length in lengths
+        ]
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """
+        Find the chunks that best match a query.
+
+        Args:
+            query: Query text
+            k: Number of chunks to return
+
+        Returns:
+            min(k, len(chunks)) (chunk position, score) pairs, best first.
+            As with a vector store, k chunks come back even when fewer share
+            a term with the query; the rest follow in document order.
+        """
+        total = len(self.chunks)
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for position, count in postings:
+                scores[position] = scores.get(position, 0.0) + idf * (
+                    count * (K1 + 1) / (count + self._norms[position])
+                )
+        # Ties go to the earlier chunk
+        best = heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
+        for position in range(total):
+            if len(best) >= k:
+                break
+            if position not in scores:
+                best.append((position, 0.0))
+        return best
+
+
+class BM25Retriever(BaseRetriever):
+    """langchain retriever over a BM25Index, returning the top k chunks."""
+
+    index: BM25Index
+    k: int = 4
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @classmethod
+    def from_texts(cls, chunks: Sequence[str], k: int = 4) -> "BM25Retriever":
+        """
+        Index chunks and wrap them in a retriever.
+
+        Args:
+            chunks: Text chunks to index
+            k: Number of chunks to retrieve per query
+
+        Returns:
+            BM25Retriever: The retriever
+        """
+        return cls(index=BM25Index(chunks), k=k)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return [
+            Document(page_content=self.index.chunks[position])
+            for position, _ in self.index.search(query, self.k)
+        ]
@@ -1,65 +1,401 @@
-"""LLM service for text extraction."""
+"""
+LLM service for text extraction.
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_community.vectorstores import FAISS
-from langchain.chains import RetrievalQA
+langchain, the OpenAI clients and FAISS are imported on first use so that
+importing the service (and starting the app) stays fast.
+"""
+
+import threading
+from typing import AsyncIterator, List, Optional, Union
 
 from backend.config import settings
+from .metrics import span
+from .model_cascade import Escalation, ModelCascade, ModelTier, parse_tiers
+from .pdf_processor import PageTokens, pdf_processor
+from .token_chunker import token_chunker
+
+# Labelled lines are what the cascade's check reads most reliably
+ANSWER_FORMAT = (
+    "Answer with one line per field: "
+    '"GPA: <value>", "Intended Major: <value>", "SAT: <value>", "ACT: <value>".'
+)
+DIRECT_PROMPT = "Extract applicant info from this text. " + ANSWER_FORMAT + "\n\n{text}"
+# Retrieval query; the model is asked RAG_PROMPT
+RAG_QUESTION = "Extract applicant GPA, intended major, and test scores."
+RAG_PROMPT = RAG_QUESTION + " " + ANSWER_FORMAT
 
 
 class LLMService:
     """Service for LLM-based text extraction."""
 
     def __init__(self):
-        """Initialize LLM service."""
-        self.llm = ChatOpenAI(
-            model_name=settings.MODEL_NAME,
+        """Initialize LLM service. Clients are created on first use."""
+        self._llm = None
+        self._models = {}
+        self._embedding_model = None
+        self._text_splitter = None
+        self._clients = None
+        self._lock = threading.Lock()
+        self.cascade = ModelCascade(
+            parse_tiers(settings.MODEL_TIERS) or [ModelTier(settings.MODEL_NAME)]
+        )
+
+    def _openai_clients(self):
+        """Shared (sync, async) OpenAI clients; call with self._lock held."""
+        if self._clients is None:
+            from .openai_transport import build_openai_clients
+
+            self._clients = build_openai_clients()
+        return self._clients
+
+    def _new_chat_model(self, model_name: str):
+        """Chat model over the shared clients; call with self._lock held."""
+        from langchain_openai import ChatOpenAI
+
+        client, async_client = self._openai_clients()
+        return ChatOpenAI(
+            model_name=model_name,
             temperature=settings.TEMPERATURE,
             api_key=settings.OPENAI_API_KEY,
+            client=client.chat.completions,
+            async_client=async_client.chat.completions,
+            max_retries=0,  # retried by openai_transport
         )
-        self.embedding_model = OpenAIEmbeddings(api_key=settings.OPENAI_API_KEY)
 
-    def extract_direct(self, text: str) -> str:
+    @property
+    def llm(self):
+        """Chat model for MODEL_NAME, created on first access."""
+        if self._llm is None:
+            with self._lock:
+                if self._llm is None:
+                    self._llm = self._new_chat_model(settings.MODEL_NAME)
+        return self._llm
+
+    def chat_model(self, model_name: str):
+        """
+        Chat model for a cascade tier, created on first access.
+
+        Args:
+            model_name: Model name from MODEL_TIERS
+
+        Returns:
+            The chat model; the same as llm for MODEL_NAME
+        """
+        if model_name == settings.MODEL_NAME:
+            return self.llm
+        if model_name not in self._models:
+            with self._lock:
+                if model_name not in self._models:
+                    self._models[model_name] = self._new_chat_model(model_name)
+        return self._models[model_name]
+
+    @property
+    def embedding_model(self):
+        """Embedding model, created on first access."""
+        if self._embedding_model is None:
+            with self._lock:
+                if self._embedding_model is None:
+                    from langchain_openai import OpenAIEmbeddings
+                    from .embedding_cache import build_embeddings
+
+                    client, async_client = self._openai_clients()
+                    self._embedding_model = build_embeddings(
+                        OpenAIEmbeddings(
+                            model=settings.EMBEDDING_MODEL,
+                            api_key=settings.OPENAI_API_KEY,
+                            client=client.embeddings,
+                            async_client=async_client.embeddings,
+                            max_retries=0,
+                        )
+                    )
+        return self._embedding_model
+
+    @property
+    def uses_embeddings(self) -> bool:
+        """Whether RAG retrieval needs chunk embeddings."""
+        return settings.RETRIEVAL_BACKEND != "bm25"
+
+    def embedding_stats(self) -> Optional[dict]:
+        """Embedding cache counters, or None if the cache is not in use yet."""
+        model = self._embedding_model
+        return model.stats() if hasattr(model, "stats") else None
+
+    def warmup(self, clients: bool = True) -> None:
+        """
+        Import langchain and create the clients ahead of the first request.
+
+        Args:
+            clients: Also create the OpenAI clients and open the embedding
+                cache; pass False before fork, as connections and sockets
+                must not be shared between processes
+        """
+        if clients:
+            for tier in self.cascade.tiers:
+                self.chat_model(tier.model)
+            self.embedding_model
+        else:
+            from langchain_openai import ChatOpenAI, OpenAIEmbeddings  # noqa: F401
+            from . import embedding_cache, openai_transport  # noqa: F401
+        from langchain.chains.question_answering.stuff_prompt import (  # noqa: F401
+            PROMPT_SELECTOR,
+        )
+        from langchain_community.vectorstores import FAISS  # noqa: F401
+        from .lexical_retriever import BM25Retriever  # noqa: F401
+
+    @property
+    def text_splitter(self):
+        """Character splitter for CHUNKER=characters, created on first access."""
+        if self._text_splitter is None:
+            with self._lock:
+                if self._text_splitter is None:
+                    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+                    self._text_splitter = RecursiveCharacterTextSplitter(
+                        chunk_size=settings.CHUNK_SIZE,
+                        chunk_overlap=settings.CHUNK_OVERLAP,
+                    )
+        return self._text_splitter
+
+    def split_text(self, text: str, page_tokens: Optional[PageTokens] = None) -> List[str]:
+        """
+        Split text into chunks for retrieval.
+
+        With CHUNKER=tokens (the default), chunks are windows of
+        CHUNK_TOKENS tokens cut from the document's token ids (see
+        token_chunker); otherwise they are CHUNK_SIZE characters.
+
+        Args:
+            text: Text to split
+            page_tokens: Tokens of the text's pages, if already encoded;
+                saves encoding the text again
+
+        Returns:
+            List of text chunks
+        """
+        if settings.CHUNKER == "characters":
+            return self.text_splitter.split_text(text)
+        if page_tokens is None:
+            return token_chunker.split_tokens(pdf_processor.encoder.encode_ordinary(text))
+        return token_chunker.split_pages(page_tokens)
+
+    def extract_direct(self, text: str, tokens: Optional[int] = None) -> str:
         """
         Extract information directly from text using LLM.
 
+        Runs through the model cascade (see MODEL_TIERS).
+
+        Args:
+            text: Text to extract information from
+            tokens: Document size in tokens, to pick the starting tier;
+                counted from text if not given
+
+        Returns:
+            Extracted information
+        """
+        prompt = DIRECT_PROMPT.format(text=text)
+        if tokens is None:
+            tokens = pdf_processor.count_tokens(text)
+        return self.cascade.run_sync(
+            tokens, lambda model_name: self.chat_model(model_name).predict(prompt)
+        )
+
+    async def aextract_direct(self, text: str, tokens: Optional[int] = None) -> str:
+        """
+        Async variant of extract_direct using the async OpenAI client.
+
+        Runs through the model cascade (see MODEL_TIERS).
+
         Args:
             text: Text to extract information from
+            tokens: Document size in tokens, to pick the starting tier
 
         Returns:
             Extracted information
         """
-        prompt = f"Extract applicant info from this text:\n\n{text}"
-        response = self.llm.predict(prompt)
-        return response
+        prompt = DIRECT_PROMPT.format(text=text)
+
+        async def call(model_name: str) -> str:
+            with span("llm"):
+                return await self.chat_model(model_name).apredict(prompt)
+
+        return await self.cascade.run(tokens, call)
 
     def extract_with_rag(self, text: str) -> str:
         """
         Extract information using RAG (Retrieval Augmented Generation).
 
+        Retrieves with RAG_QUESTION and answers RAG_PROMPT through the model
+        cascade, as aextract_with_rag does.
+
         Args:
             text: Text to extract information from
 
         Returns:
             Extracted information
         """
-        # Split text into chunks
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=settings.CHUNK_SIZE, chunk_overlap=settings.CHUNK_OVERLAP
+        from langchain_community.vectorstores import FAISS
+        from .lexical_retriever import BM25Retriever
+
+        page_tokens = pdf_processor.encode_pages([text])
+        chunks = self.split_text(text, page_tokens)
+
+        # Index chunks for retrieval
+        if self.uses_embeddings:
+            vectordb = FAISS.from_texts(chunks, self.embedding_model)
+            retriever = vectordb.as_retriever(search_kwargs={"k": settings.RETRIEVAL_TOP_K})
+        else:
+            retriever = BM25Retriever.from_texts(chunks, k=settings.RETRIEVAL_TOP_K)
+
+        messages = self._rag_messages(retriever.get_relevant_documents(RAG_QUESTION))
+        return self.cascade.run_sync(
+            page_tokens.total,
+            lambda model_name: self.chat_model(model_name).invoke(messages).content,
         )
-        chunks = splitter.split_text(text)
 
-        # Create vector store
-        vectordb = FAISS.from_texts(chunks, self.embedding_model)
-        retriever = vectordb.as_retriever()
+    async def aembed_chunks(self, chunks: List[str]) -> List[List[float]]:
+        """
+        Embed chunks in one batched call.
+
+        Lets callers group chunks from many documents into a single request
+        before building per-document indexes.
+
+        Args:
+            chunks: Text chunks to embed
+
+        Returns:
+            One vector per chunk
+        """
+        with span("embed"):
+            return await self.embedding_model.aembed_documents(chunks)
+
+    async def aextract_with_rag(
+        self,
+        chunks: List[str],
+        vectors: Optional[List[List[float]]] = None,
+        tokens: Optional[int] = None,
+    ) -> str:
+        """
+        Async variant of extract_with_rag using the async OpenAI clients.
+
+        Chunking is CPU-bound, so callers split the text (see split_text)
+        off the event loop and pass the chunks in. Retrieval and generation
+        run as separate steps, with LangChain's "stuff" QA prompt, so each
+        can be timed on its own.
+
+        Args:
+            chunks: Pre-split text chunks
+            vectors: Precomputed chunk embeddings (see aembed_chunks); not
+                needed with the BM25 backend
+            tokens: Document size in tokens, to pick the starting tier
+
+        Returns:
+            Extracted information
+        """
+        messages = await self._arag_messages(chunks, vectors)
+
+        async def call(model_name: str) -> str:
+            with span("llm"):
+                response = await self.chat_model(model_name).ainvoke(messages)
+            return response.content
+
+        return await self.cascade.run(tokens, call)
+
+    async def astream_direct(
+        self, text: str, tokens: Optional[int] = None
+    ) -> AsyncIterator[Union[str, Escalation]]:
+        """
+        Stream the direct extraction output as it is generated.
+
+        Args:
+            text: Text to extract information from
+            tokens: Document size in tokens, to pick the starting tier
+
+        Yields:
+            Pieces of the extracted information, and an Escalation each
+            time the cascade discards an answer for the next tier's
+        """
+        prompt = DIRECT_PROMPT.format(text=text)
+        async for piece in self.cascade.stream(
+            tokens, lambda model_name: self._astream(model_name, prompt)
+        ):
+            yield piece
+
+    async def astream_rag(
+        self,
+        chunks: List[str],
+        vectors: Optional[List[List[float]]] = None,
+        tokens: Optional[int] = None,
+    ) -> AsyncIterator[Union[str, Escalation]]:
+        """
+        Stream the RAG extraction output as it is generated.
+
+        Retrieval runs first; the answer is then generated with LangChain's
+        "stuff" QA prompt, streamed token by token.
+
+        Args:
+            chunks: Pre-split text chunks
+            vectors: Precomputed chunk embeddings (see aembed_chunks)
+            tokens: Document size in tokens, to pick the starting tier
+
+        Yields:
+            Pieces of the extracted information, and an Escalation each
+            time the cascade discards an answer for the next tier's
+        """
+        messages = await self._arag_messages(chunks, vectors)
+        async for piece in self.cascade.stream(
+            tokens, lambda model_name: self._astream(model_name, messages)
+        ):
+            yield piece
+
+    async def _astream(self, model_name: str, prompt) -> AsyncIterator[str]:
+        """Stream one model's answer to a prompt or message list."""
+        with span("llm"):
+            async for chunk in self.chat_model(model_name).astream(prompt):
+                if chunk.content:
+                    yield chunk.content
+
+    async def _arag_messages(
+        self, chunks: List[str], vectors: Optional[List[List[float]]]
+    ) -> list:
+        """Retrieve the chunks relevant to RAG_QUESTION and build the prompt."""
+        retriever = await self._abuild_retriever(chunks, vectors)
+        with span("retrieve"):
+            docs = await retriever.aget_relevant_documents(RAG_QUESTION)
+        return self._rag_messages(docs)
+
+    def _rag_messages(self, docs) -> list:
+        """Build the "stuff" prompt answering RAG_PROMPT from retrieved chunks."""
+        from langchain.chains.question_answering.stuff_prompt import PROMPT_SELECTOR
+
+        prompt = PROMPT_SELECTOR.get_prompt(self.llm)
+        return prompt.format_messages(
+            context="\n\n".join(doc.page_content for doc in docs),
+            question=RAG_PROMPT,
+        )
+
+    async def _abuild_retriever(
+        self, chunks: List[str], vectors: Optional[List[List[float]]]
+    ):
+        """
+        Build a retriever over the chunks for the configured backend.
+
+        FAISS embeds the chunks unless vectors are given; BM25 indexes them
+        locally and ignores vectors.
+        """
+        from langchain_community.vectorstores import FAISS
+        from .lexical_retriever import BM25Retriever
 
-        # Create QA chain
-        qa = RetrievalQA.from_chain_type(llm=self.llm, retriever=retriever)
+        if not self.uses_embeddings:
+            with span("index"):
+                return BM25Retriever.from_texts(chunks, k=settings.RETRIEVAL_TOP_K)
 
-        # Extract information
-        response = qa.run("Extract applicant GPA, intended major, and test scores.")
-        return response
+        if vectors is None:
+            vectors = await self.aembed_chunks(chunks)
+        with span("index"):
+            vectordb = FAISS.from_embeddings(
+                list(zip(chunks, vectors)), self.embedding_model
+            )
+        return vectordb.as_retriever(search_kwargs={"k": settings.RETRIEVAL_TOP_K})
 
 
 llm_service = LLMService()
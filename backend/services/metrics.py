@@ -0,0 +1,237 @@
+"""Per-stage timing of the processing pipeline and Prometheus metrics."""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Seconds; stages range from sub-millisecond cache lookups to long LLM calls
+LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+TOKEN_BUCKETS = (500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000, 256000)
+CHUNK_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+STAGE_SECONDS = Histogram(
+    "pdf_extractor_stage_seconds",
+    "Time spent in each pipeline stage",
+    ["stage", "mode"],
+    buckets=LATENCY_BUCKETS,
+)
+DOCUMENT_SECONDS = Histogram(
+    "pdf_extractor_document_seconds",
+    "End-to-end time to process one document",
+    ["mode", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+DOCUMENT_TOKENS = Histogram(
+    "pdf_extractor_document_tokens",
+    "Token count of processed documents",
+    ["mode"],
+    buckets=TOKEN_BUCKETS,
+)
+RAG_CHUNKS = Histogram(
+    "pdf_extractor_rag_chunks",
+    "Number of chunks a RAG document was split into",
+    buckets=CHUNK_BUCKETS,
+)
+MODE_TOTAL = Counter(
+    "pdf_extractor_mode_total",
+    "Documents processed per extraction mode",
+    ["mode"],
+)
+SHED_TOTAL = Counter(
+    "pdf_extractor_shed_total",
+    "Requests rejected by admission control",
+    ["reason"],
+)
+TOKENS_SAVED = Histogram(
+    "pdf_extractor_tokens_saved",
+    "Tokens removed from a document by text normalization",
+    buckets=(0, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000),
+)
+RAG_AVOIDED_TOTAL = Counter(
+    "pdf_extractor_rag_avoided_total",
+    "Documents under MAX_TOKENS only after text normalization",
+)
+PACKED_SHARE = Histogram(
+    "pdf_extractor_packed_share",
+    "Share of document tokens sent to the LLM by page packing",
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+)
+RULES_TOTAL = Counter(
+    "pdf_extractor_rules_total",
+    "Documents checked by the rule-based extractor, by outcome (hit or miss)",
+    ["outcome"],
+)
+MODEL_SECONDS = Histogram(
+    "pdf_extractor_model_seconds",
+    "Extraction call latency per model tier",
+    ["model"],
+    buckets=LATENCY_BUCKETS,
+)
+MODEL_CALLS_TOTAL = Counter(
+    "pdf_extractor_model_calls_total",
+    "Extraction calls per model tier, by outcome (accepted, escalated, or "
+    "exhausted when the last tier's answer fails the check)",
+    ["model", "outcome"],
+)
+COALESCED_TOTAL = Counter(
+    "pdf_extractor_coalesced_total",
+    "Pipeline runs saved by sharing an identical in-flight document",
+)
+INFLIGHT_TOKENS = Gauge(
+    "pdf_extractor_inflight_tokens",
+    "Document tokens currently admitted for LLM processing",
+    multiprocess_mode="livesum",  # summed over live workers under backend.server
+)
+UPSTREAM_SECONDS = Histogram(
+    "pdf_extractor_upstream_seconds",
+    "Time to response headers for each OpenAI API attempt",
+    ["endpoint", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_RETRIES_TOTAL = Counter(
+    "pdf_extractor_upstream_retries_total",
+    "OpenAI API attempts retried, by reason (status code or error type)",
+    ["endpoint", "reason"],
+)
+UPSTREAM_HEDGES_TOTAL = Counter(
+    "pdf_extractor_upstream_hedges_total",
+    "Hedged duplicate OpenAI API requests, by outcome (won or lost)",
+    ["endpoint", "outcome"],
+)
+
+_current: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+
+
+class Trace:
+    """Stage spans and attributes of one document's trip through the pipeline."""
+
+    def __init__(self):
+        """Initialize an empty trace, starting its clock."""
+        self.spans: List[Tuple[str, float]] = []
+        self.attributes: Dict[str, Any] = {}
+        self._start = time.perf_counter()
+        self._finished = False
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """
+        Time a stage of the pipeline.
+
+        Args:
+            stage: Stage name, e.g. "extract" or "llm"
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((stage, time.perf_counter() - start))
+
+    def elapsed(self) -> float:
+        """Seconds since the trace started."""
+        return time.perf_counter() - self._start
+
+    def breakdown(self) -> Dict[str, float]:
+        """
+        Get the time spent per stage.
+
+        Returns:
+            dict: Milliseconds per stage, in first-seen order, plus "total"
+        """
+        timings: Dict[str, float] = {}
+        for stage, seconds in self.spans:
+            timings[stage] = timings.get(stage, 0.0) + seconds * 1000
+        timings["total"] = self.elapsed() * 1000
+        return {stage: round(ms, 2) for stage, ms in timings.items()}
+
+    def server_timing(self) -> str:
+        """Format the breakdown as a Server-Timing header value."""
+        return ", ".join(
+            f"{stage};dur={ms}" for stage, ms in self.breakdown().items()
+        )
+
+    def finish(self, outcome: str = "ok") -> None:
+        """
+        Record the trace in the Prometheus metrics.
+
+        Only the first call records anything, so callers may finish a trace
+        on both their success and error paths.
+
+        Args:
+            outcome: "ok", "cached" or "error"
+        """
+        if self._finished:
+            return
+        self._finished = True
+        mode = self.attributes.get("mode", "none")
+        for stage, seconds in self.spans:
+            STAGE_SECONDS.labels(stage=stage, mode=mode).observe(seconds)
+        DOCUMENT_SECONDS.labels(mode=mode, outcome=outcome).observe(self.elapsed())
+        if outcome == "ok":
+            MODE_TOTAL.labels(mode=mode).inc()
+            if "tokens" in self.attributes:
+                DOCUMENT_TOKENS.labels(mode=mode).observe(self.attributes["tokens"])
+            if "chunks" in self.attributes:
+                RAG_CHUNKS.observe(self.attributes["chunks"])
+
+
+def start_trace() -> Trace:
+    """
+    Start a trace and make it current for the running task.
+
+    Returns:
+        Trace: The new trace
+    """
+    trace = Trace()
+    _current.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    """Get the current task's trace, if one was started."""
+    return _current.get()
+
+
+@contextmanager
+def activate(trace: Trace) -> Iterator[Trace]:
+    """
+    Make a trace current for the duration of a block.
+
+    Used where several documents share one task, as in batch processing.
+
+    Args:
+        trace: Trace to make current
+    """
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """
+    Time a stage into the current trace; does nothing without one.
+
+    Args:
+        stage: Stage name, e.g. "extract" or "llm"
+    """
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    with trace.span(stage):
+        yield
+
+
+def annotate(**attributes: Any) -> None:
+    """Attach attributes such as mode, tokens or chunks to the current trace."""
+    trace = _current.get()
+    if trace is not None:
+        trace.attributes.update(attributes)
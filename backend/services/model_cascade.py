@@ -0,0 +1,253 @@
+"""
+Tiered model routing for extraction calls.
+
+Most transcripts are short and state their fields plainly, so a fast model
+answers them as well as a large one. The cascade sends each document to the
+first tier sized for it and only moves on to the next, larger model when
+the answer fails a structural check: GPA or intended major is missing. Test
+scores are not required, as many transcripts have none. The prompts ask
+for labelled lines, but the check also accepts the fields stated in prose.
+"""
+
+import re
+import time
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Union
+
+from .metrics import MODEL_CALLS_TOTAL, MODEL_SECONDS
+from .rule_extractor import rule_extractor
+
+# Part of the result cache key; bump when the check or routing changes
+CASCADE_VERSION = "3"
+
+# Markdown emphasis and list markers that hide "GPA: 3.85"-style labels
+_MARKUP = re.compile(r"[*_`#]|^\s*(?:[-•]|\d+[.)])\s+", re.MULTILINE)
+
+# Fields stated in a sentence ("a GPA of 3.85", "plans to major in
+# Biology"); majors must be capitalized as in prose
+_PROSE_FIELDS = {
+    "gpa": re.compile(
+        r"\b(?i:GPA|grade\s+point\s+average)\b[^\d\n.]{0,30}\d\.\d{1,3}\b"
+        r"|\b\d\.\d{1,3}\s+(?i:(?:cumulative|overall|weighted|unweighted)\s+)?"
+        r"(?i:GPA|grade\s+point\s+average)\b"
+    ),
+    "major": re.compile(
+        r"\b(?i:major(?:ing)?|stud(?:y|ying))\s+(?:(?i:is|in|of|will\s+be)\s+)*"
+        r"[A-Z][A-Za-z&'\-]+"
+    ),
+}
+
+
+def missing_fields(response: str) -> List[str]:
+    """
+    Check that an extraction answer states every required field.
+
+    Reads the answer with the rule extractor's patterns, so it accepts the
+    labelled lines the prompts ask for ("GPA: 3.85", "Intended Major: ..."),
+    with or without markdown; a field without a label still counts when a
+    sentence states it. SAT and ACT scores are optional: a transcript
+    without them is not a reason to ask a larger model.
+
+    Args:
+        response: Extraction answer from a model
+
+    Returns:
+        Missing fields among "gpa" and "major"; empty if the answer is
+        complete
+    """
+    text = _MARKUP.sub("", response)
+    fields = rule_extractor.extract(text).fields
+    return [
+        name
+        for name, pattern in _PROSE_FIELDS.items()
+        if name not in fields and not pattern.search(text)
+    ]
+
+
+class ModelTier:
+    """One model in the cascade and the largest document it starts on."""
+
+    def __init__(self, model: str, max_tokens: Optional[int] = None):
+        """
+        Initialize tier.
+
+        Args:
+            model: Chat model name
+            max_tokens: Largest document, in tokens, that starts at this
+                tier; None for any size
+        """
+        self.model = model
+        self.max_tokens = max_tokens
+
+    def __repr__(self) -> str:
+        limit = "" if self.max_tokens is None else f":{self.max_tokens}"
+        return f"ModelTier({self.model}{limit})"
+
+
+def parse_tiers(specs: List[str]) -> List[ModelTier]:
+    """
+    Parse MODEL_TIERS entries of the form "model" or "model:max_tokens".
+
+    Args:
+        specs: Tier entries, cheapest first
+
+    Returns:
+        List of tiers in the same order
+    """
+    tiers = []
+    for spec in specs:
+        model, sep, limit = spec.rpartition(":")
+        if sep and limit.isdigit():
+            tiers.append(ModelTier(model, int(limit)))
+        else:
+            tiers.append(ModelTier(spec))
+    return tiers
+
+
+class Escalation:
+    """Marks, in a streamed answer, that the output so far is discarded."""
+
+    def __init__(self, model: str, missing: List[str]):
+        """
+        Initialize escalation.
+
+        Args:
+            model: Model whose answer failed the check
+            missing: Fields the answer lacked
+        """
+        self.model = model
+        self.missing = missing
+
+
+class ModelCascade:
+    """
+    Runs an extraction call through ordered model tiers.
+
+    A document starts at the first tier whose max_tokens covers it; its
+    answer is checked and, while a field is missing and a larger tier
+    remains, the call is repeated on the next tier. The last tier's answer
+    is returned whether or not it passes.
+    """
+
+    def __init__(
+        self,
+        tiers: List[ModelTier],
+        check: Callable[[str], List[str]] = missing_fields,
+    ):
+        """
+        Initialize cascade.
+
+        Args:
+            tiers: Model tiers, cheapest first; the last must have no
+                max_tokens so every document has a tier
+            check: Returns the fields an answer lacks; empty passes
+
+        Raises:
+            ValueError: If there are no tiers or the last one is limited
+        """
+        if not tiers or tiers[-1].max_tokens is not None:
+            raise ValueError("The last model tier must take documents of any size")
+        self.tiers = tiers
+        self.check = check
+
+    def tiers_for(self, tokens: Optional[int]) -> List[ModelTier]:
+        """
+        Get the tiers a document may go through, in order.
+
+        Args:
+            tokens: Document size in tokens; None skips the size-limited tiers
+
+        Returns:
+            The first tier sized for the document and every tier after it
+        """
+        for index, tier in enumerate(self.tiers):
+            if tier.max_tokens is None or (tokens is not None and tokens <= tier.max_tokens):
+                return self.tiers[index:]
+        return self.tiers[-1:]
+
+    async def run(
+        self, tokens: Optional[int], call: Callable[[str], Awaitable[str]]
+    ) -> str:
+        """
+        Get an answer, escalating while it fails the check.
+
+        Args:
+            tokens: Document size in tokens
+            call: Runs the extraction on the named model
+
+        Returns:
+            The first complete answer, or the last tier's answer
+        """
+        tiers = self.tiers_for(tokens)
+        for index, tier in enumerate(tiers):
+            start = time.perf_counter()
+            response = await call(tier.model)
+            if not self._judge(tier, index == len(tiers) - 1, response, start):
+                return response
+        return response
+
+    async def stream(
+        self, tokens: Optional[int], open_stream: Callable[[str], AsyncIterator[str]]
+    ) -> AsyncIterator[Union[str, Escalation]]:
+        """
+        Stream an answer, escalating while it fails the check.
+
+        The check can only run once a tier's answer is complete, so its
+        pieces have already been yielded; an Escalation then tells the
+        consumer to discard them before the next tier's pieces follow.
+
+        Args:
+            tokens: Document size in tokens
+            open_stream: Streams the extraction from the named model
+
+        Yields:
+            Pieces of each tier's answer, with an Escalation between tiers
+        """
+        tiers = self.tiers_for(tokens)
+        for index, tier in enumerate(tiers):
+            start = time.perf_counter()
+            parts = []
+            async for piece in open_stream(tier.model):
+                parts.append(piece)
+                yield piece
+            missing = self._judge(tier, index == len(tiers) - 1, "".join(parts), start)
+            if not missing:
+                return
+            yield Escalation(tier.model, missing)
+
+    def run_sync(self, tokens: Optional[int], call: Callable[[str], str]) -> str:
+        """
+        Blocking variant of run, for the sync extraction calls.
+
+        Args:
+            tokens: Document size in tokens
+            call: Runs the extraction on the named model
+
+        Returns:
+            The first complete answer, or the last tier's answer
+        """
+        tiers = self.tiers_for(tokens)
+        for index, tier in enumerate(tiers):
+            start = time.perf_counter()
+            response = call(tier.model)
+            if not self._judge(tier, index == len(tiers) - 1, response, start):
+                return response
+        return response
+
+    def _judge(self, tier: ModelTier, last: bool, response: str, start: float) -> List[str]:
+        """
+        Record a tier's call and decide whether to escalate.
+
+        Returns:
+            The missing fields if the next tier should run, else empty
+        """
+        MODEL_SECONDS.labels(model=tier.model).observe(time.perf_counter() - start)
+        missing = self.check(response)
+        if not missing:
+            outcome = "accepted"
+        elif last:
+            outcome = "exhausted"
+            missing = []
+        else:
+            outcome = "escalated"
+        MODEL_CALLS_TOTAL.labels(model=tier.model, outcome=outcome).inc()
+        return missing
@@ -0,0 +1,475 @@
+"""
+HTTP layer under the OpenAI clients: pooling, deadlines, retries, hedging.
+
+Chat and embedding calls share one pool of keep-alive connections per
+client type. Retries with jittered backoff, the per-call deadline and
+hedged requests are applied here, below the OpenAI SDK (whose own retries
+are turned off), so chat completions, streams and embeddings all get the
+same policy.
+"""
+
+import asyncio
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+from backend.config import settings
+from .metrics import UPSTREAM_HEDGES_TOTAL, UPSTREAM_RETRIES_TOTAL, UPSTREAM_SECONDS
+
+if TYPE_CHECKING:
+    import openai
+
+# Statuses worth another attempt (the same ones the OpenAI SDK retries)
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+RETRY_ERRORS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+
+# Hedge once an attempt has taken longer than this quantile of recent ones
+HEDGE_QUANTILE = 0.95
+LATENCY_WINDOW = 200
+LATENCY_MIN_SAMPLES = 20
+
+_STREAM = re.compile(rb'"stream":\s*true')
+
+
+def _endpoint(request: httpx.Request) -> str:
+    """Metric label for the API operation a request calls."""
+    path = request.url.path
+    if path.endswith("/chat/completions"):
+        try:
+            streaming = _STREAM.search(request.content) is not None
+        except httpx.RequestNotRead:
+            streaming = False
+        return "chat_stream" if streaming else "chat"
+    if path.endswith("/embeddings"):
+        return "embeddings"
+    return "other"
+
+
+class RetryPolicy:
+    """When and how long to wait before retrying an OpenAI API call."""
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        deadline: float = 60.0,
+    ):
+        """
+        Initialize policy.
+
+        Args:
+            max_retries: Retries after the first attempt
+            backoff_base: Backoff ceiling in seconds before the first retry;
+                doubles for each retry after that
+            backoff_max: Largest backoff ceiling in seconds
+            deadline: Seconds a call may take in total, retries included
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+
+    @classmethod
+    def from_settings(cls) -> "RetryPolicy":
+        """Build the policy from the LLM_* settings."""
+        return cls(
+            max_retries=settings.LLM_MAX_RETRIES,
+            backoff_base=settings.LLM_BACKOFF_BASE,
+            backoff_max=settings.LLM_BACKOFF_MAX,
+            deadline=settings.LLM_TIMEOUT,
+        )
+
+    @staticmethod
+    def retryable(response: httpx.Response) -> bool:
+        """Whether a response status is worth another attempt."""
+        return response.status_code in RETRY_STATUSES
+
+    def delay(self, retry: int, response: Optional[httpx.Response]) -> float:
+        """
+        Seconds to wait before a retry.
+
+        Full-jitter exponential backoff, stretched to the server's
+        Retry-After when that is longer.
+
+        Args:
+            retry: Number of retries already made
+            response: Response being retried, if any
+
+        Returns:
+            Delay in seconds
+        """
+        ceiling = min(self.backoff_max, self.backoff_base * 2**retry)
+        delay = random.uniform(0, ceiling)
+        if response is not None:
+            retry_after = _retry_after(response)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+        return delay
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds the server asked to wait, from retry-after-ms or Retry-After."""
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = response.headers.get(header)
+        if value is not None:
+            try:
+                return max(0.0, float(value) * scale)
+            except ValueError:
+                pass  # HTTP dates are not worth parsing here
+    return None
+
+
+class LatencyTracker:
+    """Recent successful attempt latencies per endpoint."""
+
+    def __init__(self, window: int = LATENCY_WINDOW, min_samples: int = LATENCY_MIN_SAMPLES):
+        """
+        Initialize tracker.
+
+        Args:
+            window: Latencies kept per endpoint
+            min_samples: Latencies needed before a quantile is reported
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint: str, seconds: float) -> None:
+        """Record one attempt's latency."""
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def quantile(self, endpoint: str, q: float) -> Optional[float]:
+        """
+        Latency quantile for an endpoint.
+
+        Returns:
+            Seconds, or None until min_samples latencies are recorded
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def _observe(
+    latencies: LatencyTracker, endpoint: str, status: str, seconds: float
+) -> None:
+    UPSTREAM_SECONDS.labels(endpoint=endpoint, status=status).observe(seconds)
+    if status.startswith(("2", "3")):
+        latencies.observe(endpoint, seconds)
+
+
+def _deadline_exceeded(request: httpx.Request) -> httpx.TimeoutException:
+    return httpx.TimeoutException("OpenAI API call deadline exceeded", request=request)
+
+
+class _DeadlineStream(httpx.AsyncByteStream):
+    """Response body whose reads share the call's deadline."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, deadline: float, request: httpx.Request):
+        self.stream = stream
+        self.deadline = deadline
+        self.request = request
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        chunks = self.stream.__aiter__()
+        while True:
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0:
+                raise _deadline_exceeded(self.request)
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                raise _deadline_exceeded(self.request) from None
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self.stream.aclose()
+
+
+class RetryingAsyncTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport adding the retry policy, a deadline and hedging.
+
+    The deadline covers the whole call: waiting for each attempt's headers,
+    the backoff between attempts and reading the response body, so a
+    streamed completion that stalls partway is cut off too.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        policy: RetryPolicy,
+        hedge: bool = False,
+        hedge_min_delay: float = 1.0,
+        latencies: Optional[LatencyTracker] = None,
+    ):
+        """
+        Initialize transport.
+
+        Args:
+            transport: Pooled transport that sends the requests
+            policy: Retry policy and deadline
+            hedge: Send a duplicate request when an attempt is slower than
+                the endpoint's recent HEDGE_QUANTILE latency
+            hedge_min_delay: Never hedge before this many seconds
+            latencies: Latency history to hedge on
+        """
+        self.transport = transport
+        self.policy = policy
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.latencies = latencies or LatencyTracker()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = _endpoint(request)
+        deadline = time.monotonic() + self.policy.deadline
+        retry = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise _deadline_exceeded(request)
+            response: Optional[httpx.Response] = None
+            try:
+                response = await asyncio.wait_for(self._send(request, endpoint), remaining)
+            except asyncio.TimeoutError:
+                raise _deadline_exceeded(request) from None
+            except RETRY_ERRORS as e:
+                error: Optional[Exception] = e
+                reason = type(e).__name__
+            else:
+                if not self.policy.retryable(response):
+                    return self._until(response, request, deadline)
+                error = None
+                reason = str(response.status_code)
+
+            delay = self.policy.delay(retry, response)
+            if retry >= self.policy.max_retries or time.monotonic() + delay >= deadline:
+                if error is not None:
+                    raise error
+                # The SDK raises the matching APIError
+                return self._until(response, request, deadline)
+            UPSTREAM_RETRIES_TOTAL.labels(endpoint=endpoint, reason=reason).inc()
+            if response is not None:
+                await response.aclose()
+            await asyncio.sleep(delay)
+            retry += 1
+
+    @staticmethod
+    def _until(
+        response: httpx.Response, request: httpx.Request, deadline: float
+    ) -> httpx.Response:
+        """Bound the reads of a response's body by the call's deadline."""
+        response.stream = _DeadlineStream(response.stream, deadline, request)
+        return response
+
+    async def _attempt(self, request: httpx.Request, endpoint: str) -> httpx.Response:
+        """Send one attempt, recording its latency."""
+        start = time.monotonic()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception:
+            _observe(self.latencies, endpoint, "error", time.monotonic() - start)
+            raise
+        _observe(self.latencies, endpoint, str(response.status_code), time.monotonic() - start)
+        return response
+
+    async def _send(self, request: httpx.Request, endpoint: str) -> httpx.Response:
+        """Send one attempt, hedged with a duplicate if it runs slow."""
+        delay = None
+        if self.hedge:
+            delay = self.latencies.quantile(endpoint, HEDGE_QUANTILE)
+        if delay is None:
+            return await self._attempt(request, endpoint)
+
+        tasks: List[asyncio.Task] = [
+            asyncio.ensure_future(self._attempt(request, endpoint))
+        ]
+        kept: Optional[httpx.Response] = None
+        try:
+            await asyncio.wait(tasks, timeout=max(delay, self.hedge_min_delay))
+            if not tasks[0].done():
+                tasks.append(asyncio.ensure_future(self._attempt(request, endpoint)))
+
+            # Take the first response that needs no retry; failing that,
+            # the last response, and failing that, the last error
+            error: Optional[Exception] = None
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    response = await next_done
+                except RETRY_ERRORS as e:
+                    error = e
+                    continue
+                if kept is not None:
+                    await kept.aclose()
+                kept = response
+                if not self.policy.retryable(response):
+                    break
+
+            if len(tasks) > 1:
+                hedge = tasks[1]
+                won = (
+                    kept is not None
+                    and hedge.done()
+                    and not hedge.cancelled()
+                    and hedge.exception() is None
+                    and hedge.result() is kept
+                )
+                UPSTREAM_HEDGES_TOTAL.labels(
+                    endpoint=endpoint, outcome="won" if won else "lost"
+                ).inc()
+            if kept is None:
+                raise error
+            return kept
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif (
+                    not task.cancelled()
+                    and task.exception() is None
+                    and task.result() is not kept
+                ):
+                    await task.result().aclose()
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class RetryingTransport(httpx.BaseTransport):
+    """
+    Sync transport adding the retry policy and deadline.
+
+    Hedging needs concurrent attempts, so it is only done by the async
+    transport; the sync clients serve the legacy blocking calls. The
+    deadline is checked between attempts; a single attempt, body included,
+    is bounded by the client's read timeout.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, policy: RetryPolicy):
+        """
+        Initialize transport.
+
+        Args:
+            transport: Pooled transport that sends the requests
+            policy: Retry policy and deadline
+        """
+        self.transport = transport
+        self.policy = policy
+        self.latencies = LatencyTracker()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = _endpoint(request)
+        deadline = time.monotonic() + self.policy.deadline
+        retry = 0
+        while True:
+            if time.monotonic() >= deadline:
+                raise _deadline_exceeded(request)
+            response: Optional[httpx.Response] = None
+            start = time.monotonic()
+            try:
+                response = self.transport.handle_request(request)
+            except RETRY_ERRORS as e:
+                _observe(self.latencies, endpoint, "error", time.monotonic() - start)
+                error: Optional[Exception] = e
+                reason = type(e).__name__
+            else:
+                status = str(response.status_code)
+                _observe(self.latencies, endpoint, status, time.monotonic() - start)
+                if not self.policy.retryable(response):
+                    return response
+                error = None
+                reason = status
+
+            delay = self.policy.delay(retry, response)
+            if retry >= self.policy.max_retries or time.monotonic() + delay >= deadline:
+                if error is not None:
+                    raise error
+                return response
+            UPSTREAM_RETRIES_TOTAL.labels(endpoint=endpoint, reason=reason).inc()
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+            retry += 1
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+def build_openai_clients(
+    base_url: Optional[str] = None,
+    policy: Optional[RetryPolicy] = None,
+    hedge: Optional[bool] = None,
+    hedge_min_delay: Optional[float] = None,
+) -> Tuple["openai.OpenAI", "openai.AsyncOpenAI"]:
+    """
+    Create the sync and async OpenAI clients over pooled, retrying transports.
+
+    Pool sizes, timeouts, retries and hedging come from the LLM_* settings
+    unless overridden.
+
+    Args:
+        base_url: API base URL; defaults to settings.OPENAI_BASE_URL, or
+            the OpenAI API if that is empty
+        policy: Retry policy; defaults to RetryPolicy.from_settings()
+        hedge: Hedge slow async calls; defaults to settings.LLM_HEDGE
+        hedge_min_delay: Hedging floor in seconds; defaults to
+            settings.LLM_HEDGE_MIN_DELAY
+
+    Returns:
+        (sync client, async client)
+    """
+    import openai
+
+    policy = policy or RetryPolicy.from_settings()
+    limits = httpx.Limits(
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+    )
+    # One attempt may use the whole deadline; the transports stop retrying
+    # once it has passed
+    timeout = httpx.Timeout(policy.deadline, connect=settings.LLM_CONNECT_TIMEOUT)
+    options = {
+        "api_key": settings.OPENAI_API_KEY,
+        "base_url": base_url or settings.OPENAI_BASE_URL or None,
+        "timeout": timeout,
+        "max_retries": 0,
+    }
+
+    sync_client = openai.OpenAI(
+        http_client=httpx.Client(
+            transport=RetryingTransport(httpx.HTTPTransport(limits=limits), policy),
+            timeout=timeout,
+        ),
+        **options,
+    )
+    async_client = openai.AsyncOpenAI(
+        http_client=httpx.AsyncClient(
+            transport=RetryingAsyncTransport(
+                httpx.AsyncHTTPTransport(limits=limits),
+                policy,
+                hedge=settings.LLM_HEDGE if hedge is None else hedge,
+                hedge_min_delay=(
+                    settings.LLM_HEDGE_MIN_DELAY if hedge_min_delay is None else hedge_min_delay
+                ),
+            ),
+            timeout=timeout,
+        ),
+        **options,
+    )
+    return sync_client, async_client
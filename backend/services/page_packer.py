@@ -0,0 +1,49 @@
+"""
+Token-budget page packing for documents just over MAX_TOKENS.
+
+Instead of sending a mid-sized document through RAG, the pages most
+relevant to the applicant fields are packed into one direct prompt, up to
+the direct-mode token budget.
+"""
+
+from typing import List
+
+from .pdf_processor import PageTokens
+
+# Scored against each page: only the terms fields are labelled with, so
+# pages without any of them score zero and the document falls back to RAG
+PACK_QUERY = "GPA cumulative intended major SAT ACT composite score scores"
+
+
+def pack_pages(pages: List[str], page_tokens: PageTokens, budget: int) -> List[int]:
+    """
+    Choose the pages to send when the whole document does not fit.
+
+    Pages are ranked by BM25 relevance to PACK_QUERY (pages with no match
+    follow in document order) and added greedily while they fit in the
+    budget; a page too large for the remaining budget is skipped in favour
+    of smaller ones further down the ranking.
+
+    Args:
+        pages: Text of each page
+        page_tokens: Tokens of the same pages, from PDFProcessor.encode_pages
+        budget: Token budget for the packed text
+
+    Returns:
+        Indexes of the chosen pages, in document order; empty if no page
+        shares a term with PACK_QUERY or none fits
+    """
+    from .lexical_retriever import BM25Index
+
+    ranked = BM25Index(pages).search(PACK_QUERY, len(pages))
+    if not ranked or ranked[0][1] <= 0:
+        return []
+
+    chosen: List[int] = []
+    remaining = budget
+    for index, _ in ranked:
+        size = len(page_tokens.pages[index])
+        if size <= remaining:
+            chosen.append(index)
+            remaining -= size
+    return sorted(chosen)
@@ -1,11 +1,95 @@
 """PDF generation service."""
 
 import os
-from fpdf import FPDF
-from typing import Optional
+import threading
+from bisect import bisect_right
+from itertools import accumulate
+from typing import TYPE_CHECKING, Dict, Iterator, List, Sequence, Tuple
 
 from backend.config import settings
 
+if TYPE_CHECKING:
+    from fpdf import FPDF
+
+FONT_FAMILY = "Arial"
+FONT_SIZE = 12
+TITLE_SIZE = 14
+LINE_HEIGHT = 10
+
+# Word widths cached per font before the cache is reset
+_MAX_CACHED_WORDS = 100_000
+
+
+class _FontMetrics:
+    """Glyph widths of a core font, with a cache of measured words."""
+
+    def __init__(self, char_widths: Dict[str, int]):
+        """
+        Initialize font metrics.
+
+        Args:
+            char_widths: Width of each character in 1/1000 of the font size
+        """
+        self.char_widths = char_widths
+        self.space = char_widths[" "]
+        self._words: Dict[str, int] = {}
+
+    def measure(self, text: str) -> int:
+        """
+        Measure text.
+
+        Args:
+            text: Text without line breaks
+
+        Returns:
+            Width in 1/1000 of the font size
+        """
+        return sum(map(self.char_widths.__getitem__, text))
+
+    def word_width(self, word: str) -> int:
+        """
+        Measure a word, caching the result for later lines and reports.
+
+        Args:
+            word: Word without spaces
+
+        Returns:
+            Width in 1/1000 of the font size
+        """
+        width = self._words.get(word)
+        if width is None:
+            if len(self._words) >= _MAX_CACHED_WORDS:
+                self._words.clear()
+            width = self._words[word] = self.measure(word)
+        return width
+
+
+class _Buffer:
+    """
+    Append-only PDF output buffer.
+
+    FPDF 1.7 grows its document buffer with ``self.buffer += s``, which
+    copies the whole document on every object and makes output quadratic
+    in document size. This stand-in supports the two operations FPDF uses,
+    ``+=`` and ``len()``, in constant time.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._length = 0
+
+    def __iadd__(self, text: str) -> "_Buffer":
+        self._parts.append(text)
+        self._length += len(text)
+        return self
+
+    def __len__(self) -> int:
+        return self._length
+
+    def getvalue(self) -> str:
+        """Get the buffered document."""
+        return "".join(self._parts)
+
 
 class PDFGenerator:
     """Service for generating PDF reports."""
@@ -14,6 +98,44 @@ class PDFGenerator:
         """Initialize PDF generator."""
         # Ensure output directory exists
         os.makedirs(settings.OUTPUT_DIR, exist_ok=True)
+        self._metrics: Dict[str, _FontMetrics] = {}
+        self._lock = threading.Lock()
+
+    def render(self, content: str) -> bytes:
+        """
+        Render a PDF report from text content in memory.
+
+        Args:
+            content: Text content to include in PDF
+
+        Returns:
+            PDF file content as bytes
+        """
+        pdf = self._new_document()
+        self._write_text(pdf, content)
+        return self._output(pdf)
+
+    def render_summary(self, sections: Sequence[Tuple[str, str]]) -> bytes:
+        """
+        Render several titled sections into one PDF in a single pass.
+
+        Used for multi-applicant summary reports.
+
+        Args:
+            sections: (title, content) pairs, in order
+
+        Returns:
+            PDF file content as bytes
+        """
+        pdf = self._new_document()
+        for index, (title, content) in enumerate(sections):
+            if index:
+                self._write_lines(pdf, [""])
+            pdf.set_font(FONT_FAMILY, "B", TITLE_SIZE)
+            self._write_text(pdf, title)
+            pdf.set_font(FONT_FAMILY, size=FONT_SIZE)
+            self._write_text(pdf, content)
+        return self._output(pdf)
 
     def generate_report(self, content: str, output_filename: str = "output.pdf") -> str:
         """
@@ -26,40 +148,139 @@ class PDFGenerator:
         Returns:
             Path to generated PDF file
         """
+        output_path = os.path.join(settings.OUTPUT_DIR, output_filename)
+        with open(output_path, "wb") as f:
+            f.write(self.render(content))
+        return output_path
+
+    def warmup(self) -> None:
+        """Import fpdf and load the report font metrics ahead of the first report."""
+        pdf = self._new_document()
+        self._font_metrics(pdf)
+        pdf.set_font(FONT_FAMILY, "B", TITLE_SIZE)
+        self._font_metrics(pdf)
+
+    def _new_document(self) -> "FPDF":
+        """Create a document with one page and the body font selected."""
+        from fpdf import FPDF
+
         pdf = FPDF()
+        pdf.buffer = _Buffer()
         pdf.add_page()
-        pdf.set_font("Arial", size=12)
+        pdf.set_font(FONT_FAMILY, size=FONT_SIZE)
+        return pdf
 
-        lines = content.split("\n")
-        for line in lines:
-            self._add_line_to_pdf(pdf, line)
+    @staticmethod
+    def _output(pdf: "FPDF") -> bytes:
+        """Finish the document and return its bytes."""
+        pdf.close()
+        return pdf.buffer.getvalue().encode("latin-1")
 
-        output_path = os.path.join(settings.OUTPUT_DIR, output_filename)
-        pdf.output(output_path, "F")
-        return output_path
+    def _font_metrics(self, pdf: "FPDF") -> _FontMetrics:
+        """Get the shared metrics of the document's current font."""
+        key = pdf.font_family + pdf.font_style
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            with self._lock:
+                metrics = self._metrics.setdefault(
+                    key, _FontMetrics(pdf.current_font["cw"])
+                )
+        return metrics
 
-    def _add_line_to_pdf(self, pdf: FPDF, line: str, max_width: int = 80) -> None:
+    def _write_text(self, pdf: "FPDF", content: str) -> None:
+        """Wrap content to the page width and write it in the current font."""
+        metrics = self._font_metrics(pdf)
+        # Core fonts only cover Latin-1
+        content = content.encode("latin-1", "replace").decode("latin-1")
+        usable = pdf.w - pdf.l_margin - pdf.r_margin - 2 * pdf.c_margin
+        max_width = usable * 1000 / pdf.font_size
+        lines: List[str] = []
+        for line in content.split("\n"):
+            lines.extend(self._wrap(line, metrics, max_width))
+        self._write_lines(pdf, lines)
+
+    @staticmethod
+    def _wrap(line: str, metrics: _FontMetrics, max_width: float) -> Iterator[str]:
         """
-        Add a line to PDF with word wrapping.
+        Word-wrap a line using glyph widths.
+
+        Each word is measured once (and cached across reports). Break points
+        come from a binary search over cumulative widths, so no line is
+        built up by repeated string concatenation. Lines that fit are kept
+        verbatim, including indentation; words wider than a full line are
+        broken between characters.
 
         Args:
-            pdf: FPDF instance
-            line: Line of text to add
-            max_width: Maximum characters per line
-        """
-        if len(line) > max_width:
-            words = line.split()
-            current_line = ""
-            for word in words:
-                if len(current_line + " " + word) < max_width:
-                    current_line += " " + word
-                else:
-                    pdf.cell(0, 10, txt=current_line.strip(), ln=True, align="L")
-                    current_line = word
-            if current_line:
-                pdf.cell(0, 10, txt=current_line.strip(), ln=True, align="L")
-        else:
-            pdf.cell(0, 10, txt=line, ln=True, align="L")
+            line: Line of text without line breaks
+            metrics: Metrics of the font the line is set in
+            max_width: Available width in 1/1000 of the font size
+
+        Yields:
+            Wrapped lines
+        """
+        words = line.split()
+        widths = list(map(metrics.word_width, words))
+        space = metrics.space
+        if sum(widths) + space * (len(words) - 1) <= max_width and (
+            metrics.measure(line) <= max_width
+        ):
+            yield line
+            return
+
+        if widths and max(widths) > max_width:
+            words, widths = PDFGenerator._split_wide_words(words, widths, metrics, max_width)
+
+        # ends[i] is the width of words[:i + 1], each followed by a space
+        ends = list(accumulate(width + space for width in widths))
+        start, offset = 0, 0
+        while start < len(words):
+            stop = bisect_right(ends, offset + max_width + space, lo=start + 1)
+            yield " ".join(words[start:stop])
+            start, offset = stop, ends[stop - 1]
+
+    @staticmethod
+    def _split_wide_words(
+        words: List[str], widths: List[int], metrics: _FontMetrics, max_width: float
+    ) -> Tuple[List[str], List[int]]:
+        """Break words wider than max_width into pieces that fit."""
+        out_words: List[str] = []
+        out_widths: List[int] = []
+        for word, width in zip(words, widths):
+            if width <= max_width:
+                out_words.append(word)
+                out_widths.append(width)
+                continue
+            piece_start, piece_width = 0, 0
+            for i, char in enumerate(word):
+                char_width = metrics.char_widths[char]
+                if piece_width + char_width > max_width and i > piece_start:
+                    out_words.append(word[piece_start:i])
+                    out_widths.append(piece_width)
+                    piece_start, piece_width = i, 0
+                piece_width += char_width
+            out_words.append(word[piece_start:])
+            out_widths.append(piece_width)
+        return out_words, out_widths
+
+    @staticmethod
+    def _write_lines(pdf: "FPDF", lines: Sequence[str]) -> None:
+        """
+        Write pre-wrapped lines, breaking pages as needed.
+
+        Lines are placed where pdf.cell(0, LINE_HEIGHT, line, ln=True) would
+        put them, but without its per-call measuring and bookkeeping.
+        """
+        x = pdf.l_margin + pdf.c_margin
+        baseline = 0.5 * LINE_HEIGHT + 0.3 * pdf.font_size
+        y = pdf.y
+        for line in lines:
+            if y + LINE_HEIGHT > pdf.page_break_trigger:
+                pdf.add_page()
+                y = pdf.y
+            if line:
+                pdf.text(x, y + baseline, line)
+            y += LINE_HEIGHT
+        pdf.set_xy(pdf.l_margin, y)
 
 
 pdf_generator = PDFGenerator()
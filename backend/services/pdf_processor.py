@@ -1,25 +1,176 @@
-"""PDF processing service."""
+"""
+PDF processing service.
 
-import fitz
-import tiktoken
-from typing import Tuple
+PyMuPDF and the tiktoken encoding are loaded on first use.
+"""
+
+import threading
+from typing import TYPE_CHECKING, List, Optional, Union
 
 from backend.config import settings
+from backend.utils.concurrency import get_process_pool
+
+if TYPE_CHECKING:
+    import fitz
+
+
+def _open(source: Union[bytes, str]) -> "fitz.Document":
+    """Open a PDF from bytes or a file path."""
+    import fitz
+
+    if isinstance(source, str):
+        return fitz.open(source, filetype="pdf")
+    return fitz.open(stream=source, filetype="pdf")
+
+
+def extract_page_range(source: Union[bytes, str], start: int, stop: int) -> List[str]:
+    """
+    Extract text from a range of pages.
+
+    Module-level so shards can run in a process pool; each worker opens
+    the document independently.
+
+    Args:
+        source: PDF file content as bytes, or a path to the PDF file
+        start: First page index (inclusive)
+        stop: Last page index (exclusive)
+
+    Returns:
+        Text of each page in the range, in order
+    """
+    doc = _open(source)
+    try:
+        return [doc[i].get_text() for i in range(start, stop)]
+    finally:
+        doc.close()
+
+
+def extract_pages(source: Union[bytes, str], parallel: bool = True) -> List[str]:
+    """
+    Extract text from every page of a PDF.
+
+    Documents with at least settings.PARALLEL_EXTRACT_MIN_PAGES pages are
+    split into contiguous page ranges that are extracted across the shared
+    process pool and reassembled in order. Smaller documents are extracted
+    serially, where process start-up and pickling would cost more than
+    they save.
+
+    Args:
+        source: PDF file content as bytes, or a path to the PDF file
+        parallel: Allow sharding across the process pool
+
+    Returns:
+        Text of each page, in order
+
+    Raises:
+        ValueError: If PDF is empty or invalid
+    """
+    try:
+        doc = _open(source)
+        try:
+            page_count = doc.page_count
+            shards = min(settings.PROCESS_WORKERS, page_count)
+            if (
+                not parallel
+                or shards < 2
+                or page_count < settings.PARALLEL_EXTRACT_MIN_PAGES
+            ):
+                pages = [page.get_text() for page in doc]
+            else:
+                pages = None
+        finally:
+            doc.close()
+
+        if pages is None:
+            bounds = [page_count * i // shards for i in range(shards + 1)]
+            pool = get_process_pool()
+            futures = [
+                pool.submit(extract_page_range, source, start, stop)
+                for start, stop in zip(bounds, bounds[1:])
+            ]
+            pages = [text for future in futures for text in future.result()]
+
+        if not any(text.strip() for text in pages):
+            raise ValueError("PDF appears to be empty or contains no extractable text")
+
+        return pages
+    except Exception as e:
+        raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+
+
+def extract_text(source: Union[bytes, str], parallel: bool = True) -> str:
+    """
+    Extract text from a PDF.
+
+    Module-level so it can be shipped to a process pool.
+
+    Args:
+        source: PDF file content as bytes, or a path to the PDF file
+        parallel: Allow sharding pages across the process pool
+
+    Returns:
+        Extracted text from all pages
+
+    Raises:
+        ValueError: If PDF is empty or invalid
+    """
+    return "\n".join(extract_pages(source, parallel))
+
+
+class PageTokens:
+    """
+    Token ids of a document, kept per page.
+
+    Page boundaries are treated as token boundaries: each page is encoded
+    on its own together with the newline that joins it to the next page.
+    The total is exact for that segmentation and can differ from encoding
+    the joined text at once by at most one token per page boundary.
+    """
+
+    def __init__(self, pages: List[List[int]], complete: bool = True):
+        """
+        Initialize page tokens.
+
+        Args:
+            pages: Token ids of each encoded page
+            complete: False if encoding stopped before the last page
+        """
+        self.pages = pages
+        self.complete = complete
+        self.total = sum(len(tokens) for tokens in pages)
 
 
 class PDFProcessor:
     """Service for processing PDF files."""
 
     def __init__(self):
-        """Initialize PDF processor."""
-        self.encoder = tiktoken.encoding_for_model(settings.MODEL_NAME)
+        """Initialize PDF processor. The encoder is loaded on first use."""
+        self._encoder = None
+        self._lock = threading.Lock()
+
+    @property
+    def encoder(self):
+        """tiktoken encoding for settings.MODEL_NAME, loaded on first access."""
+        if self._encoder is None:
+            with self._lock:
+                if self._encoder is None:
+                    import tiktoken
+
+                    self._encoder = tiktoken.encoding_for_model(settings.MODEL_NAME)
+        return self._encoder
+
+    def warmup(self) -> None:
+        """Load PyMuPDF and the tiktoken encoding ahead of the first request."""
+        import fitz  # noqa: F401
 
-    def extract_text(self, pdf_bytes: bytes) -> str:
+        self.encoder
+
+    def extract_text(self, source: Union[bytes, str]) -> str:
         """
-        Extract text from PDF bytes.
+        Extract text from a PDF.
 
         Args:
-            pdf_bytes: PDF file content as bytes
+            source: PDF file content as bytes, or a path to the PDF file
 
         Returns:
             Extracted text from all pages
@@ -27,19 +178,22 @@ class PDFProcessor:
         Raises:
             ValueError: If PDF is empty or invalid
         """
-        try:
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-            text = "\n".join([page.get_text() for page in doc])
-            doc.close()
+        return extract_text(source)
 
-            if not text.strip():
-                raise ValueError(
-                    "PDF appears to be empty or contains no extractable text"
-                )
+    def extract_pages(self, source: Union[bytes, str]) -> List[str]:
+        """
+        Extract the text of each page of a PDF.
 
-            return text
-        except Exception as e:
-            raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+        Args:
+            source: PDF file content as bytes, or a path to the PDF file
+
+        Returns:
+            Text of each page, in order
+
+        Raises:
+            ValueError: If PDF is empty or invalid
+        """
+        return extract_pages(source)
 
     def count_tokens(self, text: str) -> int:
         """
@@ -51,7 +205,47 @@ class PDFProcessor:
         Returns:
             Number of tokens
         """
-        return len(self.encoder.encode(text))
+        return len(self.encoder.encode_ordinary(text))
+
+    def encode_pages(self, pages: List[str], limit: Optional[int] = None) -> PageTokens:
+        """
+        Encode a document page by page in a single pass.
+
+        The per-page token arrays are kept so later stages (chunking, budget
+        packing) can reuse them without encoding again.
+
+        Args:
+            pages: Text of each page, as returned by extract_pages
+            limit: Stop once more than this many tokens have been seen
+
+        Returns:
+            PageTokens for the encoded pages
+        """
+        encoded: List[List[int]] = []
+        total = 0
+        last = len(pages) - 1
+        for index, page in enumerate(pages):
+            tokens = self.encoder.encode_ordinary(page if index == last else page + "\n")
+            encoded.append(tokens)
+            total += len(tokens)
+            if limit is not None and total > limit and index < last:
+                return PageTokens(encoded, complete=False)
+        return PageTokens(encoded)
+
+    def exceeds_token_limit(self, pages: List[str]) -> bool:
+        """
+        Decide the processing mode without encoding the whole document.
+
+        For callers that need only the mode: encoding stops at the first
+        page that crosses settings.MAX_TOKENS.
+
+        Args:
+            pages: Text of each page
+
+        Returns:
+            True if RAG should be used, False otherwise
+        """
+        return self.should_use_rag(self.encode_pages(pages, limit=settings.MAX_TOKENS).total)
 
     def should_use_rag(self, token_count: int) -> bool:
         """
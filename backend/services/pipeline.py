@@ -0,0 +1,557 @@
+"""Document processing pipeline shared by the API endpoints."""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from backend.config import settings
+from backend.utils import SpooledUpload, run_blocking, run_in_process
+from .pdf_processor import pdf_processor, extract_pages
+from .llm_service import llm_service
+from .pdf_generator import pdf_generator
+from .report_store import report_store
+from .result_cache import result_cache
+from .metrics import Trace, activate, annotate, current_trace, span
+from .admission import OverloadedError, admission
+from .singleflight import FlightAbandoned, singleflight
+from .rule_extractor import rule_extractor
+from .text_normalizer import normalize_pages
+from .page_packer import pack_pages
+from .model_cascade import Escalation
+from .metrics import PACKED_SHARE, RAG_AVOIDED_TOTAL, RULES_TOTAL, TOKENS_SAVED
+
+REPORT_URL = "/api/v1/reports/{report_id}"
+
+
+async def render_report(response: str) -> Dict[str, str]:
+    """
+    Render a report in memory and add it to the report store.
+
+    Args:
+        response: Extracted information to render
+
+    Returns:
+        dict: report_id, report_url and output_file of the stored report
+    """
+    with span("render"):
+        pdf_bytes = await run_blocking(pdf_generator.render, response)
+        return await _store_report(pdf_bytes)
+
+
+async def _store_report(pdf_bytes: bytes) -> Dict[str, str]:
+    """Add a rendered report to the report store."""
+    report_id = await run_blocking(report_store.put, pdf_bytes)
+    return {
+        "report_id": report_id,
+        "report_url": REPORT_URL.format(report_id=report_id),
+        "output_file": report_store.path_for(report_id),
+    }
+
+
+async def process_document(
+    upload: SpooledUpload, wait_for_capacity: bool = False
+) -> Dict[str, Any]:
+    """
+    Run extraction, token counting and LLM extraction for one document.
+
+    Each stage is timed into the current trace, if the caller started one
+    (see metrics.start_trace). The LLM stage is weighted by the document's
+    token count against the global in-flight limit. Documents somewhat over
+    MAX_TOKENS send only their most relevant pages (mode "packed") rather
+    than going through RAG. A document identical to one already being
+    processed shares that run instead of starting its own.
+
+    Args:
+        upload: Validated, spooled PDF upload
+        wait_for_capacity: Wait for in-flight capacity instead of shedding
+
+    Returns:
+        dict: tokens, mode, response and whether the result came from cache
+
+    Raises:
+        OverloadedError: If the server is at capacity and wait_for_capacity
+            is false
+    """
+    cache_key = result_cache.make_key_from_digest(upload.sha256)
+    if settings.RESULT_CACHE_ENABLED:
+        cached = await result_cache.aget(cache_key)
+        if cached is not None:
+            annotate(mode=cached["mode"], tokens=cached["tokens"])
+            return {**cached, "cached": True}
+
+    shared = await singleflight.wait(cache_key)
+    if shared is not None:
+        annotate(mode=shared["mode"], tokens=shared["tokens"])
+        return {**shared, "cached": False}
+
+    async with singleflight.leading(cache_key, abandon_on=(OverloadedError,)) as flight:
+        result = await _run_pipeline(upload, wait_for_capacity)
+        flight.set_result(result)
+        if settings.RESULT_CACHE_ENABLED:
+            await result_cache.aput(cache_key, result)
+    return {**result, "cached": False}
+
+
+async def _run_pipeline(upload: SpooledUpload, wait_for_capacity: bool) -> Dict[str, Any]:
+    """Extract, count tokens and run the LLM; see process_document."""
+    with span("extract"):
+        pages = await run_blocking(pdf_processor.extract_pages, upload.source)
+    prepared = await _prepare(pages)
+    result = prepared["result"]
+    if result["mode"] == "rules":
+        return result
+
+    async with admission.admit(_llm_cost(result), wait_for_capacity):
+        if result["mode"] == "RAG":
+            response = await llm_service.aextract_with_rag(
+                prepared["chunks"], tokens=result["tokens"]
+            )
+        else:
+            response = await llm_service.aextract_direct(prepared["text"], result["tokens"])
+    return {**result, "response": response}
+
+
+async def stream_document(
+    upload: SpooledUpload,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Run the pipeline for one document, reporting progress as it goes.
+
+    Yields stage events as each stage completes, then the LLM output piece
+    by piece, then the final result. Cached results, and results shared
+    with an identical document already being processed, are replayed as a
+    single piece of output.
+
+    Args:
+        upload: Validated, spooled PDF upload
+
+    Yields:
+        (event, data) pairs: "extracted", "tokens", "mode", "token" (one per
+        output piece), "escalated" when the model cascade discards the
+        output so far for a larger model's, and finally "result"
+
+    Raises:
+        OverloadedError: If the server is at capacity when the LLM stage
+            would start
+    """
+    cache_key = result_cache.make_key_from_digest(upload.sha256)
+    if settings.RESULT_CACHE_ENABLED:
+        cached = await result_cache.aget(cache_key)
+        if cached is not None:
+            annotate(mode=cached["mode"], tokens=cached["tokens"])
+            for event in _replay(cached, cached=True):
+                yield event
+            return
+
+    shared = await singleflight.wait(cache_key)
+    if shared is not None:
+        annotate(mode=shared["mode"], tokens=shared["tokens"])
+        for event in _replay(shared, cached=False):
+            yield event
+        return
+
+    async with singleflight.leading(cache_key, abandon_on=(OverloadedError,)) as flight:
+        with span("extract"):
+            pages = await run_blocking(pdf_processor.extract_pages, upload.source)
+        yield "extracted", {"pages": len(pages)}
+
+        prepared = await _prepare(pages)
+        result = prepared["result"]
+        yield "tokens", {"tokens": result["tokens"], "tokens_saved": result["tokens_saved"]}
+
+        if result["mode"] == "rules":
+            yield "mode", {"mode": "rules", "cached": False}
+            yield "token", {"text": result["response"]}
+        else:
+            if result["mode"] == "RAG":
+                pieces = llm_service.astream_rag(prepared["chunks"], tokens=result["tokens"])
+            else:
+                pieces = llm_service.astream_direct(prepared["text"], result["tokens"])
+            async with admission.admit(_llm_cost(result)):
+                yield "mode", {"mode": result["mode"], "cached": False}
+
+                parts = []
+                async for piece in pieces:
+                    if isinstance(piece, Escalation):
+                        # The answer so far failed the check; a larger model follows
+                        parts = []
+                        yield "escalated", {"model": piece.model, "missing": piece.missing}
+                        continue
+                    parts.append(piece)
+                    yield "token", {"text": piece}
+            result = {**result, "response": "".join(parts)}
+
+        flight.set_result(result)
+        if settings.RESULT_CACHE_ENABLED:
+            await result_cache.aput(cache_key, result)
+    yield "result", {**result, "cached": False}
+
+
+def prepare_pages(pages: List[str]) -> Dict[str, Any]:
+    """
+    Run the CPU stages after text extraction and decide how to answer.
+
+    Normalizes the pages (see text_normalizer) and counts their tokens,
+    then answers from labelled fields when the rules are confident, packs
+    the most relevant pages of a mid-sized document (see page_packer), or
+    splits a large one into RAG chunks. A plain function of the pages, so
+    backend.bulk can run it in a worker process; the metrics are left to
+    the caller (see _prepare).
+
+    Args:
+        pages: Extracted text of each page
+
+    Returns:
+        dict: "result" (tokens, tokens_saved and mode, plus response, fields
+        and confidence in mode "rules"), the "text" to send in modes
+        "direct" and "packed" or the "chunks" in mode "RAG", and the stage
+        "spans"; raw_tokens, rules and packed_share are kept for the metrics.
+        tokens_saved counts the lines normalization dropped, not the
+        whitespace it collapsed
+    """
+    trace = Trace()
+    prepared: Dict[str, Any] = {"spans": trace.spans}
+    removed: List[str] = []
+    if settings.NORMALIZE_TEXT:
+        with trace.span("normalize"):
+            pages = normalize_pages(pages, settings.NORMALIZE_REPEAT_RATIO, removed)
+    with trace.span("tokenize"):
+        page_tokens = pdf_processor.encode_pages(pages)
+        # Counting the dropped lines spares encoding the raw pages as well
+        saved = pdf_processor.count_tokens("\n".join(removed)) if removed else 0
+    tokens = page_tokens.total
+    text = "\n".join(pages)
+    result: Dict[str, Any] = {"tokens": tokens, "tokens_saved": saved}
+    if settings.NORMALIZE_TEXT:
+        prepared["raw_tokens"] = tokens + saved
+    prepared["result"] = result
+
+    # Answer from labelled fields when pattern matching is confident
+    if settings.RULES_ENABLED:
+        with trace.span("rules"):
+            extraction = rule_extractor.extract(text)
+        if extraction.confidence >= settings.RULES_MIN_CONFIDENCE:
+            prepared["rules"] = "hit"
+            result.update(
+                mode="rules",
+                response=extraction.format(),
+                fields=extraction.values(),
+                confidence=extraction.confidence,
+            )
+            return prepared
+        prepared["rules"] = "miss"
+
+    if not pdf_processor.should_use_rag(tokens):
+        result["mode"] = "direct"
+        prepared["text"] = text
+        return prepared
+
+    # Send the most relevant pages of mid-sized documents directly
+    if settings.PACK_PAGES and tokens <= settings.PACK_MAX_TOKENS:
+        with trace.span("pack"):
+            chosen = pack_pages(pages, page_tokens, settings.MAX_TOKENS)
+        if chosen:
+            result["mode"] = "packed"
+            prepared["text"] = "\n".join(pages[i] for i in chosen)
+            prepared["packed_share"] = (
+                sum(len(page_tokens.pages[i]) for i in chosen) / tokens
+            )
+            return prepared
+
+    with trace.span("chunk"):
+        prepared["chunks"] = llm_service.split_text(text, page_tokens)
+    result["mode"] = "RAG"
+    return prepared
+
+
+async def _prepare(pages: List[str]) -> Dict[str, Any]:
+    """
+    Run prepare_pages off the event loop and record its metrics.
+
+    The stage spans, mode and token count go to the current trace, along
+    with the tokens normalization saved, documents it moved from RAG to
+    direct mode, rule hits and misses and the share of a document packed.
+
+    Args:
+        pages: Extracted text of each page
+
+    Returns:
+        dict: As returned by prepare_pages
+    """
+    prepared = await run_blocking(prepare_pages, pages)
+    result = prepared["result"]
+    trace = current_trace()
+    if trace is not None:
+        trace.spans.extend(prepared["spans"])
+    annotate(mode=result["mode"], tokens=result["tokens"])
+    if "chunks" in prepared:
+        annotate(chunks=len(prepared["chunks"]))
+
+    if "raw_tokens" in prepared:
+        TOKENS_SAVED.observe(result["tokens_saved"])
+        if pdf_processor.should_use_rag(
+            prepared["raw_tokens"]
+        ) and not pdf_processor.should_use_rag(result["tokens"]):
+            RAG_AVOIDED_TOTAL.inc()
+    if "rules" in prepared:
+        RULES_TOTAL.labels(outcome=prepared["rules"]).inc()
+    if "packed_share" in prepared:
+        PACKED_SHARE.observe(prepared["packed_share"])
+    return prepared
+
+
+def _llm_cost(result: Dict[str, Any]) -> int:
+    """In-flight tokens an LLM call is admitted for; packed text fits MAX_TOKENS."""
+    return settings.MAX_TOKENS if result["mode"] == "packed" else result["tokens"]
+
+
+def _replay(result: Dict[str, Any], cached: bool) -> List[Tuple[str, Dict[str, Any]]]:
+    """Stream events for a result that was computed elsewhere."""
+    return [
+        ("tokens", {"tokens": result["tokens"], "tokens_saved": result["tokens_saved"]}),
+        ("mode", {"mode": result["mode"], "cached": cached}),
+        ("token", {"text": result["response"]}),
+        ("result", {**result, "cached": cached}),
+    ]
+
+
+async def process_batch(
+    documents: List[SpooledUpload], render: bool = True, summary: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Process many documents, yielding each result as soon as it is ready.
+
+    Text extraction runs across the process pool, chunk embeddings for all
+    RAG documents are requested together, and LLM calls are limited to
+    settings.BATCH_LLM_CONCURRENCY at a time. Batch documents wait for
+    in-flight capacity rather than being shed.
+
+    Args:
+        documents: Validated, spooled PDF uploads
+        render: Render and store a report for each document
+        summary: After the last file, render one report covering every
+            successful file and yield it with status "summary"
+
+    Yields:
+        dict: Per-file result or error, tagged with index and filename
+    """
+    # Close the inner generator as soon as this one is closed, so the runs
+    # it leads are released now rather than when it is garbage collected
+    batch = _process_batch(documents, render)
+    sections: Dict[int, Tuple[str, str]] = {}
+    try:
+        async for item in batch:
+            if summary and item["status"] == "ok":
+                sections[item["index"]] = (item["filename"], item["response"])
+            yield item
+    finally:
+        await batch.aclose()
+    if not summary:
+        return
+    pdf_bytes = await run_blocking(
+        pdf_generator.render_summary, [sections[i] for i in sorted(sections)]
+    )
+    yield {"status": "summary", "files": len(sections), **(await _store_report(pdf_bytes))}
+
+
+async def _process_batch(
+    documents: List[SpooledUpload], render: bool
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield per-file batch results; see process_batch."""
+    pending: Dict[int, Dict[str, Any]] = {}
+    followers: List[Dict[str, Any]] = []
+    # Flights are led from the first document on, so everything from here,
+    # cached results included, may yield to a consumer that goes away
+    try:
+        for index, upload in enumerate(documents):
+            doc = {
+                "index": index,
+                "filename": upload.filename,
+                "render": render,
+                "trace": Trace(),
+                "cache_key": result_cache.make_key_from_digest(upload.sha256),
+            }
+            if settings.RESULT_CACHE_ENABLED:
+                cached = await result_cache.aget(doc["cache_key"])
+                if cached is not None:
+                    doc["trace"].attributes.update(
+                        mode=cached["mode"], tokens=cached["tokens"]
+                    )
+                    try:
+                        item = await _finish(doc, {**cached, "cached": True})
+                    except Exception as e:
+                        item = _error(doc, e)
+                    yield item
+                    continue
+            # Duplicates, within the batch or of other requests, share one run
+            doc["shared"] = singleflight.follow(doc["cache_key"])
+            if doc["shared"] is not None:
+                followers.append(doc)
+            else:
+                doc["flight"] = singleflight.lead(doc["cache_key"])
+                pending[index] = doc
+
+        async for item in _run_batch(documents, pending, followers):
+            yield item
+    finally:
+        # Release followers if the batch ends early
+        for doc in pending.values():
+            singleflight.settle(doc["cache_key"], doc["flight"], error=FlightAbandoned())
+
+
+async def _run_batch(
+    documents: List[SpooledUpload],
+    pending: Dict[int, Dict[str, Any]],
+    followers: List[Dict[str, Any]],
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run the pipeline for batch documents that missed the cache."""
+
+    async def extract(doc: Dict[str, Any]) -> List[str]:
+        with doc["trace"].span("extract"):
+            return await run_in_process(extract_pages, documents[doc["index"]].source, False)
+
+    # Extract text across cores, one document per worker
+    indexes = list(pending)
+    extracted = await asyncio.gather(
+        *(extract(pending[i]) for i in indexes), return_exceptions=True
+    )
+    for index, pages in zip(indexes, extracted):
+        if isinstance(pages, Exception):
+            yield _error(pending.pop(index), pages)
+        else:
+            pending[index]["pages"] = pages
+
+    # Count tokens, answer what the rules can, pack or split the rest
+    rag_chunks: List[str] = []
+    for index, doc in list(pending.items()):
+        try:
+            with activate(doc["trace"]):
+                prepared = await _prepare(doc["pages"])
+        except Exception as e:
+            yield _error(pending.pop(index), e)
+            continue
+        doc["result"] = prepared["result"]
+        if doc["result"]["mode"] == "rules":
+            pending.pop(index)
+            try:
+                item = await _complete(doc, {})
+            except Exception as e:
+                item = _error(doc, e)
+            yield item
+        elif doc["result"]["mode"] == "RAG":
+            chunks = prepared["chunks"]
+            doc["chunk_range"] = (len(rag_chunks), len(rag_chunks) + len(chunks))
+            rag_chunks.extend(chunks)
+        else:
+            doc["text"] = prepared["text"]
+
+    semaphore = asyncio.Semaphore(settings.BATCH_LLM_CONCURRENCY)
+
+    async def run_direct(doc: Dict[str, Any]) -> Dict[str, Any]:
+        tokens = doc["result"]["tokens"]
+        async with semaphore, admission.admit(_llm_cost(doc["result"]), wait=True):
+            with activate(doc["trace"]):
+                response = await llm_service.aextract_direct(doc["text"], tokens)
+        return await _complete(doc, {"response": response})
+
+    async def run_rag(
+        doc: Dict[str, Any], vectors: Optional[List[List[float]]]
+    ) -> Dict[str, Any]:
+        start, stop = doc["chunk_range"]
+        tokens = doc["result"]["tokens"]
+        async with semaphore, admission.admit(tokens, wait=True):
+            with activate(doc["trace"]):
+                response = await llm_service.aextract_with_rag(
+                    rag_chunks[start:stop],
+                    vectors[start:stop] if vectors else None,
+                    tokens=tokens,
+                )
+        return await _complete(doc, {"response": response})
+
+    async def run_shared(doc: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            result = {**(await doc["shared"]), "cached": False}
+        except FlightAbandoned:
+            # The leader gave up for its own reasons; run the document here
+            with activate(doc["trace"]):
+                result = await process_document(
+                    documents[doc["index"]], wait_for_capacity=True
+                )
+        doc["trace"].attributes.update(mode=result["mode"], tokens=result["tokens"])
+        return await _finish(doc, result)
+
+    async def guarded(doc: Dict[str, Any], coro) -> Dict[str, Any]:
+        try:
+            return await coro
+        except Exception as e:
+            return _error(doc, e)
+
+    # Direct documents start immediately; RAG documents wait for one
+    # grouped embedding request covering every chunk in the batch (unless
+    # retrieval is lexical and needs no embeddings).
+    tasks = [
+        asyncio.ensure_future(guarded(doc, run_direct(doc)))
+        for doc in pending.values()
+        if "chunk_range" not in doc
+    ]
+    tasks.extend(asyncio.ensure_future(guarded(doc, run_shared(doc))) for doc in followers)
+    rag_docs = [doc for doc in pending.values() if "chunk_range" in doc]
+    if rag_docs and not llm_service.uses_embeddings:
+        tasks.extend(
+            asyncio.ensure_future(guarded(doc, run_rag(doc, None))) for doc in rag_docs
+        )
+    elif rag_docs:
+        embed = Trace()
+        try:
+            with activate(embed):
+                vectors = await llm_service.aembed_chunks(rag_chunks)
+        except Exception as e:
+            for doc in rag_docs:
+                yield _error(doc, e)
+        else:
+            # Every RAG document waited for the shared embedding request
+            for doc in rag_docs:
+                doc["trace"].spans.extend(embed.spans)
+            tasks.extend(
+                asyncio.ensure_future(guarded(doc, run_rag(doc, vectors)))
+                for doc in rag_docs
+            )
+
+    for next_done in asyncio.as_completed(tasks):
+        yield await next_done
+
+
+async def _complete(doc: Dict[str, Any], answer: Dict[str, Any]) -> Dict[str, Any]:
+    """Cache a freshly computed batch result and render its report."""
+    result = {**doc["result"], **answer}
+    singleflight.settle(doc["cache_key"], doc["flight"], result)
+    if settings.RESULT_CACHE_ENABLED:
+        await result_cache.aput(doc["cache_key"], result)
+    return await _finish(doc, {**result, "cached": False})
+
+
+async def _finish(doc: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+    """Render the report for a batch result and tag it with its file."""
+    trace = doc["trace"]
+    with activate(trace):
+        report = await render_report(result["response"]) if doc["render"] else {}
+    trace.finish("cached" if result["cached"] else "ok")
+    return {
+        "index": doc["index"],
+        "filename": doc["filename"],
+        "status": "ok",
+        **result,
+        **report,
+    }
+
+
+def _error(doc: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+    """Build an error event for a batch document."""
+    if "flight" in doc:
+        singleflight.settle(doc["cache_key"], doc["flight"], error=error)
+    doc["trace"].finish("error")
+    return {
+        "index": doc["index"],
+        "filename": doc["filename"],
+        "status": "error",
+        "detail": str(error),
+    }
@@ -0,0 +1,96 @@
+"""Content-addressed store for generated PDF reports."""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from typing import Optional
+
+from backend.config import settings
+from backend.utils.files import EvictionThrottle, evict_directory
+
+_REPORT_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ReportStore:
+    """
+    Stores rendered reports under IDs derived from their content.
+
+    Identical reports share one file. The store evicts by age and by total
+    size, oldest first, as reports are added (see EvictionThrottle); the
+    report just added is never evicted, so its ID can always be fetched.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl_seconds: int):
+        """
+        Initialize report store.
+
+        Args:
+            directory: Directory holding the report files
+            max_bytes: Size budget in bytes (0 means unbounded)
+            ttl_seconds: Report lifetime in seconds (0 means no expiry)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._eviction = EvictionThrottle(max_bytes)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def put(self, pdf_bytes: bytes) -> str:
+        """
+        Store a rendered report.
+
+        Args:
+            pdf_bytes: PDF file content
+
+        Returns:
+            Report ID
+        """
+        report_id = hashlib.sha256(pdf_bytes).hexdigest()[:32]
+        path = self._path(report_id)
+        if os.path.exists(path):
+            # Refresh mtime so the report counts as recently used
+            os.utime(path, None)
+        else:
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(pdf_bytes)
+            os.replace(tmp_path, path)
+            if self._eviction.written(len(pdf_bytes)):
+                evict_directory(
+                    self.directory, ".pdf", self.max_bytes, self.ttl_seconds, keep=path
+                )
+        return report_id
+
+    def path_for(self, report_id: str) -> Optional[str]:
+        """
+        Get the file path of a stored report.
+
+        Args:
+            report_id: Report ID from put
+
+        Returns:
+            File path, or None if the ID is invalid, unknown or expired
+        """
+        if not _REPORT_ID.match(report_id):
+            return None
+        path = self._path(report_id)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        if self.ttl_seconds and time.time() - mtime > self.ttl_seconds:
+            return None
+        return path
+
+    def _path(self, report_id: str) -> str:
+        """Get the file path for a report ID."""
+        return os.path.join(self.directory, f"{report_id}.pdf")
+
+
+report_store = ReportStore(
+    settings.REPORT_STORE_DIR or os.path.join(settings.OUTPUT_DIR, "reports"),
+    max_bytes=settings.REPORT_STORE_MAX_BYTES,
+    ttl_seconds=settings.REPORT_TTL,
+)
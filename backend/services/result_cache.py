@@ -0,0 +1,282 @@
+"""Content-addressed cache for pipeline results."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from backend.config import settings
+from backend.utils import run_blocking
+from backend.utils.files import EvictionThrottle, evict_directory, remove_quietly
+from .llm_service import DIRECT_PROMPT, RAG_PROMPT, RAG_QUESTION
+from .rule_extractor import RULES_VERSION
+from .model_cascade import CASCADE_VERSION
+from .text_normalizer import NORMALIZE_VERSION
+from .page_packer import PACK_QUERY
+from .token_chunker import CHUNKER_VERSION
+
+
+class ResultCache:
+    """
+    Two-tier cache of processing results keyed by document content.
+
+    The memory tier is a bounded LRU. The optional disk tier stores one JSON
+    file per entry and evicts by age (TTL) and by total size, oldest first.
+    Async callers use aget and aput, which run disk I/O in the shared
+    thread pool.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        disk_dir: str = "",
+        max_disk_bytes: int = 0,
+        ttl_seconds: int = 0,
+    ):
+        """
+        Initialize result cache.
+
+        Args:
+            max_entries: Maximum entries held in memory
+            disk_dir: Directory for the disk tier (empty disables it)
+            max_disk_bytes: Size budget for the disk tier (0 means unbounded)
+            ttl_seconds: Entry lifetime in seconds (0 means no expiry)
+        """
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._eviction = EvictionThrottle(max_disk_bytes)
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(pdf_bytes: bytes) -> str:
+        """
+        Build a cache key for a document.
+
+        The key covers the document content and every setting that changes
+        the result: model, prompts, RAG threshold and chunking.
+
+        Args:
+            pdf_bytes: PDF file content as bytes
+
+        Returns:
+            Hex digest identifying the result
+        """
+        return ResultCache.make_key_from_digest(hashlib.sha256(pdf_bytes).hexdigest())
+
+    @staticmethod
+    def make_key_from_digest(content_digest: str) -> str:
+        """
+        Build a cache key from a precomputed SHA-256 of the document.
+
+        Args:
+            content_digest: Hex SHA-256 digest of the PDF bytes
+
+        Returns:
+            Hex digest identifying the result
+        """
+        parts = [
+            content_digest,
+            settings.MODEL_NAME,
+            ",".join(settings.MODEL_TIERS),
+            CASCADE_VERSION,
+            settings.EMBEDDING_MODEL,
+            DIRECT_PROMPT,
+            RAG_QUESTION,
+            RAG_PROMPT,
+            str(settings.MAX_TOKENS),
+            settings.CHUNKER,
+            str(settings.CHUNK_TOKENS),
+            str(settings.CHUNK_OVERLAP_TOKENS),
+            CHUNKER_VERSION,
+            str(settings.CHUNK_SIZE),
+            str(settings.CHUNK_OVERLAP),
+            settings.RETRIEVAL_BACKEND,
+            str(settings.RETRIEVAL_TOP_K),
+            str(settings.NORMALIZE_TEXT),
+            str(settings.NORMALIZE_REPEAT_RATIO),
+            NORMALIZE_VERSION,
+            str(settings.RULES_ENABLED),
+            str(settings.RULES_MIN_CONFIDENCE),
+            RULES_VERSION,
+            str(settings.PACK_PAGES),
+            str(settings.PACK_MAX_TOKENS),
+            PACK_QUERY,
+        ]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached result, or None on a miss
+        """
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None:
+            return value
+        return self._fill_from_disk(key, now)
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Async variant of get; a disk lookup runs in the shared thread pool.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached result, or None on a miss
+        """
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None:
+            return value
+        if not self.disk_dir:
+            return self._fill_from_disk(key, now)
+        return await run_blocking(self._fill_from_disk, key, now)
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store a result in every enabled tier.
+
+        Args:
+            key: Cache key from make_key
+            value: JSON-serializable result
+        """
+        now = time.time()
+        with self._lock:
+            self._memory_put(key, value, now)
+        self._disk_put(key, value)
+
+    async def aput(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Async variant of put; the disk write runs in the shared thread pool.
+
+        Args:
+            key: Cache key from make_key
+            value: JSON-serializable result
+        """
+        now = time.time()
+        with self._lock:
+            self._memory_put(key, value, now)
+        if self.disk_dir:
+            await run_blocking(self._disk_put, key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            dict: Hit/miss counters and current sizes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_enabled": bool(self.disk_dir),
+            }
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        """Check whether an entry stored at stored_at has outlived the TTL."""
+        return bool(self.ttl_seconds) and now - stored_at > self.ttl_seconds
+
+    def _memory_get(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        """Look up the LRU tier, counting a hit; None if absent or expired."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self._expired(stored_at, now):
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return dict(value)
+
+    def _fill_from_disk(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        """Look up the disk tier after a memory miss, promoting a hit."""
+        value = self._disk_get(key, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._memory_put(key, value, now)
+        return dict(value)
+
+    def _memory_put(self, key: str, value: Dict[str, Any], now: float) -> None:
+        """Insert into the LRU tier. Caller must hold the lock."""
+        self._memory[key] = (now, dict(value))
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        """Get the file path for a disk tier entry."""
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _disk_get(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        """Read an entry from the disk tier, dropping it if expired."""
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            if self._expired(os.path.getmtime(path), now):
+                remove_quietly(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            # Refresh mtime so size eviction removes least recently used first
+            os.utime(path, None)
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def _disk_put(self, key: str, value: Dict[str, Any]) -> None:
+        """Write an entry to the disk tier and enforce its budgets when due."""
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        data = json.dumps(value).encode("utf-8")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        if self._eviction.written(len(data)):
+            self._disk_evict()
+
+    def _disk_evict(self) -> None:
+        """Remove expired entries, then oldest entries until within budget."""
+        evict_directory(self.disk_dir, ".json", self.max_disk_bytes, self.ttl_seconds)
+
+
+result_cache = ResultCache(
+    max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+    disk_dir=settings.RESULT_CACHE_DIR,
+    max_disk_bytes=settings.RESULT_CACHE_MAX_BYTES,
+    ttl_seconds=settings.RESULT_CACHE_TTL,
+)
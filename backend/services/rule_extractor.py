@@ -0,0 +1,192 @@
+"""
+Pattern-based extraction of applicant fields.
+
+Transcripts usually state GPA, test scores and intended major as labelled
+lines ("Cumulative GPA: 3.85", "SAT Total: 1450"). Matching those locally
+answers many documents without an LLM round trip; the pipeline falls back
+to the LLM when a field is missing or ambiguous.
+"""
+
+import re
+from typing import Callable, Dict, List, Optional, Pattern, Tuple
+
+# Part of the result cache key; bump when patterns change
+RULES_VERSION = "2"
+
+# (pattern, confidence of a match); group 1 is the value
+GPA_PATTERNS = [
+    (
+        re.compile(
+            r"\b(?:cumulative|overall)\s+(?:GPA|grade\s+point\s+average)\b"
+            r"\s*[:=\-]?\s*(\d\.\d{1,3})\b",
+            re.IGNORECASE,
+        ),
+        1.0,
+    ),
+    (
+        re.compile(
+            r"\b(?:GPA|grade\s+point\s+average)\b\s*[:=\-]?\s*(\d\.\d{1,3})\b",
+            re.IGNORECASE,
+        ),
+        0.9,
+    ),
+]
+# The value must be on the label's line, so an empty "Intended Major:" does
+# not take the next line's label
+MAJOR_PATTERNS = [
+    (
+        re.compile(
+            r"\b(?:intended|proposed|prospective)\s+major[ \t]*[:\-][ \t]*"
+            r"([A-Za-z][A-Za-z &/'\-]{0,59})",
+            re.IGNORECASE,
+        ),
+        1.0,
+    ),
+    # A bare "Major:" may be a current rather than an intended major
+    (
+        re.compile(
+            r"^[ \t]*major[ \t]*[:\-][ \t]*([A-Za-z][A-Za-z &/'\-]{0,59})",
+            re.IGNORECASE | re.MULTILINE,
+        ),
+        0.7,
+    ),
+]
+# Labels of other fields, which are never a major
+_FIELD_LABEL = re.compile(
+    r"^(?:(?:cumulative|overall|weighted|unweighted)\s+)?"
+    r"(?:GPA|grade\s+point\s+average|SAT|ACT|(?:intended\s+)?major|test\s+scores?)\b",
+    re.IGNORECASE,
+)
+# Test names are matched in capitals so "sat" and "act" as words do not count
+SAT_PATTERNS = [
+    (re.compile(r"\bSAT\b(?:\s+(?i:total|composite|score))?\s*[:=\-]?\s*(\d{3,4})\b"), 1.0),
+]
+ACT_PATTERNS = [
+    (re.compile(r"\bACT\b(?:\s+(?i:composite|score))?\s*[:=\-]?\s*(\d{1,2})\b"), 1.0),
+]
+
+# Confidence kept when a field has several different values
+AMBIGUOUS = 0.5
+
+
+def _valid_gpa(value: str) -> bool:
+    return 0 < float(value) <= 5
+
+
+def _valid_sat(value: str) -> bool:
+    score = int(value)
+    return 400 <= score <= 1600 and score % 10 == 0
+
+
+def _valid_act(value: str) -> bool:
+    return 1 <= int(value) <= 36
+
+
+def _valid_major(value: str) -> bool:
+    return not _FIELD_LABEL.match(value)
+
+
+def _clean_major(value: str) -> str:
+    # Wide gaps separate table columns in extracted text
+    return re.split(r"\s{2,}", value.strip())[0].rstrip(" -/&")
+
+
+class RuleExtraction:
+    """Fields found by pattern matching, each with a confidence in [0, 1]."""
+
+    def __init__(self, fields: Dict[str, Tuple[str, float]]):
+        """
+        Initialize extraction.
+
+        Args:
+            fields: Field name to (value, confidence), for fields found
+        """
+        self.fields = fields
+
+    @property
+    def confidence(self) -> float:
+        """
+        Confidence that the extraction is complete and correct.
+
+        GPA and intended major are required, plus at least one of SAT or
+        ACT; the result is the lowest confidence among them.
+        """
+        gpa = self.fields.get("gpa", ("", 0.0))[1]
+        major = self.fields.get("major", ("", 0.0))[1]
+        test = max(
+            self.fields.get("sat", ("", 0.0))[1], self.fields.get("act", ("", 0.0))[1]
+        )
+        return min(gpa, major, test)
+
+    def values(self) -> Dict[str, str]:
+        """Get the extracted values by field name."""
+        return {name: value for name, (value, _) in self.fields.items()}
+
+    def format(self) -> str:
+        """Format the fields as the extraction response text."""
+        labels = [
+            ("gpa", "GPA"),
+            ("major", "Intended Major"),
+            ("sat", "SAT"),
+            ("act", "ACT"),
+        ]
+        return "\n".join(
+            f"{label}: {self.fields[name][0]}"
+            for name, label in labels
+            if name in self.fields
+        )
+
+
+class RuleExtractor:
+    """Extracts labelled applicant fields with regular expressions."""
+
+    FIELDS = [
+        ("gpa", GPA_PATTERNS, _valid_gpa, str.strip),
+        ("major", MAJOR_PATTERNS, _valid_major, _clean_major),
+        ("sat", SAT_PATTERNS, _valid_sat, str.strip),
+        ("act", ACT_PATTERNS, _valid_act, str.strip),
+    ]
+
+    def extract(self, text: str) -> RuleExtraction:
+        """
+        Find applicant fields in text.
+
+        Each field takes the value of its strongest matching pattern. A
+        field whose matches disagree keeps the first value, with its
+        confidence lowered to AMBIGUOUS.
+
+        Args:
+            text: Text extracted from a transcript
+
+        Returns:
+            RuleExtraction: Fields found and their confidence
+        """
+        fields: Dict[str, Tuple[str, float]] = {}
+        for name, patterns, valid, clean in self.FIELDS:
+            found = self._match(text, patterns, valid, clean)
+            if found is not None:
+                fields[name] = found
+        return RuleExtraction(fields)
+
+    @staticmethod
+    def _match(
+        text: str,
+        patterns: List[Tuple[Pattern, float]],
+        valid: Optional[Callable[[str], bool]],
+        clean: Callable[[str], str],
+    ) -> Optional[Tuple[str, float]]:
+        """Find one field's value and confidence, trying stronger patterns first."""
+        for pattern, confidence in patterns:
+            values: List[str] = []
+            for match in pattern.finditer(text):
+                value = clean(match.group(1))
+                if value and (valid is None or valid(value)) and value not in values:
+                    values.append(value)
+            if values:
+                if len(values) > 1:
+                    confidence = min(confidence, AMBIGUOUS)
+                return values[0], confidence
+        return None
+
+
+rule_extractor = RuleExtractor()
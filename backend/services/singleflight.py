@@ -0,0 +1,155 @@
+"""Coalescing of concurrent pipeline runs for the same document."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Dict, Optional, Tuple, Type
+
+from .metrics import COALESCED_TOTAL
+
+
+class FlightAbandoned(Exception):
+    """
+    Raised to followers when the leader stopped for its own reasons.
+
+    A client disconnecting or a request being shed says nothing about the
+    document, so followers run it again rather than fail with the leader.
+    """
+
+
+class SingleFlight:
+    """
+    One in-flight pipeline run per key; concurrent duplicates share it.
+
+    Keys are result cache keys, so they cover the document bytes and every
+    setting that affects the result. The first request for a key leads and
+    runs the pipeline; requests arriving while it runs follow and receive
+    the leader's result, or its exception. If the leader gives up for its
+    own reasons, followers get FlightAbandoned; wait() then moves on to the
+    next leader or lets the caller lead.
+    """
+
+    def __init__(self):
+        """Initialize with no runs in flight."""
+        self._flights: Dict[str, asyncio.Future] = {}
+        self.saved = 0
+
+    def follow(self, key: str) -> Optional[Awaitable[Dict[str, Any]]]:
+        """
+        Join the in-flight run for a key, if there is one.
+
+        Args:
+            key: Result cache key
+
+        Returns:
+            Awaitable of the leader's result, or None if nothing is in flight
+        """
+        future = self._flights.get(key)
+        if future is None:
+            return None
+        self.saved += 1
+        COALESCED_TOTAL.inc()
+        # Followers going away must not cancel the shared run
+        return asyncio.shield(future)
+
+    async def wait(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the in-flight run for a key, if there is one.
+
+        A run that was abandoned is not shared: the wait follows whichever
+        run is in flight next, if any. When this returns None the caller
+        should lead, before its next await.
+
+        Args:
+            key: Result cache key
+
+        Returns:
+            The leader's result, or None if nothing is in flight
+
+        Raises:
+            Exception: The leader's error, if its run failed
+        """
+        while True:
+            shared = self.follow(key)
+            if shared is None:
+                return None
+            try:
+                return await shared
+            except FlightAbandoned:
+                continue
+
+    def lead(self, key: str) -> asyncio.Future:
+        """
+        Register a run for a key; pass the returned future to settle().
+
+        Args:
+            key: Result cache key
+
+        Returns:
+            Future followers wait on
+        """
+        future = asyncio.get_running_loop().create_future()
+        # Mark a failure as retrieved even if nobody followed the run
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._flights[key] = future
+        return future
+
+    def settle(
+        self,
+        key: str,
+        future: asyncio.Future,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """
+        Finish a run, handing its result or error to any followers.
+
+        Settling an already settled run does nothing.
+
+        Args:
+            key: Result cache key
+            future: Future returned by lead()
+            result: Pipeline result on success
+            error: Exception on failure
+        """
+        if self._flights.get(key) is future:
+            del self._flights[key]
+        if future.done():
+            return
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    @asynccontextmanager
+    async def leading(
+        self, key: str, abandon_on: Tuple[Type[Exception], ...] = ()
+    ) -> AsyncIterator[asyncio.Future]:
+        """
+        Lead a run for the duration of a block.
+
+        Set the yielded future's result inside the block. If the block
+        raises, followers receive the exception; if it exits without a
+        result (a cancelled task or a closed generator), or raises one of
+        abandon_on, they receive FlightAbandoned.
+
+        Args:
+            key: Result cache key
+            abandon_on: Errors that concern only the leader's request, such
+                as it being shed
+        """
+        future = self.lead(key)
+        try:
+            yield future
+        except Exception as e:
+            error = FlightAbandoned() if isinstance(e, abandon_on) else e
+            self.settle(key, future, error=error)
+            raise
+        finally:
+            self.settle(key, future, error=FlightAbandoned())
+
+    def stats(self) -> Dict[str, int]:
+        """Get the number of runs in flight and of calls saved by coalescing."""
+        return {"in_flight": len(self._flights), "saved": self.saved}
+
+
+singleflight = SingleFlight()
@@ -0,0 +1,129 @@
+"""
+Normalization of extracted page text before token counting.
+
+PDF text extraction keeps letterheads, footers, page numbers, watermarks
+and layout whitespace on every page. None of it helps extraction, but all
+of it is counted against MAX_TOKENS and sent to the LLM.
+"""
+
+import math
+import re
+from typing import Dict, List, Optional, Set
+
+# Part of the result cache key; bump when normalization changes
+NORMALIZE_VERSION = "3"
+
+# Lines at the top and bottom of a page where headers and footers live
+EDGE_LINES = 3
+
+_DIGITS = re.compile(r"\d+")
+# Tabs and runs of spaces; two or more separate table columns
+_SPACES = re.compile(r"[ \t]+")
+_COLUMN_GAP = "  "
+# Page references inside running headers and footers ("Page 3 of 10 -
+# Confidential"); only their digits are ignored when comparing lines
+_PAGE_REFERENCE = re.compile(
+    r"\bpage\s*\d+(?:\s*(?:of|/)\s*\d+)?\b|\b\d+\s*(?:of|/)\s*\d+\b", re.IGNORECASE
+)
+# Lines naming an applicant field are never treated as boilerplate
+_FIELD_LABEL = re.compile(r"(?i:\bGPA\b|\bgrade\s+point\s+average\b|\bmajor\b)|\bSAT\b|\bACT\b")
+# "3", "Page 3", "3 of 10", "Page 3 / 10", "- 3 -"
+_PAGE_NUMBER = re.compile(
+    r"^(?:page\s*)?\d+(?:\s*(?:of|/)\s*\d+)?$|^-\s*\d+\s*-$", re.IGNORECASE
+)
+_WATERMARK = re.compile(
+    r"^(?:confidential|unofficial(?: copy)?|copy|draft|sample|void|"
+    r"do not (?:copy|duplicate))$",
+    re.IGNORECASE,
+)
+
+
+def _edge_positions(lines: List[str]) -> Set[int]:
+    """Positions of the first and last EDGE_LINES non-blank lines."""
+    filled = [position for position, line in enumerate(lines) if line]
+    return set(filled[:EDGE_LINES] + filled[-EDGE_LINES:])
+
+
+def _collapse(line: str) -> str:
+    """Trim a line and shrink its whitespace, keeping column gaps as two spaces."""
+    return _SPACES.sub(
+        lambda m: " " if m.group() == " " else _COLUMN_GAP, line.strip()
+    )
+
+
+def _repeat_key(line: str) -> str:
+    """Comparison key of an edge line: exact, apart from page references."""
+    return _PAGE_REFERENCE.sub(lambda m: _DIGITS.sub("#", m.group()), line).lower()
+
+
+def _boilerplate(line: str, repeated: Set[str], seen: Set[str]) -> bool:
+    """Whether an edge line is a page number or a repeat of a running header."""
+    if _PAGE_NUMBER.match(line):
+        return True
+    key = _repeat_key(line)
+    if key not in repeated or _FIELD_LABEL.search(line):
+        return False
+    if key in seen:
+        return True
+    seen.add(key)
+    return False
+
+
+def normalize_pages(
+    pages: List[str], repeat_ratio: float = 0.5, removed: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Strip boilerplate and layout whitespace from page texts.
+
+    - Lines are trimmed, and runs of spaces and tabs collapse to two spaces
+      so the gaps between table columns stay recognizable (the rule
+      extractor splits on them); runs of blank lines collapse to one.
+    - Header and footer lines (near a page edge) that repeat on at least
+      repeat_ratio of the pages are kept only where they first appear.
+      Lines must match exactly, except that page references are ignored,
+      so "Page 2 of 9 - Confidential" repeats but "Term 2" or
+      "Cumulative GPA: 3.52" does not. Lines naming an applicant field
+      (GPA, major, SAT, ACT) are always kept.
+    - Page numbers near a page edge and standalone watermark lines
+      ("CONFIDENTIAL", "DRAFT", ...) are removed.
+
+    Args:
+        pages: Text of each page
+        repeat_ratio: Share of pages a header or footer must appear on
+        removed: If given, the lines dropped are appended to it, so their
+            tokens can be counted without encoding the raw pages
+
+    Returns:
+        Normalized text of each page, one per input page
+    """
+    split = [[_collapse(line) for line in page.split("\n")] for page in pages]
+    edges = [_edge_positions(lines) for lines in split]
+
+    # Count the pages each edge line appears on
+    page_counts: Dict[str, int] = {}
+    for lines, positions in zip(split, edges):
+        for key in {_repeat_key(lines[p]) for p in positions}:
+            page_counts[key] = page_counts.get(key, 0) + 1
+    min_pages = max(2, math.ceil(repeat_ratio * len(pages)))
+    repeated = {key for key, count in page_counts.items() if count >= min_pages}
+
+    seen: Set[str] = set()
+    result = []
+    for lines, positions in zip(split, edges):
+        kept: List[str] = []
+        for position, line in enumerate(lines):
+            if not line:
+                if kept and kept[-1]:
+                    kept.append("")
+                continue
+            if _WATERMARK.match(line) or (
+                position in positions and _boilerplate(line, repeated, seen)
+            ):
+                if removed is not None:
+                    removed.append(line)
+                continue
+            kept.append(line)
+        while kept and not kept[-1]:
+            kept.pop()
+        result.append("\n".join(kept))
+    return result
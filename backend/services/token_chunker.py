@@ -0,0 +1,143 @@
+"""
+Token-window chunking over an already encoded document.
+
+Splitting by characters makes chunk token sizes vary with the text and
+scans text that has already been encoded for counting. This chunker slices
+the token ids from PDFProcessor.encode_pages into fixed-size windows, moves
+each cut back to a line or sentence end when one is close, and decodes only
+the final chunks.
+"""
+
+import threading
+from itertools import chain
+from typing import FrozenSet, List, Optional, Sequence, Tuple
+
+from backend.config import settings
+from .pdf_processor import PageTokens, pdf_processor
+
+# Part of the result cache key; bump when chunk boundaries change
+CHUNKER_VERSION = "1"
+
+# How far, as a share of the chunk size, a cut may move back to a boundary
+SNAP_SHARE = 0.25
+_SENTENCE_ENDS = (b".", b"!", b"?")
+
+
+class TokenChunker:
+    """Splits token id sequences into overlapping windows of text."""
+
+    def __init__(self, chunk_tokens: int, overlap_tokens: int):
+        """
+        Initialize chunker. Boundary tokens are found on first use.
+
+        Args:
+            chunk_tokens: Maximum tokens per chunk
+            overlap_tokens: Tokens repeated at the start of the next chunk
+        """
+        if chunk_tokens <= 0 or not 0 <= overlap_tokens < chunk_tokens:
+            raise ValueError("Need chunk_tokens > overlap_tokens >= 0")
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self._boundaries: Optional[Tuple[FrozenSet[int], ...]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def boundaries(self) -> Tuple[FrozenSet[int], ...]:
+        """
+        Token ids that end a line, end a sentence, or start with whitespace.
+
+        Found by scanning the encoder's vocabulary once, on first access,
+        so chunking only does set lookups.
+        """
+        if self._boundaries is None:
+            with self._lock:
+                if self._boundaries is None:
+                    encoder = pdf_processor.encoder
+                    line_ends, sentence_ends, spaced = set(), set(), set()
+                    for token in range(encoder.n_vocab):
+                        try:
+                            value = encoder.decode_single_token_bytes(token)
+                        except KeyError:
+                            continue  # unused id
+                        if value.endswith(b"\n"):
+                            line_ends.add(token)
+                        if value.endswith(_SENTENCE_ENDS):
+                            sentence_ends.add(token)
+                        if value[:1].isspace():
+                            spaced.add(token)
+                    self._boundaries = (
+                        frozenset(line_ends),
+                        frozenset(sentence_ends),
+                        frozenset(spaced),
+                    )
+        return self._boundaries
+
+    def warmup(self) -> None:
+        """Scan the vocabulary for boundary tokens ahead of the first request."""
+        self.boundaries
+
+    def split_pages(self, page_tokens: PageTokens) -> List[str]:
+        """
+        Chunk a document from its per-page tokens.
+
+        Args:
+            page_tokens: Tokens of each page, from PDFProcessor.encode_pages
+
+        Returns:
+            List of text chunks, in document order
+        """
+        return self.split_tokens(list(chain.from_iterable(page_tokens.pages)))
+
+    def split_tokens(self, tokens: Sequence[int]) -> List[str]:
+        """
+        Chunk a token id sequence.
+
+        Each chunk holds at most chunk_tokens tokens. A cut moves back to
+        the nearest line end (or, failing that, sentence end) within
+        SNAP_SHARE of the chunk size; the next chunk starts overlap_tokens
+        before the cut, moved forward to a line start inside the overlap.
+
+        Args:
+            tokens: Token ids of the encoder used by PDFProcessor
+
+        Returns:
+            List of text chunks, in order
+        """
+        line_ends, sentence_ends, spaced = self.boundaries
+        decode = pdf_processor.encoder.decode
+        total = len(tokens)
+        slack = max(1, int(self.chunk_tokens * SNAP_SHARE))
+        chunks: List[str] = []
+        start = 0
+        while start < total:
+            end = min(start + self.chunk_tokens, total)
+            if end < total:
+                floor = max(start + 1, end - slack)
+                # A cut at position p falls between tokens[p - 1] and tokens[p]
+                cut = next(
+                    (p for p in range(end, floor - 1, -1) if tokens[p - 1] in line_ends),
+                    None,
+                )
+                if cut is None:
+                    # "3.85" is split after "." too, so whitespace must follow
+                    cut = next(
+                        (
+                            p
+                            for p in range(end, floor - 1, -1)
+                            if tokens[p - 1] in sentence_ends and tokens[p] in spaced
+                        ),
+                        end,
+                    )
+                end = cut
+            chunks.append(decode(tokens[start:end]))
+            if end == total:
+                break
+            next_start = max(end - self.overlap_tokens, start + 1)
+            start = next(
+                (p for p in range(next_start, end) if tokens[p - 1] in line_ends),
+                next_start,
+            )
+        return chunks
+
+
+token_chunker = TokenChunker(settings.CHUNK_TOKENS, settings.CHUNK_OVERLAP_TOKENS)
@@ -0,0 +1,44 @@
+"""Opt-in preloading of heavy service dependencies."""
+
+import logging
+import threading
+
+from .pdf_processor import pdf_processor
+from .llm_service import llm_service
+from .pdf_generator import pdf_generator
+from .token_chunker import token_chunker
+
+logger = logging.getLogger(__name__)
+
+
+def warmup(clients: bool = True) -> None:
+    """
+    Load PyMuPDF, tiktoken, langchain, the OpenAI clients and fpdf now.
+
+    Args:
+        clients: Also create the OpenAI clients; pass False when warming
+            up a server master before it forks workers
+    """
+    pdf_processor.warmup()
+    token_chunker.warmup()
+    llm_service.warmup(clients=clients)
+    pdf_generator.warmup()
+
+
+def start_background_warmup() -> threading.Thread:
+    """
+    Run warmup in a daemon thread so startup is not delayed.
+
+    Returns:
+        The warmup thread
+    """
+
+    def run() -> None:
+        try:
+            warmup()
+        except Exception:
+            logger.exception("Background warmup failed")
+
+    thread = threading.Thread(target=run, name="warmup", daemon=True)
+    thread.start()
+    return thread
@@ -1,5 +1,15 @@
 """Utilities module."""
 
 from .validators import validate_pdf_file
+from .concurrency import run_blocking, run_in_process, shutdown_pools
+from .uploads import SpooledUpload, spool_upload, RequestSizeLimitMiddleware
 
-__all__ = ["validate_pdf_file"]
+__all__ = [
+    "validate_pdf_file",
+    "run_blocking",
+    "run_in_process",
+    "shutdown_pools",
+    "SpooledUpload",
+    "spool_upload",
+    "RequestSizeLimitMiddleware",
+]
@@ -0,0 +1,85 @@
+"""Concurrency utilities for running blocking work off the event loop."""
+
+import asyncio
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from backend.config import settings
+
+T = TypeVar("T")
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """
+    Get the shared bounded thread pool for CPU-bound pipeline stages.
+
+    Returns:
+        Thread pool executor sized by settings.CPU_WORKERS
+    """
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(
+            max_workers=settings.CPU_WORKERS, thread_name_prefix="pipeline"
+        )
+    return _thread_pool
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking callable in the shared thread pool.
+
+    Args:
+        func: Callable to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Result of func
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_thread_pool(), functools.partial(func, *args, **kwargs)
+    )
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared process pool for work that should use several cores.
+
+    Returns:
+        Process pool executor sized by settings.PROCESS_WORKERS
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=settings.PROCESS_WORKERS)
+    return _process_pool
+
+
+async def run_in_process(func: Callable[..., T], *args: Any) -> T:
+    """
+    Run a picklable module-level callable in the shared process pool.
+
+    Args:
+        func: Module-level callable to run
+        *args: Picklable positional arguments for func
+
+    Returns:
+        Result of func
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), func, *args)
+
+
+def shutdown_pools() -> None:
+    """Shut down shared executors, waiting for running work to finish."""
+    global _thread_pool, _process_pool
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=True)
+        _thread_pool = None
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True)
+        _process_pool = None
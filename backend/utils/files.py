@@ -0,0 +1,116 @@
+"""File utilities shared by the on-disk stores."""
+
+import os
+import threading
+import time
+from typing import Optional
+
+
+def remove_quietly(path: str) -> None:
+    """Delete a file, ignoring races with other workers."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class EvictionThrottle:
+    """
+    Decides when an on-disk store is due an eviction scan.
+
+    A scan stats every file in the directory, so rather than scanning on
+    every write, a store scans once the bytes written since the last scan
+    reach a share of its budget (so it may overshoot by as much), and at
+    least every interval seconds so expired files are still removed.
+    """
+
+    def __init__(self, max_bytes: int, share: float = 0.05, interval: float = 60.0):
+        """
+        Initialize throttle.
+
+        Args:
+            max_bytes: The store's size budget (0 means unbounded)
+            share: Share of the budget written between scans
+            interval: Longest time in seconds between scans
+        """
+        self.max_bytes = max_bytes
+        self.share = share
+        self.interval = interval
+        self._unevicted_bytes = 0
+        self._last_scan = float("-inf")
+        self._lock = threading.Lock()
+
+    def written(self, size: int) -> bool:
+        """
+        Record a write to the store.
+
+        Args:
+            size: Bytes written
+
+        Returns:
+            Whether the caller should scan now
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._unevicted_bytes += size
+            due = now - self._last_scan >= self.interval or (
+                self.max_bytes and self._unevicted_bytes >= self.max_bytes * self.share
+            )
+            if due:
+                self._unevicted_bytes = 0
+                self._last_scan = now
+        return bool(due)
+
+
+def evict_directory(
+    directory: str,
+    suffix: str,
+    max_bytes: int,
+    ttl_seconds: int,
+    keep: Optional[str] = None,
+) -> None:
+    """
+    Enforce age and size budgets on the files in a directory.
+
+    Files older than ttl_seconds (by mtime) are removed first, then the
+    oldest remaining files until the total size fits in max_bytes.
+
+    Args:
+        directory: Directory to clean
+        suffix: Only files ending with this suffix are considered
+        max_bytes: Size budget in bytes (0 means unbounded)
+        ttl_seconds: Maximum file age in seconds (0 means no expiry)
+        keep: Path of a file never to remove, such as one just written
+            whose name was handed out; it still counts against max_bytes
+    """
+    now = time.time()
+    entries = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if not entry.name.endswith(suffix) or entry.path == keep:
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if ttl_seconds and now - stat.st_mtime > ttl_seconds:
+                    remove_quietly(entry.path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except OSError:
+        return
+
+    if not max_bytes:
+        return
+    total = sum(size for _, size, _ in entries)
+    if keep is not None:
+        try:
+            total += os.path.getsize(keep)
+        except OSError:
+            pass
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        remove_quietly(path)
+        total -= size
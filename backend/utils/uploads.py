@@ -0,0 +1,244 @@
+"""Streaming upload ingestion with early size and type rejection."""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, Optional, Union
+
+from fastapi import HTTPException, UploadFile
+
+from backend.config import settings
+from .validators import validate_file_extension, validate_mime_type
+
+
+class SpooledUpload:
+    """
+    Upload body held in memory up to a threshold, then in a temp file.
+
+    The SHA-256 digest is computed while the upload is streamed in, so
+    callers never need the whole body as one bytes object.
+    """
+
+    def __init__(self, filename: str, max_memory: int):
+        """
+        Initialize an empty spool.
+
+        Args:
+            filename: Original filename of the upload
+            max_memory: Bytes kept in memory before rolling over to disk
+        """
+        self.filename = filename
+        self.max_memory = max_memory
+        self.size = 0
+        self.path: Optional[str] = None
+        self._buffer = bytearray()
+        self._file = None
+        self._hash = hashlib.sha256()
+
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 digest of the content written so far."""
+        return self._hash.hexdigest()
+
+    @property
+    def source(self) -> Union[bytearray, str]:
+        """
+        Content for PyMuPDF: a file path if spooled to disk, else the buffer.
+
+        The buffer is returned without copying; it must not be written to
+        once finish() has been called.
+        """
+        return self.path if self.path is not None else self._buffer
+
+    def write(self, chunk: bytes) -> None:
+        """
+        Append a chunk, rolling over to a temp file past max_memory.
+
+        Args:
+            chunk: Next piece of the upload body
+        """
+        self.size += len(chunk)
+        self._hash.update(chunk)
+        if self._file is None and self.size > self.max_memory:
+            fd, self.path = tempfile.mkstemp(
+                suffix=".pdf", dir=settings.UPLOAD_TMP_DIR or None
+            )
+            self._file = os.fdopen(fd, "wb")
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._buffer.extend(chunk)
+
+    def finish(self) -> None:
+        """Flush and close the temp file, if any, so it can be reopened."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def read_bytes(self) -> bytes:
+        """
+        Read the whole upload into memory.
+
+        Returns:
+            Upload content as bytes
+        """
+        if self.path is None:
+            return bytes(self._buffer)
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def cleanup(self) -> None:
+        """Release the buffer and delete the temp file."""
+        self.finish()
+        self._buffer = bytearray()
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cleanup()
+
+
+async def spool_upload(file: UploadFile) -> SpooledUpload:
+    """
+    Stream an upload into a SpooledUpload, validating as it arrives.
+
+    The extension is checked before reading, the MIME type is sniffed from
+    the first UPLOAD_SNIFF_BYTES only, and ingestion stops with a 413 as soon
+    as MAX_FILE_SIZE is exceeded.
+
+    Args:
+        file: The uploaded file
+
+    Returns:
+        SpooledUpload holding the validated content
+
+    Raises:
+        HTTPException: If validation fails
+    """
+    validate_file_extension(file.filename or "")
+
+    upload = SpooledUpload(file.filename or "", settings.UPLOAD_SPOOL_MAX_MEMORY)
+    try:
+        head = bytearray()
+        while True:
+            chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            if upload.size + len(chunk) > settings.MAX_FILE_SIZE:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File too large. Maximum size is {settings.MAX_FILE_SIZE / 1024 / 1024}MB",
+                )
+            if len(head) < settings.UPLOAD_SNIFF_BYTES:
+                head.extend(chunk[: settings.UPLOAD_SNIFF_BYTES - len(head)])
+                if len(head) >= settings.UPLOAD_SNIFF_BYTES:
+                    validate_mime_type(bytes(head))
+            upload.write(chunk)
+
+        if len(head) < settings.UPLOAD_SNIFF_BYTES:
+            validate_mime_type(bytes(head))
+        upload.finish()
+        return upload
+    except BaseException:
+        upload.cleanup()
+        raise
+
+
+class RequestSizeLimitMiddleware:
+    """
+    ASGI middleware that rejects oversized request bodies early.
+
+    Requests that declare a Content-Length over the limit get a 413 before
+    any of the body is read. Bodies without a declared length are counted
+    as they stream in and aborted once they cross the limit.
+    """
+
+    def __init__(self, app, default_limit: int, limits: Optional[Dict[str, int]] = None):
+        """
+        Initialize middleware.
+
+        Args:
+            app: ASGI application to wrap
+            default_limit: Body size limit in bytes for unlisted paths
+            limits: Per-path overrides of the limit
+        """
+        self.app = app
+        self.default_limit = default_limit
+        self.limits = limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.limits.get(scope["path"], self.default_limit)
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    declared = 0
+                if declared > limit:
+                    await self._reject(send, limit)
+                    return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise _BodyTooLarge()
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except _BodyTooLarge:
+            if not response_started:
+                await self._reject(send, limit)
+
+    @staticmethod
+    async def _reject(send, limit: int) -> None:
+        """Send a 413 response."""
+        body = json.dumps(
+            {"detail": f"Request too large. Maximum size is {limit / 1024 / 1024}MB"}
+        ).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 413,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+class _BodyTooLarge(BaseException):
+    """
+    Raised from receive() when a streamed body crosses the limit.
+
+    Derives from BaseException so FastAPI's body-parsing error handler does
+    not turn it into a 400 before it reaches the middleware.
+    """
@@ -0,0 +1,11 @@
+"""
+Offline performance benchmarks.
+
+Run a benchmark as a module from the repository root, e.g.
+``python -m benchmarks.bench_extract``. No OpenAI calls are made.
+"""
+
+import os
+
+# Service singletons read the key at construction; benchmarks never use it.
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-offline")
@@ -0,0 +1,92 @@
+"""
+Benchmark the model cascade with stub models.
+
+Stands in a fast model that answers after --fast-latency seconds, leaving a
+required field out of --incomplete of its answers, and a large model that
+always answers completely after --large-latency seconds. Runs the same
+direct extractions with MODEL_NAME alone (the large model) and with the
+cascade, and reports latency, how many calls went to each model and the
+escalation rate.
+
+Usage:
+    python -m benchmarks.bench_cascade [--docs 200] [--incomplete 0.2]
+                                       [--fast-latency 0.2] [--large-latency 1]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Dict, List
+
+from backend.services import llm_service
+from backend.services.model_cascade import ModelCascade, ModelTier
+from .fakes import FAKE_RESPONSE, SlowFakeChatModel
+
+FAST, LARGE = "fast-model", "large-model"
+# The fake answer without its intended major, so the check fails
+INCOMPLETE_RESPONSE = "\n".join(
+    line for line in FAKE_RESPONSE.split("\n") if not line.startswith("Intended Major")
+)
+
+
+async def run(docs: int, text: str) -> List[float]:
+    """Extract docs documents concurrently; returns each one's latency."""
+
+    async def one() -> float:
+        start = time.perf_counter()
+        await llm_service.aextract_direct(text, tokens=500)
+        return time.perf_counter() - start
+
+    return await asyncio.gather(*(one() for _ in range(docs)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--incomplete", type=float, default=0.2)
+    parser.add_argument("--fast-latency", type=float, default=0.2)
+    parser.add_argument("--large-latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    fast_answers = [
+        INCOMPLETE_RESPONSE if rng.random() < args.incomplete else FAKE_RESPONSE
+        for _ in range(args.docs)
+    ]
+    text = "Cumulative GPA: 3.85\nIntended Major: Computer Science\nSAT: 1450"
+    configurations = [
+        ("large only", [ModelTier(LARGE)]),
+        ("cascade", [ModelTier(FAST, 4000), ModelTier(LARGE)]),
+    ]
+
+    print(
+        f"{args.docs} documents, fast model {args.fast_latency}s with "
+        f"{args.incomplete:.0%} incomplete answers, large model {args.large_latency}s"
+    )
+    print(
+        f"{'models':>11} {'mean s':>7} {'p50 s':>6} {'p95 s':>6} "
+        f"{'fast calls':>11} {'large calls':>12} {'escalated':>10}"
+    )
+    for name, tiers in configurations:
+        models: Dict[str, SlowFakeChatModel] = {
+            FAST: SlowFakeChatModel(responses=fast_answers, latency=args.fast_latency),
+            LARGE: SlowFakeChatModel(responses=[FAKE_RESPONSE], latency=args.large_latency),
+        }
+        # Stub models are looked up by tier name, as real ones would be
+        llm_service._models = models
+        llm_service.cascade = ModelCascade(tiers)
+        latencies = sorted(asyncio.run(run(args.docs, text)))
+        fast, large = models[FAST].calls, models[LARGE].calls
+        escalated = large if fast else 0
+        print(
+            f"{name:>11} {statistics.mean(latencies):>7.2f} "
+            f"{latencies[len(latencies) // 2]:>6.2f} "
+            f"{latencies[int(len(latencies) * 0.95)]:>6.2f} "
+            f"{fast:>11} {large:>12} {escalated / args.docs:>10.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark the token-window chunker against the character splitter.
+
+For synthetic transcripts of several sizes, times chunking the same text
+with a new RecursiveCharacterTextSplitter per document (CHUNK_SIZE and
+CHUNK_OVERLAP characters, as every request used to) and with the token
+chunker slicing the tokens already produced by encode_pages (CHUNK_TOKENS
+and CHUNK_OVERLAP_TOKENS). Encoding is not timed for either: the pipeline
+encodes every document for token counting anyway. Also reports the number
+of chunks and the spread of their sizes in tokens.
+
+Usage:
+    python -m benchmarks.bench_chunking [--pages 5 20 80 300] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable, List
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from backend.config import settings
+from backend.services import pdf_processor
+from backend.services.token_chunker import token_chunker
+from .synthetic import transcript_pages
+
+
+def median_ms(func: Callable[[], List[str]], repeat: int) -> float:
+    """Median wall time of a chunking call, after one warm-up run."""
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def token_sizes(chunks: List[str]) -> str:
+    """Format the min, median and max chunk size in tokens."""
+    sizes = [len(pdf_processor.encoder.encode_ordinary(chunk)) for chunk in chunks]
+    return f"{min(sizes)}/{statistics.median(sizes):.0f}/{max(sizes)}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 20, 80, 300])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    def characters(text: str) -> List[str]:
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=settings.CHUNK_SIZE, chunk_overlap=settings.CHUNK_OVERLAP
+        )
+        return splitter.split_text(text)
+
+    print(
+        f"characters: {settings.CHUNK_SIZE}/{settings.CHUNK_OVERLAP}  "
+        f"tokens: {settings.CHUNK_TOKENS}/{settings.CHUNK_OVERLAP_TOKENS}"
+    )
+    print(
+        f"{'pages':>6} {'chars ms':>9} {'tokens ms':>10} {'speedup':>8} "
+        f"{'chunks':>13} {'chars min/med/max':>18} {'tokens min/med/max':>19}"
+    )
+    for pages in args.pages:
+        texts = transcript_pages(pages, pages)
+        text = "\n".join(texts)
+        page_tokens = pdf_processor.encode_pages(texts)
+
+        char_ms = median_ms(lambda: characters(text), args.repeat)
+        token_ms = median_ms(lambda: token_chunker.split_pages(page_tokens), args.repeat)
+        char_chunks = characters(text)
+        token_chunks = token_chunker.split_pages(page_tokens)
+        print(
+            f"{pages:>6} {char_ms:>9.2f} {token_ms:>10.2f} {char_ms / token_ms:>7.1f}x "
+            f"{f'{len(char_chunks)}/{len(token_chunks)}':>13} "
+            f"{token_sizes(char_chunks):>18} {token_sizes(token_chunks):>19}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark the OpenAI client layer against a fake server with injected faults.
+
+Starts benchmarks.fake_openai with a slow tail and a share of 503 errors,
+then sends the same chat completion calls through clients built by
+openai_transport.build_openai_clients with retries off, with retries, and
+with retries plus hedging, and through the OpenAI SDK's default client for
+reference. Reports success rate, latency percentiles and how many requests
+reached the server.
+
+Usage:
+    python -m benchmarks.bench_client [--calls 400] [--concurrency 16]
+                                      [--slow-rate 0.02] [--slow-latency 1]
+                                      [--error-rate 0.1]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Dict, List
+
+import openai
+
+from backend.services.openai_transport import RetryPolicy, build_openai_clients
+from .fake_openai import FaultOptions, start_fake_openai
+
+MESSAGES = [{"role": "user", "content": "Extract applicant info from this text."}]
+
+
+async def run_calls(client: Any, calls: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Send chat completions and time each one.
+
+    Args:
+        client: openai.AsyncOpenAI client
+        calls: Number of calls
+        concurrency: Calls in flight at once
+
+    Returns:
+        dict: Latencies of successful calls in seconds, and failure count
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def call() -> None:
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await client.chat.completions.create(model="gpt-4", messages=MESSAGES)
+            except openai.APIError:
+                failures += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(call() for _ in range(calls)))
+    return {"latencies": latencies, "failures": failures}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--slow-rate", type=float, default=0.02)
+    parser.add_argument("--slow-latency", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    def sdk_default(url: str) -> Any:
+        return openai.AsyncOpenAI(api_key="fake", base_url=url)
+
+    def layer(retries: int, hedge: bool):
+        def build(url: str) -> Any:
+            policy = RetryPolicy(max_retries=retries, backoff_base=0.05, deadline=30)
+            return build_openai_clients(
+                base_url=url, policy=policy, hedge=hedge, hedge_min_delay=0.0
+            )[1]
+
+        return build
+
+    configurations = [
+        ("sdk default", sdk_default),
+        ("no retries", layer(0, False)),
+        ("retries", layer(3, False)),
+        ("retries+hedge", layer(3, True)),
+    ]
+
+    print(
+        f"{args.calls} calls, concurrency {args.concurrency}, "
+        f"{args.slow_rate:.0%} slow ({args.slow_latency}s), {args.error_rate:.0%} errors"
+    )
+    print(
+        f"{'client':>14} {'ok':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'mean ms':>8} {'requests':>9}"
+    )
+    for name, build in configurations:
+        options = FaultOptions(
+            latency=args.latency,
+            slow_rate=args.slow_rate,
+            slow_latency=args.slow_latency,
+            error_rate=args.error_rate,
+        )
+        server, url = start_fake_openai(options)
+        try:
+            result = asyncio.run(run_calls(build(url), args.calls, args.concurrency))
+        finally:
+            server.shutdown()
+            server.server_close()
+        latencies = result["latencies"]
+        ok = len(latencies) / args.calls
+        if latencies:
+            timing = (
+                f"{percentile(latencies, 0.5) * 1000:>8.0f} "
+                f"{percentile(latencies, 0.95) * 1000:>8.0f} "
+                f"{percentile(latencies, 0.99) * 1000:>8.0f} "
+                f"{statistics.mean(latencies) * 1000:>8.0f}"
+            )
+        else:
+            timing = f"{'n/a':>8} {'n/a':>8} {'n/a':>8} {'n/a':>8}"
+        print(f"{name:>14} {ok:>6.1%} {timing} {options.requests:>9}")
+
+
+if __name__ == "__main__":
+    main()
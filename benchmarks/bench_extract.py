@@ -0,0 +1,59 @@
+"""
+Benchmark serial vs page-sharded PDF text extraction.
+
+Usage:
+    python -m benchmarks.bench_extract [--pages 10 40 80 160 320] [--repeat 3]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from backend.config import settings
+from backend.services.pdf_processor import extract_pages
+from backend.utils import shutdown_pools
+from .synthetic import make_transcript_pdf
+
+
+def best_of(repeat: int, func, *args) -> float:
+    """Return the fastest wall time of repeat calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 40, 80, 160, 320])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Force sharding so both paths are measured at every size
+    settings.PARALLEL_EXTRACT_MIN_PAGES = 2
+
+    print(f"workers={settings.PROCESS_WORKERS}")
+    print(f"{'pages':>6} {'serial ms':>10} {'sharded ms':>11} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            path = os.path.join(tmp, f"transcript_{pages}.pdf")
+            with open(path, "wb") as f:
+                f.write(make_transcript_pdf(pages))
+
+            # Warm the pool so process start-up is not measured
+            extract_pages(path, parallel=True)
+
+            serial = best_of(args.repeat, extract_pages, path, False)
+            sharded = best_of(args.repeat, extract_pages, path, True)
+            print(
+                f"{pages:>6} {serial * 1000:>10.1f} {sharded * 1000:>11.1f} "
+                f"{serial / sharded:>7.2f}x"
+            )
+    shutdown_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark PDF report rendering against the previous layout code.
+
+The baseline is the character-count wrapper that issued one pdf.cell per
+line, kept here for comparison. Its output cost grows quadratically, so it
+is skipped above --legacy-max-lines.
+
+Usage:
+    python -m benchmarks.bench_report [--lines 1000 10000 100000] [--repeat 3]
+                                      [--legacy-max-lines 20000]
+"""
+
+import argparse
+import random
+import time
+
+from backend.services.pdf_generator import pdf_generator
+
+WORDS = (
+    "applicant gpa intended major computer science sat act composite transcript "
+    "cumulative weighted unweighted semester honors advanced placement calculus"
+).split()
+
+
+def legacy_render(content: str) -> bytes:
+    """Render with the pre-layout-engine algorithm."""
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    for line in content.split("\n"):
+        max_width = 80
+        if len(line) > max_width:
+            words = line.split()
+            current_line = ""
+            for word in words:
+                if len(current_line + " " + word) < max_width:
+                    current_line += " " + word
+                else:
+                    pdf.cell(0, 10, txt=current_line.strip(), ln=True, align="L")
+                    current_line = word
+            if current_line:
+                pdf.cell(0, 10, txt=current_line.strip(), ln=True, align="L")
+        else:
+            pdf.cell(0, 10, txt=line, ln=True, align="L")
+    return pdf.output(dest="S").encode("latin-1")
+
+
+def make_content(lines: int, seed: int = 0) -> str:
+    """Generate report text mixing short lines and long paragraphs."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(lines):
+        count = rng.choice([4, 8, 30, 60]) if i % 5 else 120
+        out.append(" ".join(rng.choice(WORDS) for _ in range(count)))
+    return "\n".join(out)
+
+
+def best_of(repeat: int, func, *args) -> float:
+    """Return the fastest wall time of repeat calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--legacy-max-lines", type=int, default=20000)
+    args = parser.parse_args()
+
+    pdf_generator.warmup()
+    print(f"{'lines':>7} {'legacy ms':>10} {'layout ms':>10} {'speedup':>8}")
+    for lines in args.lines:
+        content = make_content(lines)
+        current = best_of(args.repeat, pdf_generator.render, content)
+        if lines > args.legacy_max_lines:
+            print(f"{lines:>7} {'-':>10} {current * 1000:>10.1f} {'-':>8}")
+            continue
+        legacy = best_of(args.repeat, legacy_render, content)
+        print(f"{lines:>7} {legacy * 1000:>10.1f} {current * 1000:>10.1f} {legacy / current:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark lexical (BM25) vs vector (FAISS) chunk retrieval.
+
+For synthetic transcripts of several sizes, times building the index and
+retrieving the top-k chunks for the extraction question, and measures
+recall: the share of applicant facts (GPA, intended major, SAT and ACT
+lines) found in the retrieved chunks.
+
+Offline, FAISS uses deterministic fake embeddings, so its timing excludes
+the embedding request and its recall is not meaningful. Pass --openai to
+embed with the configured OpenAI model instead (needs OPENAI_API_KEY and
+network access).
+
+Usage:
+    python -m benchmarks.bench_retrieval [--pages 5 20 80] [--documents 5]
+                                         [--repeat 3] [--openai]
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable, List, Sequence, Tuple
+
+from langchain_community.vectorstores import FAISS
+
+from backend.config import settings
+from backend.services import llm_service
+from backend.services.lexical_retriever import BM25Retriever
+from backend.services.llm_service import RAG_QUESTION
+from .fakes import fake_embeddings
+from .synthetic import transcript_pages
+
+FACT_PREFIXES = ("Cumulative GPA:", "Intended Major:", "SAT Total:", "ACT Composite:")
+
+
+def facts(pages: Sequence[str]) -> List[str]:
+    """Get the applicant fact lines of a transcript."""
+    return [
+        line
+        for page in pages
+        for line in page.splitlines()
+        if line.startswith(FACT_PREFIXES)
+    ]
+
+
+def recall(retrieved: Sequence[str], expected: Sequence[str]) -> float:
+    """Share of expected lines that appear in the retrieved chunks."""
+    found = sum(any(line in chunk for chunk in retrieved) for line in expected)
+    return found / len(expected)
+
+
+def timed(func: Callable[[], List[str]]) -> Tuple[float, List[str]]:
+    """Run a retrieval, returning its wall time in seconds and its chunks."""
+    start = time.perf_counter()
+    chunks = func()
+    return time.perf_counter() - start, chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 20, 80])
+    parser.add_argument("--documents", type=int, default=5, help="Transcripts per size")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--openai", action="store_true", help="Use real embeddings")
+    args = parser.parse_args()
+
+    embeddings = llm_service.embedding_model if args.openai else fake_embeddings()
+    k = settings.RETRIEVAL_TOP_K
+
+    def bm25(chunks: List[str]) -> List[str]:
+        retriever = BM25Retriever.from_texts(chunks, k=k)
+        return [doc.page_content for doc in retriever.get_relevant_documents(RAG_QUESTION)]
+
+    def faiss(chunks: List[str]) -> List[str]:
+        vectordb = FAISS.from_texts(chunks, embeddings)
+        retriever = vectordb.as_retriever(search_kwargs={"k": k})
+        return [doc.page_content for doc in retriever.get_relevant_documents(RAG_QUESTION)]
+
+    print(f"k={k} embeddings={'openai' if args.openai else 'fake'}")
+    print(
+        f"{'pages':>6} {'chunks':>7} {'bm25 ms':>9} {'faiss ms':>9} "
+        f"{'bm25 recall':>12} {'faiss recall':>13}"
+    )
+    for pages in args.pages:
+        bm25_times, faiss_times, bm25_recall, faiss_recall = [], [], [], []
+        chunk_counts = []
+        for seed in range(args.documents):
+            texts = transcript_pages(pages, seed)
+            chunks = llm_service.split_text("\n".join(texts))
+            expected = facts(texts)
+            chunk_counts.append(len(chunks))
+            for _ in range(args.repeat):
+                seconds, retrieved = timed(lambda: bm25(chunks))
+                bm25_times.append(seconds)
+            bm25_recall.append(recall(retrieved, expected))
+            # Real embeddings are billed, so embed each document once
+            for _ in range(args.repeat if not args.openai else 1):
+                seconds, retrieved = timed(lambda: faiss(chunks))
+                faiss_times.append(seconds)
+            faiss_recall.append(recall(retrieved, expected))
+
+        faiss_recall_text = (
+            f"{statistics.mean(faiss_recall):>13.2f}" if args.openai else f"{'n/a':>13}"
+        )
+        print(
+            f"{pages:>6} {statistics.mean(chunk_counts):>7.0f} "
+            f"{statistics.median(bm25_times) * 1000:>9.2f} "
+            f"{statistics.median(faiss_times) * 1000:>9.2f} "
+            f"{statistics.mean(bm25_recall):>12.2f} {faiss_recall_text}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Local OpenAI-compatible HTTP server that injects latency and errors.
+
+Serves /v1/chat/completions (plain and streamed) and /v1/embeddings with
+canned answers, so the client layer (pooling, retries, deadlines, hedging)
+can be exercised without network access or API keys. Every response is
+delayed by a base latency plus jitter; a share of requests is made slow
+(the tail) and a share fails with an error status.
+
+Usage:
+    python -m benchmarks.fake_openai [--port 8089] [--latency 0.05]
+                                     [--slow-rate 0.05] [--slow-latency 2]
+                                     [--error-rate 0.1] [--error-status 503]
+                                     [--stall 0]
+
+Then point the backend at it with OPENAI_BASE_URL=http://127.0.0.1:8089/v1.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+from .fakes import FAKE_RESPONSE
+
+EMBEDDING_SIZE = 64
+
+
+class FaultOptions:
+    """Latency and error injection for the fake server."""
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.01,
+        slow_rate: float = 0.0,
+        slow_latency: float = 2.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        retry_after: float = 0.0,
+        stall: float = 0.0,
+        seed: int = 0,
+    ):
+        """
+        Initialize options.
+
+        Args:
+            latency: Base seconds before each response
+            jitter: Extra uniformly random seconds, up to this many
+            slow_rate: Share of requests delayed by slow_latency instead
+            slow_latency: Seconds before a slow response
+            error_rate: Share of requests answered with error_status
+            error_status: Status of injected errors (429 adds Retry-After)
+            retry_after: Retry-After seconds sent with injected 429s
+            stall: Seconds a streamed completion pauses after its first event
+            seed: Random seed, so runs can be repeated
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.stall = stall
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def draw(self) -> Tuple[float, bool]:
+        """Pick the delay and whether to fail for one request."""
+        with self.lock:
+            self.requests += 1
+            if self.random.random() < self.slow_rate:
+                delay = self.slow_latency
+            else:
+                delay = self.latency + self.random.uniform(0, self.jitter)
+            fail = self.random.random() < self.error_rate
+            self.errors += fail
+        return delay, fail
+
+
+def _vector(text: str) -> List[float]:
+    """Deterministic unit-ish vector for a text."""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [(digest[i % len(digest)] - 128) / 128 for i in range(EMBEDDING_SIZE)]
+
+
+def _chat(body: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": FAKE_RESPONSE},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+
+
+def _chat_chunks(body: Dict[str, Any]) -> List[Dict[str, Any]]:
+    pieces = [{"role": "assistant", "content": ""}] + [
+        {"content": line + "\n"} for line in FAKE_RESPONSE.split("\n")
+    ]
+    chunks = [
+        {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+        }
+        for delta in pieces
+    ]
+    chunks[-1]["choices"][0]["finish_reason"] = "stop"
+    return chunks
+
+
+def _embeddings(body: Dict[str, Any]) -> Dict[str, Any]:
+    inputs = body.get("input", [])
+    if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+        inputs = [inputs]
+    data = []
+    for index, item in enumerate(inputs):
+        vector = _vector(json.dumps(item))
+        if body.get("encoding_format") == "base64":
+            packed = struct.pack(f"<{len(vector)}f", *vector)
+            embedding: Any = base64.b64encode(packed).decode("ascii")
+        else:
+            embedding = vector
+        data.append({"object": "embedding", "index": index, "embedding": embedding})
+    return {
+        "object": "list",
+        "data": data,
+        "model": body.get("model", "fake"),
+        "usage": {"prompt_tokens": 1, "total_tokens": 1},
+    }
+
+
+def make_handler(options: FaultOptions) -> type:
+    """Build a request handler class bound to the fault options."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so pooling is visible
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def _send_json(self, status: int, payload: Dict[str, Any], headers=()) -> None:
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self) -> None:
+            try:
+                self._respond()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client gave up, e.g. a cancelled hedge
+
+        def _respond(self) -> None:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            delay, fail = options.draw()
+            time.sleep(delay)
+
+            if fail:
+                headers = []
+                if options.error_status == 429:
+                    headers.append(("Retry-After", str(options.retry_after)))
+                error = {"message": "Injected failure", "type": "server_error"}
+                self._send_json(options.error_status, {"error": error}, headers)
+            elif self.path.endswith("/chat/completions") and body.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                events = [json.dumps(chunk) for chunk in _chat_chunks(body)] + ["[DONE]"]
+                for index, event in enumerate(events):
+                    data = f"data: {event}\n\n".encode("utf-8")
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                    if index == 0 and options.stall:
+                        self.wfile.flush()
+                        time.sleep(options.stall)
+                self.wfile.write(b"0\r\n\r\n")
+            elif self.path.endswith("/chat/completions"):
+                self._send_json(200, _chat(body))
+            elif self.path.endswith("/embeddings"):
+                self._send_json(200, _embeddings(body))
+            else:
+                self._send_json(404, {"error": {"message": "Not found"}})
+
+    return Handler
+
+
+def start_fake_openai(
+    options: FaultOptions, port: int = 0
+) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Serve the fake API from a background thread.
+
+    Args:
+        options: Latency and error injection
+        port: Port to listen on; 0 picks a free one
+
+    Returns:
+        (server, base URL ending in /v1); call server.shutdown() to stop
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(options))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-openai", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--retry-after", type=float, default=0.0)
+    parser.add_argument("--stall", type=float, default=0.0)
+    args = parser.parse_args()
+
+    options = FaultOptions(
+        latency=args.latency,
+        jitter=args.jitter,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+        stall=args.stall,
+    )
+    server, url = start_fake_openai(options, args.port)
+    print(f"Fake OpenAI API at {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Deterministic stand-ins for the OpenAI chat and embedding models."""
+
+import asyncio
+
+from langchain_community.chat_models.fake import FakeListChatModel
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from backend.services import llm_service
+
+FAKE_RESPONSE = (
+    "Applicant: Applicant 0000\n"
+    "GPA: 3.85\n"
+    "Intended Major: Computer Science\n"
+    "SAT: 1450\n"
+    "ACT: 32"
+)
+EMBEDDING_SIZE = 1536
+
+
+class SlowFakeChatModel(FakeListChatModel):
+    """FakeListChatModel that takes a fixed time to answer and counts calls."""
+
+    latency: float = 0.0
+    calls: int = 0
+
+    async def _agenerate(self, *args, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return await super()._agenerate(*args, **kwargs)
+
+
+def fake_llm() -> FakeListChatModel:
+    """Chat model that always answers with FAKE_RESPONSE."""
+    return FakeListChatModel(responses=[FAKE_RESPONSE])
+
+
+def fake_embeddings() -> DeterministicFakeEmbedding:
+    """Embedding model returning a fixed vector per text, sized like ada-002."""
+    return DeterministicFakeEmbedding(size=EMBEDDING_SIZE)
+
+
+def install_fakes() -> None:
+    """Point the llm_service singleton at the fake models."""
+    llm_service._llm = fake_llm()
+    llm_service._embedding_model = fake_embeddings()
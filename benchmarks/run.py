@@ -0,0 +1,173 @@
+"""
+Offline micro-benchmark suite for every pipeline stage.
+
+Generates synthetic transcript PDFs and times text extraction, token
+counting, RAG chunking, FAISS index build, the full RAG extraction (with
+deterministic fake LLM and embedding models) and report rendering. Results
+are written as JSON; pass --baseline to flag stages that got slower.
+
+Usage:
+    python -m benchmarks.run [--pages 1 10 50 150] [--repeat 5]
+                             [--output results.json]
+                             [--baseline old.json] [--threshold 0.2]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from backend.services import llm_service, pdf_generator, pdf_processor
+from backend.utils import shutdown_pools
+from .fakes import install_fakes
+from .synthetic import make_transcript_pdf
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """
+    Time a callable.
+
+    Args:
+        func: Zero-argument callable
+        repeat: Number of timed runs (after one warm-up run)
+
+    Returns:
+        dict: min_ms and median_ms
+    """
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": min(times), "median_ms": statistics.median(times)}
+
+
+def bench_document(path: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    """
+    Time every stage for one document.
+
+    Args:
+        path: Path to a PDF
+        repeat: Timed runs per stage
+
+    Returns:
+        dict: Timings per stage
+    """
+    from langchain_community.vectorstores import FAISS
+
+    pages = pdf_processor.extract_pages(path)
+    text = "\n".join(pages)
+    page_tokens = pdf_processor.encode_pages(pages)
+    chunks = llm_service.split_text(text, page_tokens)
+
+    return {
+        "extract_text": measure(lambda: pdf_processor.extract_pages(path), repeat),
+        "count_tokens": measure(lambda: pdf_processor.encode_pages(pages), repeat),
+        "mode_decision": measure(lambda: pdf_processor.exceeds_token_limit(pages), repeat),
+        "rag_chunking": measure(lambda: llm_service.split_text(text, page_tokens), repeat),
+        "faiss_build": measure(
+            lambda: FAISS.from_texts(chunks, llm_service.embedding_model), repeat
+        ),
+        "rag_extract": measure(lambda: llm_service.extract_with_rag(text), repeat),
+        "generate_report": measure(lambda: pdf_generator.render(text), repeat),
+    }
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """
+    Find stages whose median time grew by more than threshold.
+
+    Args:
+        results: Current results
+        baseline: Earlier results
+        threshold: Allowed relative slowdown (0.2 means 20%)
+
+    Returns:
+        Human-readable regression descriptions
+    """
+    regressions = []
+    for pages, stages in results["results"].items():
+        for stage, timing in stages.items():
+            old = baseline.get("results", {}).get(pages, {}).get(stage)
+            if not old or not old["median_ms"]:
+                continue
+            change = timing["median_ms"] / old["median_ms"] - 1
+            if change > threshold:
+                regressions.append(
+                    f"{stage} @ {pages} pages: {old['median_ms']:.2f} -> "
+                    f"{timing['median_ms']:.2f} ms (+{change:.0%})"
+                )
+    return regressions
+
+
+def git_revision() -> str:
+    """Get the current git commit, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50, 150])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    install_fakes()
+    results: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            path = os.path.join(tmp, f"transcript_{pages}.pdf")
+            with open(path, "wb") as f:
+                f.write(make_transcript_pdf(pages))
+            stages = bench_document(path, args.repeat)
+            results["results"][str(pages)] = stages
+            for stage, timing in stages.items():
+                print(f"{pages:>5} pages  {stage:<16} {timing['median_ms']:>10.2f} ms")
+    shutdown_pools()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Synthetic transcript PDFs for benchmarks."""
+
+import random
+from typing import List
+
+import fitz
+
+SCHOOLS = ["Lincoln High School", "Riverside Academy", "Westfield Preparatory"]
+MAJORS = ["Computer Science", "Biology", "Mechanical Engineering", "Economics"]
+SUBJECTS = [
+    "Algebra II",
+    "AP Calculus AB",
+    "AP Biology",
+    "English Literature",
+    "World History",
+    "Chemistry",
+    "Physics",
+    "Spanish III",
+    "Computer Programming",
+    "Art Studio",
+]
+GRADES = ["A", "A-", "B+", "B", "B-", "C+"]
+LEGEND = "Grading scale: A = 4.0, A- = 3.7, B+ = 3.3, B = 3.0, B- = 2.7, C+ = 2.3"
+LINES_PER_PAGE = 40
+
+
+def transcript_pages(pages: int, seed: int = 0) -> List[str]:
+    """
+    Generate deterministic transcript-like page texts.
+
+    Every page carries the same letterhead, grading legend and footer, as
+    real transcript packets do. Applicant fields appear on the first page.
+
+    Args:
+        pages: Number of pages
+        seed: Random seed
+
+    Returns:
+        Text of each page
+    """
+    rng = random.Random(seed)
+    school = rng.choice(SCHOOLS)
+    result = []
+    for page in range(pages):
+        lines = [f"{school} - Official Academic Transcript", LEGEND, ""]
+        if page == 0:
+            lines += [
+                f"Student: Applicant {seed:04d}",
+                f"Cumulative GPA: {rng.uniform(2.5, 4.0):.2f}",
+                f"Intended Major: {rng.choice(MAJORS)}",
+                f"SAT Total: {rng.randrange(1000, 1600, 10)}",
+                f"ACT Composite: {rng.randint(20, 36)}",
+                "",
+            ]
+        while len(lines) < LINES_PER_PAGE - 2:
+            year = rng.randint(2019, 2024)
+            lines.append(
+                f"{year} {rng.choice(SUBJECTS):<24} {rng.choice(GRADES):<3} "
+                f"Credits {rng.choice(['0.5', '1.0'])}"
+            )
+        lines += ["", f"Page {page + 1} of {pages} - Confidential"]
+        result.append("\n".join(lines))
+    return result
+
+
+def make_transcript_pdf(pages: int, seed: int = 0) -> bytes:
+    """
+    Generate a synthetic transcript PDF.
+
+    Args:
+        pages: Number of pages
+        seed: Random seed
+
+    Returns:
+        PDF file content as bytes
+    """
+    doc = fitz.open()
+    for text in transcript_pages(pages, seed):
+        page = doc.new_page()
+        page.insert_text((54, 54), text, fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
@@ -0,0 +1,99 @@
+"""
+Import-time profile report for the backend.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter and
+summarizes the slowest imports, so cold-start regressions are visible.
+
+Usage:
+    python scripts/import_profile.py [--module backend.main] [--top 20]
+                                     [--budget-ms 1500] [--output report.txt]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+
+def profile(module: str) -> List[Tuple[int, int, int, str]]:
+    """
+    Collect import timings for a module.
+
+    Args:
+        module: Module to import
+
+    Returns:
+        (self_us, cumulative_us, depth, name) for every import
+    """
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "import-profile")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(proc.returncode)
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def report(module: str, rows: List[Tuple[int, int, int, str]], top: int) -> str:
+    """
+    Format the slowest imports.
+
+    Args:
+        module: Profiled module
+        rows: Timings from profile()
+        top: Number of imports to list
+
+    Returns:
+        Human-readable report
+    """
+    total = next((cum for _, cum, _, name in rows if name == module), 0)
+    lines = [f"Import profile for {module}: {total / 1000:.1f} ms total", ""]
+    lines.append(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    by_cumulative = sorted(rows, key=lambda row: row[1], reverse=True)
+    for self_us, cumulative_us, _, name in by_cumulative[:top]:
+        lines.append(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {name}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="backend.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=0,
+        help="Exit non-zero if the total import time exceeds this budget",
+    )
+    parser.add_argument("--output", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    rows = profile(args.module)
+    text = report(args.module, rows, args.top)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    total_ms = next((cum for _, cum, _, name in rows if name == args.module), 0) / 1000
+    if args.budget_ms and total_ms > args.budget_ms:
+        print(f"Import time {total_ms:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
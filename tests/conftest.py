@@ -0,0 +1,86 @@
+"""Shared fixtures: isolated settings, an offline tokenizer and stub models."""
+
+import os
+import tempfile
+import threading
+
+# Settings are read at import, so point state at a scratch directory first
+_STATE_DIR = tempfile.mkdtemp(prefix="pdf-extractor-tests-")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ["EMBEDDING_CACHE_PATH"] = ""
+os.environ["RESULT_CACHE_DIR"] = ""
+os.environ["JOB_DB_PATH"] = os.path.join(_STATE_DIR, "jobs.sqlite3")
+os.environ["OUTPUT_DIR"] = os.path.join(_STATE_DIR, "outputs")
+os.environ["REPORT_STORE_DIR"] = ""
+
+import pytest  # noqa: E402
+
+from backend.services import llm_service, pdf_processor, result_cache  # noqa: E402
+from benchmarks.fakes import FAKE_RESPONSE, SlowFakeChatModel  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def encoder():
+    """
+    The model's tiktoken encoding, or a byte-level one when it cannot be
+    downloaded, so token counts work offline.
+    """
+    import tiktoken
+
+    try:
+        pdf_processor.encoder
+    except Exception:
+        pdf_processor._encoder = tiktoken.Encoding(
+            name="offline-bytes",
+            pat_str=r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""",
+            mergeable_ranks={bytes([i]): i for i in range(256)},
+            special_tokens={},
+        )
+    return pdf_processor.encoder
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    """Start every test with an empty result cache."""
+    result_cache._memory.clear()
+    yield
+    result_cache._memory.clear()
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """
+    Replace the chat model with a stub answering FAKE_RESPONSE.
+
+    Returns:
+        The stub; set its latency and read its calls
+    """
+    model = SlowFakeChatModel(responses=[FAKE_RESPONSE])
+    monkeypatch.setattr(llm_service, "_llm", model)
+    monkeypatch.setattr(llm_service, "_models", {})
+    return model
+
+
+@pytest.fixture
+def record_threads(monkeypatch):
+    """
+    Record the threads an object's methods run on.
+
+    Returns:
+        record(target, *names), which wraps the named methods of target and
+        returns the list of threads their calls ran on
+    """
+
+    def record(target, *names):
+        threads = []
+        for name in names:
+            method = getattr(target, name)
+
+            def wrapper(*args, _method=method, **kwargs):
+                threads.append(threading.current_thread())
+                return _method(*args, **kwargs)
+
+            monkeypatch.setattr(target, name, wrapper)
+        return threads
+
+    return record
@@ -0,0 +1,93 @@
+"""In-flight admission control."""
+
+import asyncio
+
+import pytest
+
+from backend.services.admission import AdmissionController, OverloadedError
+
+
+def test_large_waiter_is_not_starved_by_later_small_ones():
+    controller = AdmissionController(capacity=10, retry_after=1)
+    order = []
+
+    async def hold(name, tokens, release):
+        async with controller.admit(tokens, wait=True):
+            order.append(name)
+            await release.wait()
+
+    async def run():
+        first = asyncio.Event()
+        release = asyncio.Event()
+        running = asyncio.ensure_future(hold("small-0", 4, first))
+        await asyncio.sleep(0)
+        large = asyncio.ensure_future(hold("large", 10, release))
+        await asyncio.sleep(0)
+        # These would fit next to small-0 but must queue behind the large one
+        smalls = [
+            asyncio.ensure_future(hold(f"small-{i}", 4, release)) for i in (1, 2)
+        ]
+        await asyncio.sleep(0)
+        assert order == ["small-0"]
+        first.set()
+        await running
+        await asyncio.sleep(0)
+        assert order == ["small-0", "large"]
+        release.set()
+        await asyncio.gather(large, *smalls)
+
+    asyncio.run(run())
+
+    assert order == ["small-0", "large", "small-1", "small-2"]
+    assert controller.in_flight == 0
+
+
+def test_interactive_request_is_shed_while_work_is_queued():
+    controller = AdmissionController(capacity=10, retry_after=1)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def hold(tokens):
+            async with controller.admit(tokens, wait=True):
+                await release.wait()
+
+        running = asyncio.ensure_future(hold(8))
+        await asyncio.sleep(0)
+        queued = asyncio.ensure_future(hold(8))
+        await asyncio.sleep(0)
+        with pytest.raises(OverloadedError):
+            async with controller.admit(1):
+                pass
+        release.set()
+        await asyncio.gather(running, queued)
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    controller = AdmissionController(capacity=10, retry_after=1)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def hold(tokens):
+            async with controller.admit(tokens, wait=True):
+                await release.wait()
+
+        running = asyncio.ensure_future(hold(8))
+        await asyncio.sleep(0)
+        cancelled = asyncio.ensure_future(hold(8))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        # Nothing is queued any more, so a small request fits again
+        async with controller.admit(2):
+            pass
+        release.set()
+        await running
+
+    asyncio.run(run())
+
+    assert controller.in_flight == 0
@@ -0,0 +1,64 @@
+"""Batch processing: abandoned batches and per-document failures."""
+
+import asyncio
+
+from backend.services import pdf_generator, singleflight
+from backend.services.pipeline import process_batch, process_document
+from backend.utils import SpooledUpload
+from benchmarks.synthetic import make_transcript_pdf
+
+
+def make_upload(name: str, pdf: bytes) -> SpooledUpload:
+    upload = SpooledUpload(name, max_memory=1024 * 1024)
+    upload.write(pdf)
+    return upload
+
+
+def test_abandoned_batch_releases_its_flights(stub_llm):
+    # Generated PDFs differ on every call, so build each one once
+    a, b = make_transcript_pdf(1, seed=1), make_transcript_pdf(1, seed=2)
+
+    async def run():
+        # b.pdf is cached, so the batch yields it right after leading a.pdf
+        await process_document(make_upload("b.pdf", b))
+
+        batch = process_batch([make_upload("a.pdf", a), make_upload("b.pdf", b)], render=False)
+        first = await batch.__anext__()
+        await batch.aclose()
+        in_flight = singleflight.stats()["in_flight"]
+
+        later = await asyncio.wait_for(process_document(make_upload("a.pdf", a)), timeout=3)
+        return first, in_flight, later
+
+    first, in_flight, later = asyncio.run(run())
+
+    assert first["filename"] == "b.pdf"
+    assert first["cached"] is True
+    assert in_flight == 0
+    assert later["response"]
+
+
+def test_failing_document_does_not_end_the_batch(stub_llm, monkeypatch):
+    render = pdf_generator.render
+    calls = []
+
+    def render_once(response):
+        calls.append(response)
+        if len(calls) == 1:
+            raise ValueError("Cannot render report")
+        return render(response)
+
+    monkeypatch.setattr(pdf_generator, "render", render_once)
+    uploads = [
+        make_upload(f"{seed}.pdf", make_transcript_pdf(1, seed=seed)) for seed in (5, 6, 7)
+    ]
+
+    async def run():
+        return [item async for item in process_batch(uploads)]
+
+    items = asyncio.run(run())
+
+    assert sorted(item["status"] for item in items) == ["error", "ok", "ok"]
+    assert [item["detail"] for item in items if item["status"] == "error"] == [
+        "Cannot render report"
+    ]
@@ -0,0 +1,21 @@
+"""Resuming bulk extraction runs."""
+
+from backend.bulk import load_done
+
+
+def test_load_done_skips_failed_partial_and_unnamed_records(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text(
+        '{"file": "a.pdf", "response": "{}"}\n'
+        '{"file": "b.pdf", "error": "boom"}\n'
+        '{"response": "{}"}\n'
+        "[1, 2]\n"
+        '{"file": "c.pdf", "resp',
+        encoding="utf-8",
+    )
+
+    assert load_done(str(output)) == {"a.pdf"}
+
+
+def test_load_done_without_output_file(tmp_path):
+    assert load_done(str(tmp_path / "missing.jsonl")) == set()
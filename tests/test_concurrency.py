@@ -0,0 +1,51 @@
+"""Concurrent /process requests share the event loop instead of queueing."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from backend.config import settings
+from backend.main import app
+from benchmarks.synthetic import make_transcript_pdf
+
+LLM_LATENCY = 1.0
+REQUESTS = 8
+
+
+@pytest.fixture
+def llm_only(monkeypatch, stub_llm):
+    """Send every document to the stub LLM: no rules, no cached results."""
+    monkeypatch.setattr(settings, "RULES_ENABLED", False)
+    stub_llm.latency = LLM_LATENCY
+    return stub_llm
+
+
+def test_concurrent_requests_overlap_llm_calls(llm_only):
+    pdfs = [make_transcript_pdf(2, seed=seed) for seed in range(REQUESTS)]
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test", timeout=30
+        ) as client:
+
+            async def post(pdf: bytes) -> httpx.Response:
+                return await client.post(
+                    "/api/v1/process",
+                    params={"render": "false"},
+                    files={"file": ("transcript.pdf", pdf, "application/pdf")},
+                )
+
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(post(pdf) for pdf in pdfs))
+            return responses, time.perf_counter() - start
+
+    responses, elapsed = asyncio.run(run())
+
+    assert [r.status_code for r in responses] == [200] * REQUESTS
+    assert all(r.json()["mode"] == "direct" for r in responses)
+    assert llm_only.calls == REQUESTS
+    # Serialized calls would take REQUESTS * LLM_LATENCY
+    assert elapsed < 2 * LLM_LATENCY
@@ -0,0 +1,27 @@
+"""Embedding cache: repeated chunks are served from SQLite, off the event loop."""
+
+import asyncio
+import threading
+
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from backend.services.embedding_cache import CachedEmbeddings
+
+
+def test_aembed_documents_reuses_vectors_off_the_loop(tmp_path, record_threads):
+    model = DeterministicFakeEmbedding(size=8)
+    cache = CachedEmbeddings(model, "fake", str(tmp_path / "embeddings.sqlite3"), batch_size=2)
+    threads = record_threads(cache, "_load", "_store")
+    texts = ["letterhead", "course row", "letterhead", "footer"]
+
+    first = asyncio.run(cache.aembed_documents(texts))
+    second = asyncio.run(cache.aembed_documents(texts))
+
+    # Stored as float32
+    expected = [pytest.approx(model.embed_query(text), rel=1e-6) for text in texts]
+    assert first == expected
+    assert second == expected
+    assert cache.stats() == {"hits": 1 + 4, "misses": 3}
+    assert threads
+    assert threading.main_thread() not in threads
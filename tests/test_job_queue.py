@@ -0,0 +1,50 @@
+"""Job queue: results reach the store, written off the event loop."""
+
+import asyncio
+import threading
+
+import pytest
+
+from backend.services.job_queue import JobQueue, JobStore, QueueFullError
+from backend.utils import SpooledUpload
+from benchmarks.synthetic import make_transcript_pdf
+
+
+def make_upload(seed: int) -> SpooledUpload:
+    upload = SpooledUpload(f"transcript-{seed}.pdf", max_memory=1024 * 1024)
+    upload.write(make_transcript_pdf(1, seed=seed))
+    return upload
+
+
+def test_job_runs_and_store_writes_leave_the_loop(tmp_path, stub_llm, record_threads):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    threads = record_threads(store, "_execute")
+    queue = JobQueue(store, workers=1, max_queued=4)
+
+    async def run():
+        await queue.start()
+        job_id = await queue.submit(make_upload(1), render=False)
+        await queue.stop(drain_timeout=10)
+        return job_id
+
+    job = store.get(asyncio.run(run()))
+
+    assert job["status"] == "done"
+    assert job["result"]["response"]
+    assert threads
+    assert threading.main_thread() not in threads
+
+
+def test_submit_rejects_when_full(tmp_path):
+    queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite3")), workers=1, max_queued=1)
+
+    async def run():
+        # No workers started, so the first job stays queued
+        queue._queue = asyncio.Queue(maxsize=1)
+        await queue.submit(make_upload(1), render=False)
+        with pytest.raises(QueueFullError):
+            await queue.submit(make_upload(2), render=False)
+
+    asyncio.run(run())
+    assert queue.submitted == 1
+    assert queue.rejected == 1
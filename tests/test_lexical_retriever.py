@@ -0,0 +1,54 @@
+"""BM25 retrieval: keyword ranking without an embedding request."""
+
+import asyncio
+
+from backend.config import settings
+from backend.services import llm_service
+from backend.services.lexical_retriever import BM25Index, tokenize
+from benchmarks.fakes import FAKE_RESPONSE
+
+CHUNKS = [
+    "Lincoln High School - Official Academic Transcript",
+    "Grade 9 English I A Algebra I B+ World History A-",
+    "Cumulative GPA: 3.85 (weighted)",
+    "Intended Major: Biology",
+    "Grade 10 Chemistry A Geometry A Spanish II B",
+]
+
+
+class NoEmbeddings:
+    """Embedding model that fails the test if it is used."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"embedding model used: {name}")
+
+
+def test_decimal_numbers_are_one_term():
+    assert tokenize("Cumulative GPA: 3.85") == ["cumulative", "gpa", "3.85"]
+
+
+def test_matching_chunks_rank_first_and_k_is_filled_in_order():
+    index = BM25Index(CHUNKS)
+
+    best = [position for position, _ in index.search("What is the GPA and intended major?", 4)]
+
+    assert set(best[:2]) == {2, 3}
+    assert best[2:] == [0, 1]
+
+
+def test_bm25_backend_answers_without_embeddings(monkeypatch, stub_llm):
+    monkeypatch.setattr(settings, "RETRIEVAL_BACKEND", "bm25")
+    monkeypatch.setattr(settings, "RETRIEVAL_TOP_K", 2)
+    monkeypatch.setattr(llm_service, "_embedding_model", NoEmbeddings())
+
+    async def run():
+        messages = await llm_service._arag_messages(CHUNKS, None)
+        answer = await llm_service.aextract_with_rag(CHUNKS)
+        return messages, answer
+
+    messages, answer = asyncio.run(run())
+    prompt = "\n".join(message.content for message in messages)
+
+    assert "Cumulative GPA: 3.85" in prompt
+    assert "Chemistry" not in prompt
+    assert answer == FAKE_RESPONSE
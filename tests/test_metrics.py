@@ -0,0 +1,50 @@
+"""Stage timings in responses and the Prometheus /metrics endpoint."""
+
+import asyncio
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+from backend.config import settings
+from backend.main import app
+from benchmarks.synthetic import make_transcript_pdf
+
+
+def sample(text: str, name: str, labels: dict) -> float:
+    """Value of one sample in a Prometheus exposition, or 0 if absent."""
+    for family in text_string_to_metric_families(text):
+        for found in family.samples:
+            if found.name == name and all(found.labels.get(k) == v for k, v in labels.items()):
+                return found.value
+    return 0.0
+
+
+def test_processed_document_shows_up_in_timings_and_metrics(monkeypatch, stub_llm):
+    monkeypatch.setattr(settings, "RULES_ENABLED", False)
+    direct = {"mode": "direct"}
+    extract = {"stage": "extract", "mode": "direct"}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            before = (await client.get("/metrics")).text
+            response = await client.post(
+                "/api/v1/process",
+                params={"render": "false", "timings": "true"},
+                files={"file": ("transcript.pdf", make_transcript_pdf(1, seed=7), "application/pdf")},
+            )
+            after = (await client.get("/metrics")).text
+        return before, response, after
+
+    before, response, after = asyncio.run(run())
+    body = response.json()
+
+    assert response.status_code == 200
+    assert {"extract", "tokenize", "llm", "total"} <= set(body["timings"])
+    assert "extract;dur=" in response.headers["server-timing"]
+    assert sample(after, "pdf_extractor_mode_total", direct) == (
+        sample(before, "pdf_extractor_mode_total", direct) + 1
+    )
+    assert sample(after, "pdf_extractor_stage_seconds_count", extract) == (
+        sample(before, "pdf_extractor_stage_seconds_count", extract) + 1
+    )
@@ -0,0 +1,82 @@
+"""Cascade check: which answers are complete, and when calls escalate."""
+
+import asyncio
+
+import pytest
+from langchain_community.chat_models.fake import FakeListChatModel
+
+from backend.config import settings
+from backend.services import llm_service
+from backend.services.lexical_retriever import BM25Retriever
+from backend.services.llm_service import RAG_QUESTION
+from backend.services.model_cascade import ModelCascade, ModelTier, missing_fields
+from benchmarks.fakes import FAKE_RESPONSE
+
+PROSE_ANSWER = (
+    "The applicant has a cumulative GPA of 3.85 and plans to major in Computer "
+    "Science. They scored 1450 on the SAT."
+)
+
+
+def test_labelled_answer_is_complete():
+    assert missing_fields("**GPA:** 3.85\n- Intended Major: Biology\n- ACT: 31") == []
+
+
+def test_prose_answer_is_complete():
+    assert missing_fields(PROSE_ANSWER) == []
+
+
+def test_unstated_fields_are_missing():
+    answer = "The GPA is not given. The intended major is not stated."
+
+    assert missing_fields(answer) == ["gpa", "major"]
+
+
+def test_answer_without_test_scores_is_complete():
+    assert missing_fields("GPA: 3.62\nIntended Major: History\nSAT: Not listed") == []
+
+
+def test_prose_answer_does_not_escalate():
+    cascade = ModelCascade([ModelTier("small", 1000), ModelTier("large")])
+    models = []
+
+    async def call(model):
+        models.append(model)
+        return PROSE_ANSWER
+
+    assert asyncio.run(cascade.run(100, call)) == PROSE_ANSWER
+    assert models == ["small"]
+
+
+@pytest.fixture
+def tiers(monkeypatch):
+    """A two-tier cascade whose small model leaves out the major."""
+    small = FakeListChatModel(responses=["GPA: 3.85"] * 4)
+    large = FakeListChatModel(responses=[FAKE_RESPONSE] * 4)
+    monkeypatch.setattr(settings, "RETRIEVAL_BACKEND", "bm25")
+    monkeypatch.setattr(llm_service, "_models", {"small": small, "large": large})
+    monkeypatch.setattr(
+        llm_service, "cascade", ModelCascade([ModelTier("small", 10**6), ModelTier("large")])
+    )
+    return small, large
+
+
+def test_sync_direct_extraction_escalates(tiers):
+    assert llm_service.extract_direct("Cumulative GPA: 3.85") == FAKE_RESPONSE
+
+
+def test_sync_and_async_rag_retrieve_with_one_query(tiers, monkeypatch):
+    queries = []
+    search = BM25Retriever._get_relevant_documents
+
+    def record(self, query, **kwargs):
+        queries.append(query)
+        return search(self, query, **kwargs)
+
+    monkeypatch.setattr(BM25Retriever, "_get_relevant_documents", record)
+    text = "Cumulative GPA: 3.85\nIntended Major: Biology\nSAT Total: 1450"
+
+    assert llm_service.extract_with_rag(text) == FAKE_RESPONSE
+    asyncio.run(llm_service.aextract_with_rag(llm_service.split_text(text)))
+
+    assert queries == [RAG_QUESTION, RAG_QUESTION]
@@ -0,0 +1,194 @@
+"""Retrying transport: retries, the overall call deadline and hedging."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from backend.services.metrics import UPSTREAM_HEDGES_TOTAL
+from backend.services.openai_transport import (
+    LatencyTracker,
+    RetryingAsyncTransport,
+    RetryPolicy,
+)
+from benchmarks.fake_openai import FaultOptions, start_fake_openai
+
+URL = "http://fake/v1/chat/completions"
+
+
+class ScriptedTransport(httpx.AsyncBaseTransport):
+    """Answers with the given status codes in turn, after a delay."""
+
+    def __init__(self, statuses, delay=0.0):
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.requests = 0
+
+    async def handle_async_request(self, request):
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        return httpx.Response(self.statuses.pop(0), request=request)
+
+
+def post(transport):
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.post(URL, json={})
+
+    return asyncio.run(run())
+
+
+def test_retries_server_errors():
+    upstream = ScriptedTransport([503, 500, 200])
+    policy = RetryPolicy(max_retries=3, backoff_base=0.01, backoff_max=0.01)
+
+    response = post(RetryingAsyncTransport(upstream, policy))
+
+    assert response.status_code == 200
+    assert upstream.requests == 3
+
+
+def test_deadline_bounds_a_slow_call():
+    upstream = ScriptedTransport([200], delay=5)
+    policy = RetryPolicy(max_retries=0, deadline=0.2)
+
+    with pytest.raises(httpx.TimeoutException):
+        post(RetryingAsyncTransport(upstream, policy))
+
+
+class ScriptedDelays(FaultOptions):
+    """Fault options answering after the given delays in turn, then quickly."""
+
+    def __init__(self, delays, **kwargs):
+        super().__init__(**kwargs)
+        self.delays = list(delays)
+
+    def draw(self):
+        with self.lock:
+            self.requests += 1
+            return (self.delays.pop(0) if self.delays else 0.01), False
+
+
+class CountingTransport(httpx.AsyncBaseTransport):
+    """Pooled transport that counts the attempts cancelled mid-flight."""
+
+    def __init__(self):
+        self.transport = httpx.AsyncHTTPTransport()
+        self.cancelled = 0
+
+    async def handle_async_request(self, request):
+        try:
+            return await self.transport.handle_async_request(request)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+@pytest.fixture
+def fake_openai():
+    """Start a fake OpenAI server with the given fault options; yields (options, url)."""
+    servers = []
+
+    def start(options):
+        server, url = start_fake_openai(options)
+        servers.append(server)
+        return options, url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def warm_latencies(seconds=0.01):
+    latencies = LatencyTracker()
+    for _ in range(latencies.min_samples):
+        latencies.observe("chat", seconds)
+    return latencies
+
+
+def hedges(outcome):
+    return UPSTREAM_HEDGES_TOTAL.labels(endpoint="chat", outcome=outcome)._value.get()
+
+
+def chat(url, transport, stream=False):
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            request = client.build_request(
+                "POST", f"{url}/chat/completions", json={"model": "fake", "stream": stream}
+            )
+            response = await client.send(request, stream=True)
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+            return response
+
+    return asyncio.run(run())
+
+
+def test_hedge_wins_over_a_slow_attempt(fake_openai):
+    options, url = fake_openai(ScriptedDelays([2.0]))
+    upstream = CountingTransport()
+    transport = RetryingAsyncTransport(
+        upstream,
+        RetryPolicy(max_retries=0, deadline=5),
+        hedge=True,
+        hedge_min_delay=0.1,
+        latencies=warm_latencies(),
+    )
+    won = hedges("won")
+
+    start = time.monotonic()
+    response = chat(url, transport)
+
+    assert response.status_code == 200
+    assert time.monotonic() - start < 1.5
+    assert options.requests == 2
+    assert hedges("won") == won + 1
+    # The slow first attempt is cancelled once the hedge answers
+    assert upstream.cancelled == 1
+
+
+def test_fast_attempt_is_not_hedged(fake_openai):
+    options, url = fake_openai(ScriptedDelays([0.01]))
+    transport = RetryingAsyncTransport(
+        CountingTransport(),
+        RetryPolicy(max_retries=0, deadline=5),
+        hedge=True,
+        hedge_min_delay=0.5,
+        latencies=warm_latencies(),
+    )
+    lost, won = hedges("lost"), hedges("won")
+
+    assert chat(url, transport).status_code == 200
+    assert options.requests == 1
+    assert (hedges("lost"), hedges("won")) == (lost, won)
+
+
+def test_hedging_waits_for_latency_history(fake_openai):
+    options, url = fake_openai(ScriptedDelays([0.5]))
+    transport = RetryingAsyncTransport(
+        CountingTransport(),
+        RetryPolicy(max_retries=0, deadline=5),
+        hedge=True,
+        hedge_min_delay=0.01,
+    )
+
+    assert chat(url, transport).status_code == 200
+    assert options.requests == 1
+
+
+def test_deadline_covers_a_stalled_stream_body(fake_openai):
+    options, url = fake_openai(ScriptedDelays([0.01], stall=3))
+    transport = RetryingAsyncTransport(
+        CountingTransport(), RetryPolicy(max_retries=0, deadline=0.5)
+    )
+
+    start = time.monotonic()
+    with pytest.raises(httpx.TimeoutException):
+        chat(url, transport, stream=True)
+    assert time.monotonic() - start < 2
@@ -0,0 +1,28 @@
+"""Page packing ranks pages by applicant field terms only."""
+
+from backend.services.page_packer import pack_pages
+from backend.services.pdf_processor import PageTokens
+
+
+def page_tokens(pages, size=100):
+    return PageTokens([[0] * size for _ in pages])
+
+
+def test_pages_without_field_terms_fall_back_to_rag():
+    pages = [
+        "Letter of recommendation for the applicant and their application.",
+        "Please extract and review the attached essays and activities.",
+    ]
+
+    assert pack_pages(pages, page_tokens(pages), budget=1000) == []
+
+
+def test_field_pages_are_chosen_first():
+    pages = [
+        "Letter of recommendation for the applicant and their application.",
+        "Cumulative GPA: 3.85",
+        "Essay about the applicant and their summer and their goals.",
+        "SAT Total: 1450",
+    ]
+
+    assert pack_pages(pages, page_tokens(pages), budget=200) == [1, 3]
@@ -0,0 +1,42 @@
+"""Report layout: glyph-width wrapping and long reports."""
+
+import fitz
+
+from backend.services.pdf_generator import PDFGenerator
+
+
+def test_wrapped_lines_fit_the_page_and_keep_every_word():
+    generator = PDFGenerator()
+    metrics = generator._font_metrics(generator._new_document())
+    max_width = 20_000
+    line = " ".join(
+        ["Mathematics", "A", "Honors", "W" * 40, "Chemistry", "B+"] * 30
+    )
+
+    lines = list(PDFGenerator._wrap(line, metrics, max_width))
+
+    assert len(lines) > 1
+    assert all(metrics.measure(wrapped) <= max_width for wrapped in lines)
+    assert "".join(lines).replace(" ", "") == line.replace(" ", "")
+    for wrapped, following in zip(lines, lines[1:]):
+        # Greedy: the next word would not have fit on this line
+        next_word = following.split()[0]
+        assert metrics.measure(f"{wrapped} {next_word}") > max_width
+
+
+def test_short_lines_are_kept_verbatim():
+    generator = PDFGenerator()
+    metrics = generator._font_metrics(generator._new_document())
+
+    assert list(PDFGenerator._wrap("  GPA:  3.85", metrics, 20_000)) == ["  GPA:  3.85"]
+
+
+def test_long_report_renders_every_line_in_order():
+    content = "\n".join(f"Course {i}: Algebra II, grade A" for i in range(400))
+
+    doc = fitz.open(stream=PDFGenerator().render(content), filetype="pdf")
+    text = "".join(page.get_text() for page in doc)
+
+    assert doc.page_count > 1
+    positions = [text.index(f"Course {i}:") for i in (0, 199, 399)]
+    assert positions == sorted(positions)
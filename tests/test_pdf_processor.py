@@ -0,0 +1,54 @@
+"""Page extraction, page-by-page token counting and the mode decision."""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from backend.config import settings
+from backend.services import pdf_processor
+from benchmarks.synthetic import make_transcript_pdf
+
+
+def test_page_tokens_match_the_joined_text():
+    pages = ["Cumulative GPA: 3.85", "Intended Major: Biology", "SAT Total: 1450"]
+
+    page_tokens = pdf_processor.encode_pages(pages)
+
+    assert page_tokens.complete
+    assert page_tokens.total == pdf_processor.count_tokens("\n".join(pages))
+
+
+def test_mode_decision_stops_at_the_threshold(monkeypatch):
+    pages = ["word " * 40] * 10
+    page = len(pdf_processor.encode_pages(pages).pages[0])
+    monkeypatch.setattr(settings, "MAX_TOKENS", page + 1)
+
+    partial = pdf_processor.encode_pages(pages, limit=settings.MAX_TOKENS)
+
+    assert not partial.complete
+    assert len(partial.pages) == 2
+    assert pdf_processor.exceeds_token_limit(pages)
+    assert not pdf_processor.exceeds_token_limit(pages[:1])
+
+
+def test_sharded_extraction_matches_serial_extraction(monkeypatch):
+    module = sys.modules["backend.services.pdf_processor"]
+    pdf = make_transcript_pdf(10, seed=3)
+    pool = ThreadPoolExecutor(max_workers=3)
+    ranges = []
+
+    def submit(func, source, start, stop):
+        ranges.append((start, stop))
+        return pool.submit(func, source, start, stop)
+
+    monkeypatch.setattr(settings, "PROCESS_WORKERS", 3)
+    monkeypatch.setattr(settings, "PARALLEL_EXTRACT_MIN_PAGES", 4)
+    monkeypatch.setattr(module, "get_process_pool", lambda: SimpleNamespace(submit=submit))
+
+    sharded = module.extract_pages(pdf)
+    serial = module.extract_pages(pdf, parallel=False)
+    pool.shutdown()
+
+    assert ranges == [(0, 3), (3, 6), (6, 10)]
+    assert sharded == serial
+    assert len(serial) == 10
@@ -0,0 +1,27 @@
+"""CPU-stage decision shared by the API pipeline and backend.bulk."""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.config import settings
+from backend.services.pipeline import prepare_pages
+
+
+def test_rules_answer_without_llm_input(monkeypatch):
+    monkeypatch.setattr(settings, "RULES_ENABLED", True)
+
+    prepared = prepare_pages(["Cumulative GPA: 3.85\nIntended Major: Biology\nSAT: 1450"])
+
+    assert prepared["result"]["mode"] == "rules"
+    assert prepared["result"]["fields"]["sat"] == "1450"
+    assert "text" not in prepared and "chunks" not in prepared
+
+
+def test_decision_runs_in_a_worker_process(monkeypatch):
+    monkeypatch.setattr(settings, "RULES_ENABLED", False)
+    pages = ["Cumulative GPA: 3.85", "Intended Major: Biology"]
+
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        prepared = pool.submit(prepare_pages, pages).result()
+
+    assert prepared["result"] == {**prepare_pages(pages)["result"], "mode": "direct"}
+    assert prepared["text"] == "\n".join(pages)
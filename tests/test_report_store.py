@@ -0,0 +1,65 @@
+"""Report store: fetching by ID, eviction, and the report just written."""
+
+import asyncio
+import os
+import sys
+
+import httpx
+
+from backend.main import app
+from backend.services import report_store as shared_store
+from backend.services.report_store import ReportStore
+
+
+def test_report_is_fetched_by_id(monkeypatch, tmp_path):
+    store = ReportStore(str(tmp_path), max_bytes=0, ttl_seconds=0)
+    monkeypatch.setattr(shared_store, "path_for", store.path_for)
+    report_id = store.put(b"%PDF-1.4 report")
+
+    async def get(report_id):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(f"/api/v1/reports/{report_id}")
+
+    found = asyncio.run(get(report_id))
+    assert found.status_code == 200
+    assert found.content == b"%PDF-1.4 report"
+    assert asyncio.run(get("0" * 32)).status_code == 404
+    assert asyncio.run(get("../secrets")).status_code == 404
+
+
+def test_oldest_reports_are_evicted_first(tmp_path):
+    store = ReportStore(str(tmp_path), max_bytes=250, ttl_seconds=0)
+    store._eviction.share = 0  # scan on every write
+    ids = []
+    for index in range(4):
+        ids.append(store.put(bytes([index]) * 100))
+        os.utime(store._path(ids[-1]), (index, index))
+
+    assert [store.path_for(report_id) is not None for report_id in ids] == [
+        False,
+        False,
+        True,
+        True,
+    ]
+
+
+def test_report_over_the_budget_is_kept(tmp_path):
+    store = ReportStore(str(tmp_path), max_bytes=100, ttl_seconds=0)
+
+    report_id = store.put(b"x" * 1000)
+
+    assert store.path_for(report_id) is not None
+
+
+def test_eviction_scans_once_per_budget_share(tmp_path, monkeypatch):
+    scans = []
+    module = sys.modules[ReportStore.__module__]
+    monkeypatch.setattr(module, "evict_directory", lambda *args, **kwargs: scans.append(1))
+    store = ReportStore(str(tmp_path), max_bytes=10 ** 9, ttl_seconds=0)
+
+    for index in range(50):
+        store.put(b"report %d" % index)
+
+    # The first write scans; the rest stay far below 5% of the budget
+    assert len(scans) == 1
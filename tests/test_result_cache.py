@@ -0,0 +1,42 @@
+"""Result cache disk tier: async access and throttled eviction."""
+
+import asyncio
+
+from backend.services.result_cache import ResultCache
+
+RESULT = {"tokens": 10, "tokens_saved": 0, "mode": "direct", "response": "GPA: 3.85"}
+
+
+def test_aput_then_aget_from_disk(tmp_path):
+    writer = ResultCache(max_entries=4, disk_dir=str(tmp_path))
+    asyncio.run(writer.aput("key", RESULT))
+
+    # A fresh instance has an empty memory tier, so this reads the file
+    reader = ResultCache(max_entries=4, disk_dir=str(tmp_path))
+    assert asyncio.run(reader.aget("key")) == RESULT
+    assert asyncio.run(reader.aget("missing")) is None
+    assert reader.stats()["disk_hits"] == 1
+    assert reader.stats()["misses"] == 1
+
+
+def test_eviction_scans_once_per_budget_share(tmp_path):
+    cache = ResultCache(max_entries=4, disk_dir=str(tmp_path), max_disk_bytes=10 ** 9)
+    scans = []
+    cache._disk_evict = lambda: scans.append(1)
+
+    for index in range(50):
+        cache.put(f"key-{index}", RESULT)
+
+    # The first write scans; the rest stay far below 5% of the budget
+    assert len(scans) == 1
+
+
+def test_eviction_keeps_disk_tier_near_budget(tmp_path):
+    entry_size = len(str(RESULT))
+    cache = ResultCache(max_entries=4, disk_dir=str(tmp_path), max_disk_bytes=entry_size * 20)
+
+    for index in range(200):
+        cache.put(f"key-{index}", RESULT)
+
+    stored = sum(path.stat().st_size for path in tmp_path.glob("*.json"))
+    assert stored <= entry_size * 20 * 1.1
@@ -0,0 +1,30 @@
+"""Rule-based extraction of labelled applicant fields."""
+
+from backend.services.rule_extractor import rule_extractor
+
+
+def test_labelled_transcript_is_confident():
+    extraction = rule_extractor.extract(
+        "Cumulative GPA: 3.85\nIntended Major: Computer Science\nSAT Total: 1450\n"
+    )
+
+    assert extraction.values() == {"gpa": "3.85", "major": "Computer Science", "sat": "1450"}
+    assert extraction.confidence == 1.0
+
+
+def test_empty_major_does_not_take_the_next_label():
+    for next_line in ("SAT Total: 1450", "GPA Scale: 4.0"):
+        extraction = rule_extractor.extract(
+            f"Cumulative GPA: 3.85\nIntended Major:\n{next_line}\nACT Composite: 31\n"
+        )
+
+        assert "major" not in extraction.fields
+        assert extraction.confidence == 0.0
+
+
+def test_field_label_is_not_a_major():
+    extraction = rule_extractor.extract(
+        "Cumulative GPA: 3.85\nIntended Major: SAT Total\nSAT: 1450\n"
+    )
+
+    assert "major" not in extraction.fields
@@ -0,0 +1,27 @@
+"""Multi-process server configuration."""
+
+from backend.config import settings
+from backend.server import share_inflight_tokens, share_process_workers
+
+
+def test_process_workers_are_split_between_server_workers(monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 4)
+    monkeypatch.setattr(settings, "PROCESS_WORKERS", 8)
+
+    assert share_process_workers() == 2
+    assert settings.PROCESS_WORKERS == 2
+
+
+def test_every_server_worker_keeps_one_process(monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 16)
+    monkeypatch.setattr(settings, "PROCESS_WORKERS", 8)
+
+    assert share_process_workers() == 1
+
+
+def test_inflight_token_limit_is_split_between_server_workers(monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 4)
+    monkeypatch.setattr(settings, "RATE_LIMIT_MAX_INFLIGHT_TOKENS", 500_000)
+
+    assert share_inflight_tokens() == 125_000
+    assert settings.RATE_LIMIT_MAX_INFLIGHT_TOKENS == 125_000
@@ -0,0 +1,73 @@
+"""Followers of a shared run do not fail for the leader's own reasons."""
+
+import asyncio
+
+import pytest
+
+from backend.config import settings
+from backend.services import admission
+from backend.services.admission import OverloadedError
+from backend.services.pipeline import process_document, stream_document
+from backend.utils import SpooledUpload
+from benchmarks.synthetic import make_transcript_pdf
+
+
+def make_upload(pdf: bytes) -> SpooledUpload:
+    upload = SpooledUpload("a.pdf", max_memory=1024 * 1024)
+    upload.write(pdf)
+    return upload
+
+
+@pytest.fixture
+def llm_only(monkeypatch, stub_llm):
+    """Send every document to the stub model, which answers after a delay."""
+    monkeypatch.setattr(settings, "RULES_ENABLED", False)
+    stub_llm.latency = 0.2
+    return stub_llm
+
+
+def test_follower_runs_again_when_stream_leader_disconnects(llm_only):
+    pdf = make_transcript_pdf(1, seed=3)
+
+    async def run():
+        leader = stream_document(make_upload(pdf))
+        assert (await leader.__anext__())[0] == "extracted"
+        follower = asyncio.ensure_future(process_document(make_upload(pdf)))
+        await asyncio.sleep(0)
+        # The client goes away while the follower waits on its run
+        await leader.aclose()
+        return await asyncio.wait_for(follower, timeout=3)
+
+    result = asyncio.run(run())
+
+    assert result["response"]
+    assert llm_only.calls == 1
+
+
+def test_waiting_follower_runs_again_when_leader_is_shed(llm_only, monkeypatch):
+    monkeypatch.setattr(admission, "capacity", 10)
+    pdf = make_transcript_pdf(1, seed=4)
+
+    async def run():
+        held = asyncio.Event()
+        release = asyncio.Event()
+
+        async def occupy():
+            async with admission.admit(10):
+                held.set()
+                await release.wait()
+
+        occupant = asyncio.ensure_future(occupy())
+        await held.wait()
+        leader = asyncio.ensure_future(process_document(make_upload(pdf)))
+        await asyncio.sleep(0)
+        job = asyncio.ensure_future(process_document(make_upload(pdf), wait_for_capacity=True))
+        with pytest.raises(OverloadedError):
+            await leader
+        release.set()
+        await occupant
+        return await asyncio.wait_for(job, timeout=3)
+
+    result = asyncio.run(run())
+
+    assert result["response"]
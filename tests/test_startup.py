@@ -0,0 +1,26 @@
+"""Cold start: importing the app leaves heavy dependencies unloaded."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY = ["faiss", "fitz", "fpdf", "langchain", "langchain_openai", "openai", "tiktoken"]
+
+
+def test_app_import_defers_heavy_dependencies():
+    code = (
+        "import sys, backend.main\n"
+        f"print(' '.join(name for name in {HEAVY!r} if name in sys.modules))"
+    )
+    loaded = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env={**os.environ, "OPENAI_API_KEY": "test-key", "WARMUP_ON_STARTUP": "false"},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+
+    assert loaded == []
@@ -0,0 +1,63 @@
+"""POST /process/stream: pipeline progress as server-sent events."""
+
+import asyncio
+import json
+
+import httpx
+
+from backend.config import settings
+from backend.main import app
+from benchmarks.fakes import FAKE_RESPONSE
+from benchmarks.synthetic import make_transcript_pdf
+
+
+def post_stream(pdf: bytes):
+    """Stream one document; returns its (event, data) pairs in order."""
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test", timeout=30
+        ) as client:
+            response = await client.post(
+                "/api/v1/process/stream",
+                params={"render": "false"},
+                files={"file": ("transcript.pdf", pdf, "application/pdf")},
+            )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        return response.text
+
+    events = []
+    for raw in asyncio.run(run()).split("\n\n"):
+        if raw:
+            event, data = raw.split("\n")
+            events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_stage_events_precede_tokens_and_done(monkeypatch, stub_llm):
+    monkeypatch.setattr(settings, "RULES_ENABLED", False)
+
+    events = post_stream(make_transcript_pdf(1, seed=5))
+    names = [event for event, _ in events]
+
+    assert names[:3] == ["extracted", "tokens", "mode"]
+    assert set(names[3:-1]) == {"token"}
+    assert names[-1] == "done"
+    done = events[-1][1]
+    assert "".join(data["text"] for event, data in events if event == "token") == FAKE_RESPONSE
+    assert done["response"] == FAKE_RESPONSE
+    assert done["cached"] is False
+
+
+def test_cached_result_is_replayed_as_one_token(monkeypatch, stub_llm):
+    monkeypatch.setattr(settings, "RULES_ENABLED", False)
+    pdf = make_transcript_pdf(1, seed=6)
+    post_stream(pdf)
+
+    events = post_stream(pdf)
+
+    assert [event for event, _ in events] == ["tokens", "mode", "token", "done"]
+    assert events[-2][1]["text"] == FAKE_RESPONSE
+    assert events[-1][1]["cached"] is True
@@ -0,0 +1,71 @@
+"""Normalization keeps changing numbered lines and table column gaps."""
+
+from backend.services.rule_extractor import AMBIGUOUS, rule_extractor
+from backend.services.text_normalizer import normalize_pages
+
+LETTERHEAD = "Lincoln High School - Official Academic Transcript"
+
+
+def term_pages():
+    """A 4-term transcript whose footers carry the running GPA."""
+    gpas = ["3.10", "3.35", "3.52", "3.68"]
+    return [
+        "\n".join(
+            [
+                LETTERHEAD,
+                f"Term {term}",
+                "",
+                f"202{term} Algebra II    A-   Credits 1.0",
+                f"202{term} Chemistry     B+   Credits 1.0",
+                f"202{term} Physics       A    Credits 1.0",
+                "",
+                f"Cumulative GPA: {gpa}",
+                f"Page {term} of 4 - Confidential",
+            ]
+        )
+        for term, gpa in enumerate(gpas, start=1)
+    ]
+
+
+def test_numbered_footers_that_change_are_kept():
+    text = "\n".join(normalize_pages(term_pages()))
+
+    for term, gpa in enumerate(["3.10", "3.35", "3.52", "3.68"], start=1):
+        assert f"Term {term}" in text
+        assert f"Cumulative GPA: {gpa}" in text
+        assert f"202{term} Physics  A  Credits 1.0" in text
+
+
+def test_repeated_boilerplate_is_kept_once():
+    text = "\n".join(normalize_pages(term_pages()))
+
+    assert text.count(LETTERHEAD) == 1
+    assert text.count("- Confidential") == 1
+
+
+def test_changing_gpa_stays_ambiguous_for_the_rules():
+    text = "\n".join(normalize_pages(term_pages()))
+    text += "\nIntended Major: Biology\nSAT Total: 1450"
+
+    assert rule_extractor.extract(text).confidence == AMBIGUOUS
+
+
+def test_column_gaps_still_end_the_major():
+    page = (
+        "Cumulative GPA: 3.85\n"
+        "Intended Major: Biology        Class Rank: 12/300\n"
+        "SAT Total: 1450"
+    )
+
+    extraction = rule_extractor.extract("\n".join(normalize_pages([page])))
+
+    assert extraction.values()["major"] == "Biology"
+
+
+def test_removed_lines_are_reported():
+    removed = []
+
+    normalize_pages(term_pages(), removed=removed)
+
+    assert removed.count(LETTERHEAD) == 3
+    assert not any("GPA" in line for line in removed)
@@ -0,0 +1,41 @@
+"""Token-window chunking over an encoded document."""
+
+import pytest
+
+from backend.services.token_chunker import TokenChunker
+
+
+def transcript_lines(count: int):
+    return [f"Course {i}: Algebra II, grade A, credits 1.0" for i in range(count)]
+
+
+def test_chunks_stay_within_the_token_window_and_cut_at_line_ends(encoder):
+    text = "\n".join(transcript_lines(60)) + "\n"
+    chunker = TokenChunker(chunk_tokens=200, overlap_tokens=40)
+
+    chunks = chunker.split_tokens(encoder.encode_ordinary(text))
+
+    assert len(chunks) > 1
+    assert all(len(encoder.encode_ordinary(chunk)) <= 200 for chunk in chunks)
+    assert all(chunk.endswith("\n") for chunk in chunks)
+    assert chunks[0].startswith("Course 0:")
+    assert chunks[-1].endswith("Course 59: Algebra II, grade A, credits 1.0\n")
+    for line in transcript_lines(60):
+        assert any(line in chunk for chunk in chunks)
+
+
+def test_next_chunk_starts_inside_the_overlap_on_a_line_start(encoder):
+    text = "\n".join(transcript_lines(60)) + "\n"
+    chunker = TokenChunker(chunk_tokens=200, overlap_tokens=60)
+
+    chunks = chunker.split_tokens(encoder.encode_ordinary(text))
+
+    for chunk, following in zip(chunks, chunks[1:]):
+        first_line = following.split("\n")[0]
+        assert first_line.startswith("Course ")
+        assert first_line + "\n" in chunk
+
+
+def test_overlap_must_be_smaller_than_the_window():
+    with pytest.raises(ValueError):
+        TokenChunker(chunk_tokens=100, overlap_tokens=100)
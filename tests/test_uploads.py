@@ -0,0 +1,104 @@
+"""Upload spooling and early rejection of oversized bodies."""
+
+import asyncio
+import io
+
+import pytest
+from fastapi import HTTPException
+
+from backend.config import settings
+from backend.services.pdf_processor import extract_pages
+from backend.utils.uploads import RequestSizeLimitMiddleware, SpooledUpload, spool_upload
+from benchmarks.synthetic import make_transcript_pdf
+
+
+class ChunkedUpload:
+    """UploadFile stand-in that counts how much of the body was read."""
+
+    def __init__(self, content: bytes):
+        self.filename = "transcript.pdf"
+        self._body = io.BytesIO(content)
+
+    @property
+    def read_bytes(self) -> int:
+        return self._body.tell()
+
+    async def read(self, size: int) -> bytes:
+        return self._body.read(size)
+
+
+def call_limited(limit: int, headers, chunks):
+    """Send a request through RequestSizeLimitMiddleware; returns (status, app_called)."""
+    called = []
+    sent = []
+
+    async def app(scope, receive, send):
+        called.append(True)
+        while (await receive()).get("more_body"):
+            pass
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": "/api/v1/process", "headers": headers}
+    asyncio.run(RequestSizeLimitMiddleware(app, default_limit=limit)(scope, receive, send))
+    return sent[0]["status"], bool(called)
+
+
+def test_in_memory_source_is_opened_without_a_copy():
+    pdf = make_transcript_pdf(2, seed=1)
+    upload = SpooledUpload("transcript.pdf", max_memory=len(pdf))
+    upload.write(pdf)
+    upload.finish()
+
+    assert upload.path is None
+    assert upload.source is upload.source
+    assert len(extract_pages(upload.source, parallel=False)) == 2
+
+
+def test_spooled_source_is_the_temp_file():
+    pdf = make_transcript_pdf(2, seed=1)
+    with SpooledUpload("transcript.pdf", max_memory=16) as upload:
+        upload.write(pdf[:10])
+        upload.write(pdf[10:])
+        upload.finish()
+
+        assert upload.source == upload.path
+        assert upload.sha256 and upload.size == len(pdf)
+        assert len(extract_pages(upload.source, parallel=False)) == 2
+
+
+def test_declared_oversized_body_is_rejected_before_the_app_runs():
+    status, called = call_limited(100, [(b"content-length", b"101")], [b"x" * 101])
+
+    assert status == 413
+    assert not called
+
+
+def test_undeclared_body_is_cut_off_once_over_the_limit():
+    status, _ = call_limited(100, [], [b"x" * 60, b"x" * 60, b"x" * 60])
+
+    assert status == 413
+
+
+def test_spool_stops_reading_once_over_max_file_size(monkeypatch):
+    pdf = make_transcript_pdf(1, seed=1)
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", len(pdf))
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 256)
+    upload = ChunkedUpload(pdf + b"\0" * 100_000)
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(spool_upload(upload))
+
+    assert raised.value.status_code == 413
+    assert upload.read_bytes < len(pdf) + 2 * settings.UPLOAD_CHUNK_SIZE